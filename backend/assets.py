@@ -0,0 +1,144 @@
+import gzip
+import hashlib
+import mimetypes
+import os
+
+from flask import Response, abort, current_app, request, send_file, send_from_directory, url_for
+
+
+# Um ano: as URLs levam o hash do conteúdo, então nunca precisam ser revalidadas
+MAX_AGE = 365 * 24 * 3600
+CACHE_CONTROL = f"public, max-age={MAX_AGE}, immutable"
+
+COMPRIMIVEIS = {".css", ".js", ".svg", ".ico", ".json", ".txt", ".map"}
+# Variantes geradas pelo worker (backend/images.py): ficam fora do manifesto porque
+# surgem depois da inicialização, mas o nome já leva o hash do conteúdo
+IMAGENS_PROCESSADAS = "img/cupcakes"
+
+
+class Arquivo:
+    __slots__ = ("nome", "versionado", "caminho", "mimetype", "etag", "comprimidos")
+
+    def __init__(self, nome, versionado, caminho, mimetype, etag):
+        self.nome = nome
+        self.versionado = versionado
+        self.caminho = caminho
+        self.mimetype = mimetype
+        self.etag = etag
+        self.comprimidos = {}    # "br"/"gzip" -> bytes
+
+
+class ManifestoEstatico:
+    """
+    Manifesto dos arquivos estáticos montado na inicialização, sem etapa de build:
+    cada arquivo ganha um nome com o hash do conteúdo (css/style.3f9a0c1b2d.css),
+    servido com Cache-Control immutable por um ano. CSS/JS/SVG já ficam
+    comprimidos em memória (brotli e gzip), escolhidos pelo Accept-Encoding.
+    """
+
+    def __init__(self):
+        self.por_nome = {}         # "css/style.css" -> Arquivo
+        self.por_versionado = {}   # "css/style.3f9a0c1b2d.css" -> Arquivo
+        self.versao = ""           # resumo dos nomes versionados: entra no ETag das páginas
+        self.ativo = False
+
+    def carregar(self, pasta):
+        self.por_nome.clear()
+        self.por_versionado.clear()
+
+        for raiz, subpastas, arquivos in os.walk(pasta):
+            subpastas[:] = [
+                s for s in subpastas
+                if os.path.relpath(os.path.join(raiz, s), pasta).replace(os.sep, "/") != IMAGENS_PROCESSADAS
+            ]
+            for nome_arquivo in arquivos:
+                caminho = os.path.join(raiz, nome_arquivo)
+                nome = os.path.relpath(caminho, pasta).replace(os.sep, "/")
+                self._adicionar(nome, caminho)
+
+        # muda quando qualquer CSS/JS/imagem muda: HTML antigo aponta para /assets que não existem mais
+        self.versao = hashlib.sha1("\n".join(sorted(self.por_versionado)).encode()).hexdigest()[:12]
+        self.ativo = True
+        return len(self.por_nome)
+
+    def _adicionar(self, nome, caminho):
+        with open(caminho, "rb") as f:
+            conteudo = f.read()
+
+        resumo = hashlib.sha256(conteudo).hexdigest()[:10]
+        base, extensao = os.path.splitext(nome)
+        arquivo = Arquivo(
+            nome=nome,
+            versionado=f"{base}.{resumo}{extensao}",
+            caminho=caminho,
+            mimetype=mimetypes.guess_type(nome)[0] or "application/octet-stream",
+            etag=resumo,
+        )
+
+        if extensao.lower() in COMPRIMIVEIS:
+            for codificacao, dados in comprimir(conteudo).items():
+                if len(dados) < len(conteudo):
+                    arquivo.comprimidos[codificacao] = dados
+
+        self.por_nome[nome] = arquivo
+        self.por_versionado[arquivo.versionado] = arquivo
+
+    def url(self, nome):
+        """
+        URL com hash do arquivo. Variantes do worker vão para /img/cupcakes
+        (imutáveis); o resto fora do manifesto (ou em debug) vai para o static normal.
+        """
+        pasta, _, nome_imagem = nome.rpartition("/")
+        if pasta == IMAGENS_PROCESSADAS:
+            return url_for("imagem_processada", nome=nome_imagem)
+        arquivo = self.por_nome.get(nome) if self.ativo else None
+        if arquivo is None:
+            return url_for("static", filename=nome)
+        return url_for("estatico_versionado", versionado=arquivo.versionado)
+
+    def resposta(self, versionado):
+        arquivo = self.por_versionado.get(versionado)
+        if arquivo is None:
+            abort(404)
+
+        codificacao = escolher_codificacao(arquivo.comprimidos)
+        if codificacao:
+            resp = Response(arquivo.comprimidos[codificacao], mimetype=arquivo.mimetype)
+            resp.headers["Content-Encoding"] = codificacao
+        else:
+            resp = send_file(arquivo.caminho, mimetype=arquivo.mimetype, conditional=False, etag=False)
+
+        if arquivo.comprimidos:
+            resp.headers["Vary"] = "Accept-Encoding"
+        resp.headers["Cache-Control"] = CACHE_CONTROL
+        resp.set_etag(arquivo.etag + (f"-{codificacao}" if codificacao else ""))
+        return resp.make_conditional(request)
+
+    def resposta_imagem(self, nome):
+        """Variante do worker (<hash>-<largura>.<formato>): imutável como os estáticos versionados"""
+        resp = send_from_directory(os.path.join(current_app.static_folder, IMAGENS_PROCESSADAS), nome)
+        resp.headers["Cache-Control"] = CACHE_CONTROL
+        return resp
+
+
+def comprimir(conteudo):
+    """Variantes comprimidas com o nível máximo (feito uma vez, na inicialização)"""
+    variantes = {"gzip": gzip.compress(conteudo, compresslevel=9, mtime=0)}
+    try:
+        import brotli
+    except ImportError:
+        return variantes   # sem o pacote Brotli: só gzip
+    variantes["br"] = brotli.compress(conteudo, quality=11)
+    return variantes
+
+
+def escolher_codificacao(comprimidos):
+    """br > gzip, respeitando o Accept-Encoding do navegador (inclusive q=0)"""
+    aceitas = request.accept_encodings
+    for codificacao in ("br", "gzip"):
+        if codificacao in comprimidos and aceitas[codificacao] > 0:
+            return codificacao
+    return None
+
+
+estaticos = ManifestoEstatico()
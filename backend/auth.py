@@ -0,0 +1,27 @@
+from functools import wraps
+
+from flask import session, flash, redirect, url_for
+
+
+def login_required(f):
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        if "usuario_id" not in session:
+            flash("Você precisa estar logado.", "warning")
+            return redirect(url_for("publico.login"))
+        return f(*args, **kwargs)
+    return decorated_function
+
+
+def admin_required(f):
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        is_admin = session.get("is_admin")
+
+        # Aceita boolean True e string "true"
+        if not is_admin or str(is_admin).lower() != "true":
+            flash("Acesso restrito a administradores.", "danger")
+            return redirect(url_for("publico.vitrine"))
+
+        return f(*args, **kwargs)
+    return decorated_function
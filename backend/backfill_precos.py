@@ -0,0 +1,44 @@
+"""
+Preenche preco_unitario (pedido_cupcake) e total (pedidos) dos pedidos antigos.
+
+Uso: python -m backend.backfill_precos
+
+Pedidos antigos não guardavam o preço da compra, então o backfill usa o
+preço ATUAL do cupcake. Só linhas com valor NULL são alteradas.
+
+A migração 0002_precos_e_exportacoes já roda este backfill no init_db; o
+script fica para bancos antigos sem as migrações.
+"""
+from sqlalchemy import inspect, text
+
+from backend.app import app
+from backend.models import db
+
+
+def adicionar_coluna(tabela, coluna, tipo):
+    colunas = [c["name"] for c in inspect(db.engine).get_columns(tabela)]
+    if coluna not in colunas:
+        db.session.execute(text(f"ALTER TABLE {tabela} ADD COLUMN {coluna} {tipo}"))
+        print(f"Coluna {tabela}.{coluna} criada.")
+
+
+with app.app_context():
+    adicionar_coluna("pedido_cupcake", "preco_unitario", "FLOAT")
+    adicionar_coluna("pedidos", "total", "FLOAT")
+
+    itens = db.session.execute(text("""
+        UPDATE pedido_cupcake
+           SET preco_unitario = (SELECT c.preco FROM cupcakes c WHERE c.id = pedido_cupcake.cupcake_id)
+         WHERE preco_unitario IS NULL
+    """)).rowcount
+
+    pedidos = db.session.execute(text("""
+        UPDATE pedidos
+           SET total = (SELECT COALESCE(SUM(pc.quantidade * pc.preco_unitario), 0)
+                          FROM pedido_cupcake pc
+                         WHERE pc.pedido_id = pedidos.id)
+         WHERE total IS NULL
+    """)).rowcount
+
+    db.session.commit()
+    print(f"Backfill concluído: {itens} itens e {pedidos} pedidos atualizados.")
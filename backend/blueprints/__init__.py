@@ -0,0 +1,5 @@
+from backend.blueprints import public, cart, orders, admin
+
+
+# Registradas pela create_app() (backend/app.py), nesta ordem
+BLUEPRINTS = (public.bp, cart.bp, orders.bp, admin.bp)
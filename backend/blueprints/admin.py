@@ -0,0 +1,503 @@
+import os
+
+from flask import (
+    Blueprint, render_template, send_file, request, redirect, session, url_for,
+    flash, jsonify, abort,
+)
+from werkzeug.security import generate_password_hash
+from sqlalchemy import func
+from sqlalchemy.orm import joinedload, selectinload
+
+from backend.models import (
+    db, Usuario, Cupcake, Pedido, PedidoCupcake, PedidoStatusLog, TarefaExportacao,
+)
+from backend.auth import login_required, admin_required
+from backend.query_budget import limite_queries
+from backend.reports import ler_filtros, aplicar_filtros, metricas_dashboard
+from backend.exports import resposta_excel, resposta_csv, resposta_parquet, resposta_pdf
+from backend.jobs import FORMATOS, criar_tarefa, tarefa_expirada
+from backend.pagination import pagina_nos_dois_sentidos, decodificar_cursor, contagem_estimada
+from backend.catalog import catalogo
+from backend.images import enfileirar_imagem
+from backend.pdf_cache import pdfs
+from backend.config import WORKERS, THREADS, estatisticas_pool
+
+
+bp = Blueprint("admin", __name__)
+
+# =================== Área do ADMIN ==================
+
+
+@bp.route("/admin")
+@login_required
+@admin_required
+@limite_queries(6)
+def admin_dashboard():
+    # --- parâmetros de filtro ---
+    filtros = ler_filtros(request.args)
+
+    base_query = aplicar_filtros(Pedido.query, filtros)
+
+    # --- Paginação por chave (data_pedido, id): qualquer página custa o mesmo ---
+    depois = decodificar_cursor(request.args.get("depois"))
+    antes = decodificar_cursor(request.args.get("antes"))
+
+    paged_query = base_query.options(
+        selectinload(Pedido.usuario),
+        selectinload(Pedido.itens).selectinload(PedidoCupcake.cupcake),
+    )
+
+    por_pagina = 8
+    pedidos, proximo, anterior = pagina_nos_dois_sentidos(
+        paged_query, Pedido.data_pedido, Pedido.id, por_pagina, depois=depois, antes=antes
+    )
+
+    # Total aproximado (estatísticas do PostgreSQL) no lugar do COUNT(*) exato
+    total_estimado = contagem_estimada(base_query)
+
+    # --- MÉTRICAS + gráfico por status (uma única query, respeitando filtros) ---
+    metricas = metricas_dashboard(filtros)
+
+    return render_template(
+        "admin.html",
+        pedidos=pedidos,
+        proximo=proximo,
+        anterior=anterior,
+        total_estimado=total_estimado,
+        filtro_status=filtros["status"],
+        filtro_cliente=filtros["cliente"],
+        data_inicio=filtros["data_inicio"],
+        data_fim=filtros["data_fim"],
+        **metricas
+    )
+
+# ----------------- EXPORTAÇÃO EXCEL -----------------
+@bp.route("/admin/export/excel")
+@login_required
+@admin_required
+def export_excel():
+    return resposta_excel(ler_filtros(request.args))
+
+
+# ----------------- EXPORTAÇÃO PDF -----------------
+
+@bp.route("/admin/export/pdf")
+@login_required
+@admin_required
+def export_pdf():
+    # Mesmo relatório em streaming de /exportar_pdf, com todos os filtros do painel
+    return resposta_pdf(ler_filtros(request.args), nome_arquivo="relatorio_pedidos.pdf")
+
+
+# ------------------ DETALHES DO PEDIDO ------------------
+
+@bp.route("/admin/pedido/<int:pedido_id>")
+@admin_required
+@limite_queries(2)
+def admin_pedido_detalhes(pedido_id):
+    # Carrega o pedido + os itens + cupcakes de forma explícita
+    pedido = (
+        Pedido.query
+        .options(joinedload(Pedido.itens).joinedload(PedidoCupcake.cupcake))
+        .filter_by(id=pedido_id)
+        .first_or_404()
+    )
+
+    return render_template(
+        "admin_pedido_detalhes.html",
+        pedido=pedido,
+        total=pedido.total or 0
+    )
+
+
+@bp.route("/admin/pedido/<int:pedido_id>/delete", methods=["POST"])
+@admin_required
+def admin_pedido_delete(pedido_id):
+    pedido = Pedido.query.get_or_404(pedido_id)
+    # opcional: remover itens primeiro (dependendo de cascade)
+    for item in list(pedido.itens):
+        db.session.delete(item)
+    db.session.delete(pedido)
+    db.session.commit()
+    flash(f"Pedido #{pedido_id} excluído com sucesso.", "success")
+    return redirect(url_for("admin.admin_dashboard"))
+
+
+@bp.route("/admin/status/<int:pedido_id>", methods=["GET", "POST"])
+@admin_required
+def alterar_status(pedido_id):
+    pedido = Pedido.query.get_or_404(pedido_id)
+
+    validos = ["Recebido", "Em produção", "Pronto", "Entregue"]
+
+    if request.method == "POST":
+        novo_status = request.form.get("status")
+        if novo_status and novo_status in validos:
+            pedido.status = novo_status
+            db.session.commit()
+            flash(f"Status do pedido #{pedido.id} atualizado para: {pedido.status}", "success")
+        else:
+            flash("Status inválido.", "danger")
+        return redirect(url_for("admin.admin_dashboard"))
+
+    # GET: avança status sequencialmente
+    try:
+        ordem = validos
+        index_atual = ordem.index(pedido.status) if pedido.status in ordem else -1
+        pedido.status = ordem[(index_atual + 1) % len(ordem)]
+        db.session.commit()
+        flash(f"Status do pedido #{pedido.id} avançado para: {pedido.status}", "info")
+    except Exception as e:
+        flash("Não foi possível avançar o status.", "danger")
+
+    return redirect(url_for("admin.admin_dashboard"))
+
+
+@bp.route("/admin/pedido/<int:pedido_id>/status", methods=["POST"])
+@admin_required
+def admin_atualiza_status(pedido_id):
+    pedido = Pedido.query.get_or_404(pedido_id)
+    novo_status = request.form.get("status")
+
+    pedido.status = novo_status
+    db.session.commit()
+
+    # Salvar log
+    log = PedidoStatusLog(pedido_id=pedido.id, status=novo_status)
+    db.session.add(log)
+    db.session.commit()
+    pdfs.invalidar(pedido.id)
+
+    flash("Status atualizado com sucesso!", "success")
+    return redirect(url_for("admin.admin_pedido_detalhes", pedido_id=pedido.id))
+
+
+@bp.route("/admin/pedido/<int:pedido_id>/cancelar", methods=["POST"])
+@admin_required
+def admin_cancelar_pedido(pedido_id):
+    pedido = Pedido.query.get_or_404(pedido_id)
+    pedido.status = "Cancelado"
+    db.session.commit()
+
+    log = PedidoStatusLog(pedido_id=pedido.id, status="Cancelado")
+    db.session.add(log)
+    db.session.commit()
+    pdfs.invalidar(pedido.id)
+
+    flash("Pedido cancelado!", "danger")
+    return redirect(url_for("admin.admin_pedido_detalhes", pedido_id=pedido.id))
+
+
+#rota exportar excel
+
+@bp.route('/exportar_excel')
+@admin_required
+def exportar_excel():
+    return resposta_excel(ler_filtros(request.args))
+
+
+#rota exportar csv (uma linha por item)
+
+@bp.route('/exportar_csv')
+@admin_required
+def exportar_csv():
+    return resposta_csv(ler_filtros(request.args))
+
+
+#rota exportar parquet (uma linha por item)
+
+@bp.route('/exportar_parquet')
+@admin_required
+def exportar_parquet():
+    return resposta_parquet(ler_filtros(request.args))
+
+#rota exportar pdf
+
+@bp.route('/exportar_pdf')
+@admin_required
+def exportar_pdf():
+    return resposta_pdf(ler_filtros(request.args))
+
+
+# =================== Exportações em segundo plano ===================
+
+def tarefa_json(tarefa):
+    return {
+        "id": tarefa.id,
+        "formato": tarefa.formato,
+        "status": tarefa.status,
+        "progresso": tarefa.progresso,
+        "mensagem": tarefa.mensagem,
+        "expira_em": tarefa.expira_em.isoformat() if tarefa.expira_em else None,
+        "status_url": url_for("admin.exportacao_status", tarefa_id=tarefa.id),
+        "download_url": (
+            url_for("admin.exportacao_download", tarefa_id=tarefa.id)
+            if tarefa.status == "concluido" else None
+        ),
+    }
+
+
+@bp.route("/admin/exportacoes", methods=["POST"])
+@admin_required
+def exportacao_criar():
+    formato = request.form.get("formato") or request.args.get("formato")
+    try:
+        tarefa = criar_tarefa(session["usuario_id"], formato, request.form or request.args)
+    except ValueError as e:
+        return jsonify({"erro": str(e)}), 400
+
+    return jsonify(tarefa_json(tarefa)), 202
+
+
+@bp.route("/admin/exportacoes/<int:tarefa_id>")
+@admin_required
+def exportacao_status(tarefa_id):
+    tarefa = TarefaExportacao.query.get_or_404(tarefa_id)
+    return jsonify(tarefa_json(tarefa))
+
+
+@bp.route("/admin/exportacoes/<int:tarefa_id>/download")
+@admin_required
+def exportacao_download(tarefa_id):
+    tarefa = TarefaExportacao.query.get_or_404(tarefa_id)
+
+    if tarefa.status != "concluido" or tarefa_expirada(tarefa) \
+            or not tarefa.arquivo or not os.path.exists(tarefa.arquivo):
+        abort(404)
+
+    sufixo, mimetype = FORMATOS[tarefa.formato]
+    return send_file(
+        tarefa.arquivo,
+        mimetype=mimetype,
+        as_attachment=True,
+        download_name=f"pedidos_{tarefa.id}{sufixo}"
+    )
+
+# cadastro de cupcake
+
+@bp.route("/admin/cupcake/novo", methods=["GET", "POST"])
+@admin_required
+def admin_cadastro_cupcake():
+    if request.method == "POST":
+        nome = request.form["nome"]
+        descricao = request.form["descricao"]
+
+        # --- validação do preço ---
+        try:
+            preco = float(request.form["preco"])
+        except ValueError:
+            flash("Preço inválido. Digite um valor numérico.", "danger")
+            return redirect(url_for("admin.admin_cadastro_cupcake"))
+
+        if preco <= 0:
+            flash("O preço deve ser maior que zero!", "danger")
+            return redirect(url_for("admin.admin_cadastro_cupcake"))
+        # -----------------------------
+
+        # Salva cupcake no banco; a imagem fica com o placeholder até o worker
+        # gerar as variantes (backend/images.py)
+        novo = Cupcake(
+            nome=nome,
+            descricao=descricao,
+            preco=preco,
+            imagem_url="",
+            ativo=True  # se esse campo existe
+        )
+        db.session.add(novo)
+        db.session.flush()  # gera novo.id para a tarefa da imagem
+
+        if not enfileirar_imagem(novo, request.files["imagem"]):
+            db.session.rollback()
+            flash("Formato de imagem não aceito.", "danger")
+            return redirect(url_for("admin.admin_cadastro_cupcake"))
+
+        db.session.commit()
+        catalogo.invalidar()
+
+        flash("Cupcake cadastrado com sucesso!", "success")
+        return redirect(url_for("admin.admin_listar_cupcakes"))
+
+    return render_template("admin_cadastro_cupcake.html")
+
+
+@bp.route("/admin/cupcakes")
+@admin_required
+@limite_queries(3)
+def admin_listar_cupcakes():
+    cupcakes = Cupcake.query.all()
+
+    from sqlalchemy.sql import func
+
+    medias = (
+        db.session.query(
+            Cupcake.id,
+            func.avg(Pedido.avaliacao).label("media_avaliacao")
+        )
+        .join(PedidoCupcake, PedidoCupcake.cupcake_id == Cupcake.id)
+        .join(Pedido, Pedido.id == PedidoCupcake.pedido_id)
+        .filter(Pedido.avaliacao.isnot(None))
+        .group_by(Cupcake.id)
+        .all()
+    )
+
+    medias_dict = {cupcake_id: float(media) for cupcake_id, media in medias}
+
+    # 🟪 IDs de cupcakes que já foram usados em pedidos
+    vendidos_ids = [
+        id for (id,) in db.session.query(PedidoCupcake.cupcake_id).distinct().all()
+    ]
+
+    return render_template(
+        "admin_listar_cupcakes.html",
+        cupcakes=cupcakes,
+        medias=medias_dict,
+        vendidos_ids=vendidos_ids
+    )
+
+@bp.route("/admin/cupcake/<int:cupcake_id>/pedidos")
+@admin_required
+@limite_queries(2)
+def admin_pedidos_do_cupcake(cupcake_id):
+    cupcake = Cupcake.query.get_or_404(cupcake_id)
+
+    # Pedidos (únicos) com esse cupcake numa query só, sem carregar item.pedido um a um
+    pedidos = (
+        Pedido.query
+        .filter(Pedido.itens.any(PedidoCupcake.cupcake_id == cupcake_id))
+        .order_by(Pedido.id)
+        .all()
+    )
+
+    return render_template(
+        "admin_pedidos_por_cupcake.html",
+        cupcake=cupcake,
+        pedidos=pedidos
+    )
+
+
+#rota deletar cupcake 
+@bp.route("/admin/cupcake/delete/<int:id>", methods=["POST"])
+@admin_required
+def admin_deletar_cupcake(id):
+    cupcake = Cupcake.query.get_or_404(id)
+
+    # Verifica se já foi vendido
+    associado = PedidoCupcake.query.filter_by(cupcake_id=id).first()
+
+    if associado:
+        # Não exclui → apenas desativa
+        cupcake.ativo = False
+        db.session.commit()
+        catalogo.invalidar()
+        flash("⚠️ Este cupcake já foi vendido. Ele foi DESATIVADO ao invés de excluído.", "warning")
+        return redirect(url_for("admin.admin_listar_cupcakes"))
+
+    # Nunca vendido → pode excluir
+    db.session.delete(cupcake)
+    db.session.commit()
+    catalogo.invalidar()
+
+    flash("Cupcake excluído com sucesso!", "success")
+    return redirect(url_for("admin.admin_listar_cupcakes"))
+
+
+#rota editar cupcake
+
+@bp.route("/admin/cupcake/edit/<int:id>", methods=["GET","POST"])
+@admin_required
+def admin_editar_cupcake(id):
+    cupcake = Cupcake.query.get_or_404(id)
+
+    if request.method == "POST":
+        cupcake.nome = request.form["nome"]
+        cupcake.descricao = request.form["descricao"]
+
+        # --- validação do preço ---
+        try:
+            preco = float(request.form["preco"])
+        except ValueError:
+            flash("Preço inválido. Digite um valor numérico.", "danger")
+            return redirect(request.url)
+
+        if preco <= 0:
+            flash("O preço deve ser maior que zero!", "danger")
+            return redirect(request.url)
+
+        cupcake.preco = preco
+        # ---------------------------
+
+        # ✔ Atualiza status ativo/inativo
+        cupcake.ativo = "ativo" in request.form  
+
+        # ✔ Se enviou nova imagem, agenda o processamento (a atual fica até terminar)
+        imagem = request.files.get("imagem")
+        if imagem and imagem.filename and not enfileirar_imagem(cupcake, imagem):
+            db.session.rollback()
+            flash("Formato de imagem não aceito.", "danger")
+            return redirect(request.url)
+
+        db.session.commit()
+        catalogo.invalidar()
+        flash("Cupcake atualizado com sucesso!", "success")
+        return redirect(url_for("admin.admin_listar_cupcakes"))
+
+    return render_template("admin_editar_cupcake.html", cupcake=cupcake)
+
+
+@bp.route("/admin/usuarios")
+@admin_required
+@limite_queries(1)
+def admin_usuarios():
+    usuarios = Usuario.query.all()
+    return render_template("admin_usuarios.html", usuarios=usuarios)
+
+@bp.route("/admin/usuario/delete/<int:id>", methods=["POST"])
+@admin_required
+def admin_deletar_usuario(id):
+    usuario = Usuario.query.get_or_404(id)
+
+    db.session.delete(usuario)
+    db.session.commit()
+
+    flash("Usuário excluído com sucesso!", "success")
+    return redirect(url_for("admin.admin_usuarios"))
+
+
+@bp.route("/admin/usuario/edit/<int:user_id>", methods=["GET", "POST"])
+@admin_required
+def admin_editar_usuario(user_id):
+    usuario = Usuario.query.get_or_404(user_id)
+
+    if request.method == "POST":
+        # Atualiza dados básicos
+        usuario.nome = request.form["nome"]
+        usuario.email = request.form["email"]
+        usuario.telefone = request.form.get("telefone")
+
+        # Atualiza se é admin (checkbox)
+        usuario.is_admin = "is_admin" in request.form
+
+        # Atualiza senha somente se preenchida
+        nova_senha = request.form.get("senha")
+        if nova_senha:
+            usuario.senha = generate_password_hash(nova_senha)
+
+        db.session.commit()
+        flash("Usuário atualizado com sucesso!", "success")
+        return redirect(url_for("admin.admin_usuarios"))
+
+    return render_template("admin_editar_usuario.html", usuario=usuario)
+
+
+# =================== Servidor ===================
+
+@bp.route("/admin/pool")
+@admin_required
+def admin_pool():
+    """Pool de conexões do processo que atendeu (cada worker do gunicorn tem o seu)"""
+    return jsonify({
+        "pid": os.getpid(),
+        "workers": WORKERS,
+        "threads": THREADS,
+        "pool": estatisticas_pool(db.engine),
+    })
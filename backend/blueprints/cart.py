@@ -0,0 +1,158 @@
+from flask import Blueprint, render_template, request, redirect, url_for, flash, jsonify
+
+from backend.models import Cupcake
+from backend.auth import login_required
+from backend.query_budget import limite_queries
+from backend.catalog import catalogo
+from backend.http_cache import etag_de, nao_modificado, com_etag
+from backend.cart import (
+    carrinho_atual, salvar_carrinho, revisao_carrinho, aplicar_alteracoes, resumo_carrinho, ALTERACOES_POR_LOTE,
+)
+from backend.blueprints.orders import chave_checkout
+
+
+bp = Blueprint("carrinho", __name__)
+
+# =================== CARRINHO (backend/cart.py; a sessão só guarda o id) ===================
+
+@bp.route('/adicionar_ao_carrinho/<int:cupcake_id>', methods=["POST"])
+@limite_queries(3)
+def adicionar_ao_carrinho(cupcake_id):
+    """
+    Espera um campo 'quantidade' no form (opcional, default 1).
+    Mantém o carrinho como dict: { "1": 2, "3": 1 }
+    """
+    quantidade = int(request.form.get("quantidade", 1))
+    if quantidade < 1:
+        quantidade = 1
+
+    carrinho = carrinho_atual()
+
+    key = str(cupcake_id)
+    carrinho[key] = carrinho.get(key, 0) + quantidade
+
+    salvar_carrinho(carrinho)
+    flash(f"{quantidade} unidade(s) adicionada(s) ao carrinho!", "success")
+    return redirect(url_for("publico.vitrine"))
+
+@bp.route('/aumentar_quantidade/<int:cupcake_id>', methods=["POST"])
+def aumentar_quantidade(cupcake_id):
+    key = str(cupcake_id)
+    carrinho = carrinho_atual()
+    carrinho[key] = carrinho.get(key, 0) + 1
+    salvar_carrinho(carrinho)
+    flash("Quantidade aumentada.", "info")
+    return redirect(url_for("carrinho.carrinho"))
+
+@bp.route('/diminuir_quantidade/<int:cupcake_id>', methods=["POST"])
+def diminuir_quantidade(cupcake_id):
+    key = str(cupcake_id)
+    carrinho = carrinho_atual()
+
+    if key in carrinho:
+        if carrinho[key] > 1:
+            carrinho[key] -= 1
+            flash("Quantidade reduzida.", "info")
+        else:
+            # se for 1, removemos o item completamente
+            del carrinho[key]
+            flash("Item removido do carrinho.", "warning")
+        salvar_carrinho(carrinho)
+    else:
+        flash("Item não encontrado no carrinho.", "warning")
+
+    return redirect(url_for('carrinho.carrinho'))
+
+#route para remover item do carrinho
+
+@bp.route("/remover_do_carrinho/<int:cupcake_id>", methods=["POST"])
+@login_required 
+def remover_do_carrinho(cupcake_id):
+    key = str(cupcake_id)
+    carrinho = carrinho_atual()
+    if key in carrinho:
+        del carrinho[key]
+        salvar_carrinho(carrinho)
+        flash("Item removido do carrinho.", "warning")
+    return redirect(url_for("carrinho.carrinho"))
+
+
+@bp.route("/carrinho")
+@limite_queries(2)
+def carrinho():
+    carrinho = carrinho_atual()
+
+    ids = [int(k) for k in carrinho.keys()] if carrinho else []
+    cupcakes = Cupcake.query.filter(Cupcake.id.in_(ids)).all() if ids else []
+
+    carrinho_itens = []
+    total = 0.0
+    mapa = {c.id: c for c in cupcakes}
+
+    for key, qty in carrinho.items():
+        cid = int(key)
+        c = mapa.get(cid)
+        if c:
+            subtotal = float(c.preco) * int(qty)
+            total += subtotal
+            carrinho_itens.append({
+                "cupcake": c,
+                "quantidade": int(qty),
+                "subtotal": subtotal
+            })
+
+    return render_template(
+        "carrinho.html", itens=carrinho_itens, total=total, chave_checkout=chave_checkout()
+    )
+
+
+@bp.route("/api/carrinho")
+@limite_queries(3)
+def api_carrinho():
+    carrinho = carrinho_atual()
+
+    etag = etag_de("carrinho", revisao_carrinho(carrinho), catalogo.versao_atual())
+    nao_mudou = nao_modificado(etag)
+    if nao_mudou:
+        return nao_mudou
+
+    ids = [int(k) for k in carrinho.keys()] if carrinho else []
+    cupcakes = Cupcake.query.filter(Cupcake.id.in_(ids)).all() if ids else []
+
+    result = []
+    mapa = {c.id: c for c in cupcakes}
+
+    for key, qty in carrinho.items():
+        cid = int(key)
+        c = mapa.get(cid)
+        if c:
+            result.append({
+                "id": c.id,
+                "nome": c.nome,
+                "preco": float(c.preco),
+                "imagem_url": c.imagem_url,
+                "quantidade": int(qty)
+            })
+    return com_etag(jsonify(result), etag)
+
+
+@bp.route("/api/carrinho", methods=["POST"])
+@limite_queries(4)
+def api_carrinho_alterar():
+    """
+    Aplica várias alterações de uma vez e devolve o carrinho atualizado.
+    Corpo: {"alteracoes": [{"id": 1, "delta": 1}, {"id": 2, "quantidade": 0}, ...]}
+    Usado pelo base.js no lugar dos formulários (sem recarregar a página).
+    """
+    dados = request.get_json(silent=True) or {}
+    alteracoes = dados.get("alteracoes")
+
+    if not isinstance(alteracoes, list) or not all(isinstance(a, dict) for a in alteracoes):
+        return jsonify({"erro": "Envie {\"alteracoes\": [{\"id\": ..., \"delta\": ...}]}"}), 400
+    if len(alteracoes) > ALTERACOES_POR_LOTE:
+        return jsonify({"erro": f"Máximo de {ALTERACOES_POR_LOTE} alterações por requisição"}), 400
+
+    carrinho, erros = aplicar_alteracoes(carrinho_atual(), alteracoes)
+    salvar_carrinho(carrinho)
+
+    return jsonify({**resumo_carrinho(carrinho), "erros": erros})
@@ -0,0 +1,392 @@
+import uuid
+from io import BytesIO
+
+from flask import (
+    Blueprint, current_app, render_template, send_file, request, redirect, session, url_for,
+    flash, jsonify,
+)
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import selectinload
+
+from backend.models import db, Pedido, PedidoCupcake
+from backend.auth import login_required, admin_required
+from backend.query_budget import limite_queries
+from backend.pagination import pagina_por_chave, decodificar_cursor
+from backend.catalog import catalogo
+from backend.checkout import criar_pedido, link_whatsapp, CupcakesIndisponiveis
+from backend.pdf_cache import pdfs
+from backend.http_cache import etag_de, nao_modificado, com_etag, versao_pedido
+from backend.cart import carrinho_atual, salvar_carrinho
+
+
+bp = Blueprint("pedidos", __name__)
+
+
+def chave_checkout():
+    """Token de idempotência do carrinho atual (renovado depois de cada pedido gravado)"""
+    if "chave_checkout" not in session:
+        session["chave_checkout"] = uuid.uuid4().hex
+    return session["chave_checkout"]
+
+
+# =================== PEDIDOS (salvo no banco) ===================
+
+def gravar_pedido(carrinho):
+    """
+    criar_pedido() com as mensagens para o cliente. Devolve (PedidoGravado, itens)
+    ou None se o pedido não foi gravado (o motivo já vai no flash).
+
+    O token do formulário (emitido em /carrinho) torna o envio idempotente:
+    um segundo POST com o mesmo token devolve o pedido já gravado.
+    """
+    chave = request.form.get("chave_checkout") or None
+    try:
+        resultado = criar_pedido(session["usuario_id"], carrinho, chave)
+        if chave and session.get("chave_checkout") == chave:
+            session.pop("chave_checkout")
+        return resultado
+    except CupcakesIndisponiveis as e:
+        # tira do carrinho o que não pode mais ser vendido e devolve o cliente para revisar
+        salvar_carrinho({k: v for k, v in carrinho.items() if int(k) not in e.ids})
+        flash(f"{e}. Eles foram removidos do carrinho.", "warning")
+    except ValueError as e:
+        flash(str(e), "warning")
+    except SQLAlchemyError:
+        current_app.logger.exception("Falha ao gravar o pedido")
+        flash("Não foi possível finalizar o pedido. Tente novamente.", "danger")
+    return None
+
+
+@bp.route("/finalizar_pedido", methods=["POST"])
+@login_required
+@limite_queries(7)
+def finalizar_pedido():
+    carrinho = carrinho_atual()
+
+    # 1) Pedido, itens e log numa única transação (ou o pedido já gravado com o mesmo token)
+    resultado = gravar_pedido(carrinho)
+    if resultado is None:
+        return redirect(url_for("carrinho.carrinho"))
+    pedido, itens = resultado
+
+    # 2) Limpar carrinho
+    salvar_carrinho({})
+
+    # 3) WhatsApp automático (aberto pelo pedido.html)
+    session["whatsapp_url"] = link_whatsapp(pedido, itens)
+
+    flash("Pedido realizado com sucesso! 🧁", "success")
+    return redirect(url_for("pedidos.pedido"))
+
+
+# inicio rota pedido    -------------------
+
+POR_PAGINA_HISTORICO = 10
+
+
+def pagina_historico(user_id, cursor=None):
+    """Uma página do histórico do cliente (paginação por data_pedido) com itens pré-carregados"""
+    query = Pedido.query.filter_by(usuario_id=user_id, finalizado=True) \
+        .options(selectinload(Pedido.itens).selectinload(PedidoCupcake.cupcake))
+
+    pedidos, proximo = pagina_por_chave(
+        query, Pedido.data_pedido, Pedido.id, cursor, POR_PAGINA_HISTORICO
+    )
+
+    historico = []
+    for p in pedidos:
+        itens = []
+
+        for item in p.itens:
+            itens.append({
+                "cupcake": item.cupcake,
+                "quantidade": item.quantidade,
+                "preco_unitario": item.preco_unitario or 0,
+                "subtotal": item.subtotal
+            })
+
+        historico.append({
+            "pedido_id": p.id,
+            "data": p.data_pedido,
+            "status": p.status,
+            "itens": itens,
+            "total": p.total or 0,
+            "avaliacao": p.avaliacao
+        })
+
+    return historico, proximo
+
+
+@bp.route("/pedido")
+@login_required
+@limite_queries(4)
+def pedido():
+    user_id = session["usuario_id"]
+
+    # 1) HISTÓRICO DE PEDIDOS FINALIZADOS (primeira página; as demais vêm de /api/pedidos)
+    historico, proximo = pagina_historico(user_id)
+
+
+    # 2) PEDIDO EM ABERTO (finalizado=False)
+
+    pedido_aberto = Pedido.query.filter_by(usuario_id=user_id, finalizado=False) \
+        .options(selectinload(Pedido.itens).selectinload(PedidoCupcake.cupcake)).first()
+
+    pedido_itens = []
+    total = 0
+
+    if pedido_aberto:
+        for item in pedido_aberto.itens:
+            pedido_itens.append({
+                "cupcake": item.cupcake,
+                "quantidade": item.quantidade,
+                "subtotal": item.subtotal
+            })
+            total += item.subtotal
+
+    
+    # 3) RENDERIZAÇÃO FINAL
+  
+    return render_template(
+        "pedido.html",
+        historico=historico,
+        proximo=proximo,
+        pedido_itens=pedido_itens,
+        total=total
+    )
+
+
+@bp.route("/api/pedidos")
+@login_required
+@limite_queries(3)
+def api_pedidos():
+    """Próximas páginas do histórico (rolagem infinita em pedido.html)"""
+    cursor = decodificar_cursor(request.args.get("cursor"))
+    if request.args.get("cursor") and not cursor:
+        return jsonify({"erro": "Cursor inválido"}), 400
+
+    historico, proximo = pagina_historico(session["usuario_id"], cursor)
+
+    return jsonify({
+        "pedidos": [
+            {
+                "id": p["pedido_id"],
+                "data": p["data"].isoformat() if p["data"] else None,
+                "status": p["status"],
+                "total": p["total"],
+                "avaliacao": p["avaliacao"],
+                "itens": [
+                    {
+                        "cupcake": item["cupcake"].nome if item["cupcake"] else None,
+                        "quantidade": item["quantidade"],
+                        "preco_unitario": item["preco_unitario"],
+                        "subtotal": item["subtotal"],
+                    }
+                    for item in p["itens"]
+                ],
+            }
+            for p in historico
+        ],
+        "html": render_template("partials/_pedidos_historico.html", historico=historico),
+        "proximo": url_for("pedidos.api_pedidos", cursor=proximo) if proximo else None,
+    })
+
+
+#rota finalizar pedido
+
+@bp.route("/checkout/finalizar", methods=["POST"])
+@login_required
+def checkout_finalizar():
+    carrinho = carrinho_atual()
+
+    resultado = gravar_pedido(carrinho)
+    if resultado is None:
+        return redirect(url_for("carrinho.carrinho"))
+    pedido, _ = resultado
+
+    # limpar carrinho
+    salvar_carrinho({})
+
+    flash("Pedido realizado com sucesso! 🎉", "success")
+    return redirect(url_for("pedidos.checkout_sucesso", pedido_id=pedido.id))
+
+#rota sucesso checkout
+
+@bp.route("/checkout/sucesso/<int:pedido_id>")
+@login_required
+def checkout_sucesso(pedido_id):
+    pedido = (
+        Pedido.query
+        .options(selectinload(Pedido.itens).selectinload(PedidoCupcake.cupcake))
+        .filter_by(id=pedido_id)
+        .first_or_404()
+    )
+
+    return render_template("checkout_sucesso.html", pedido=pedido, total=pedido.total or 0)
+
+
+#rota remover pedido
+
+@bp.route("/remover_pedido/<int:pedido_id>")
+@login_required
+@admin_required  # <- só admin pode usar
+def remover_pedido(pedido_id):
+    pedido = Pedido.query.filter_by(id=pedido_id, usuario_id=session["usuario_id"]).first()
+
+    if not pedido:
+        flash("Pedido não encontrado.", "danger")
+        return redirect(url_for("pedidos.pedido"))
+
+    # Remove também os itens ligados ao pedido
+    for item in pedido.itens:
+        db.session.delete(item)
+
+    db.session.delete(pedido)
+    db.session.commit()
+
+    flash("Pedido removido com sucesso!", "info")
+    return redirect(url_for("pedidos.pedido"))
+
+#rota repetir pedido    
+
+@bp.route("/repetir_pedido/<int:pedido_id>")
+@login_required
+@limite_queries(5)
+def repetir_pedido(pedido_id):
+
+    pedido = Pedido.query.filter_by(id=pedido_id, usuario_id=session["usuario_id"]).first()
+
+    if not pedido:
+        flash("Pedido não encontrado.", "danger")
+        return redirect(url_for("pedidos.pedido"))
+
+    carrinho = carrinho_atual()
+
+    for item in pedido.itens:
+        cid = str(item.cupcake_id)
+        carrinho[cid] = carrinho.get(cid, 0) + item.quantidade
+
+    salvar_carrinho(carrinho)
+    flash("Itens adicionados ao carrinho novamente!", "success")
+    return redirect(url_for("pedidos.pedido"))
+
+
+# rota gerar PDF do pedido
+
+@bp.route("/pedido/pdf/<int:pedido_id>")
+@login_required
+@limite_queries(6)
+def pedido_pdf(pedido_id):
+
+    # Se for admin, pode buscar qualquer pedido; cliente comum só o dele
+    usuario_id = None if session.get("is_admin") else session.get("usuario_id")
+    versao = versao_pedido(pedido_id, usuario_id)
+
+    if versao is None:
+        flash("Pedido não encontrado.", "danger")
+        # Admin volta pro painel, cliente volta pra tela de pedidos dele
+        return redirect(url_for("admin.admin_dashboard") if session.get("is_admin") else url_for("pedidos.pedido"))
+
+    # A mesma versão (status, avaliação, último log) serve de ETag e de chave do cache em disco
+    etag = etag_de("pdf", pedido_id, *versao, catalogo.versao_atual())
+    nao_mudou = nao_modificado(etag)
+    if nao_mudou:
+        return nao_mudou
+
+    arquivo = pdfs.abrir(pedido_id, etag)
+    if arquivo is None:
+        dados = gerar_pdf_pedido(pedido_id)
+        pdfs.salvar(pedido_id, etag, dados)
+        # outro worker pode ter limpado o cache entre o salvar e o abrir: usa os bytes gerados
+        arquivo = pdfs.abrir(pedido_id, etag) or BytesIO(dados)
+
+    # send_file com o arquivo aberto: o servidor WSGI usa sendfile quando disponível
+    resp = send_file(
+        arquivo,
+        mimetype="application/pdf",
+        download_name=f"pedido_{pedido_id}.pdf",
+        conditional=False,
+        etag=False,
+    )
+    return com_etag(resp, etag)
+
+
+def gerar_pdf_pedido(pedido_id):
+    """Bytes do PDF do pedido (só chamado quando a versão atual não está no cache)"""
+    pedido = Pedido.query.options(
+        selectinload(Pedido.usuario),
+        selectinload(Pedido.itens).selectinload(PedidoCupcake.cupcake),
+    ).filter_by(id=pedido_id).one()
+
+    # === GERAR PDF ===
+    from fpdf import FPDF
+    from fpdf.enums import XPos, YPos
+
+    QUEBRA = {"new_x": XPos.LMARGIN, "new_y": YPos.NEXT}   # o antigo ln=True
+
+    pdf = FPDF()
+    pdf.add_page()
+    pdf.set_auto_page_break(auto=True, margin=15)
+    pdf.set_font("helvetica", "B", 16)
+    pdf.cell(0, 10, f"Pedido #{pedido.id}", **QUEBRA, align="C")
+    pdf.ln(4)
+
+    pdf.set_font("helvetica", size=12)
+    pdf.cell(0, 6, f"Cliente: {pedido.usuario.nome}", **QUEBRA)
+    pdf.cell(0, 6, f"E-mail: {pedido.usuario.email}", **QUEBRA)
+    pdf.cell(0, 6, f"Data: {pedido.data_pedido.strftime('%d/%m/%Y %H:%M')}", **QUEBRA)
+    pdf.cell(0, 6, f"Status: {pedido.status}", **QUEBRA)
+    pdf.ln(6)
+
+    pdf.set_font("helvetica", "B", 12)
+    pdf.cell(80, 8, "Item", 1)
+    pdf.cell(25, 8, "Qtd", 1, align="C")
+    pdf.cell(40, 8, "Unitário", 1, align="C")
+    pdf.cell(40, 8, "Subtotal", 1, align="C", **QUEBRA)
+
+    pdf.set_font("helvetica", size=11)
+
+    for item in pedido.itens:
+        pdf.cell(80, 8, item.cupcake.nome, 1)
+        pdf.cell(25, 8, str(item.quantidade), 1, align="C")
+        pdf.cell(40, 8, f"R$ {(item.preco_unitario or 0):.2f}", 1, align="C")
+        pdf.cell(40, 8, f"R$ {item.subtotal:.2f}", 1, align="C", **QUEBRA)
+
+    total = pedido.total or 0
+
+    pdf.ln(5)
+    pdf.set_font("helvetica", "B", 12)
+    pdf.cell(0, 8, f"Total: R$ {total:.2f}", **QUEBRA, align="R")
+
+    return bytes(pdf.output())  # bytearray do fpdf2 -> bytes
+
+
+# Avaliar pedido
+
+@bp.route("/avaliar_pedido/<int:pedido_id>", methods=["POST"])
+@login_required
+def avaliar_pedido(pedido_id):
+    pedido = Pedido.query.get_or_404(pedido_id)
+
+    # Pedido deve ser do usuário
+    if pedido.usuario_id != session.get("usuario_id"):
+        return "Acesso negado", 403
+
+    # Só pode avaliar pedidos entregues
+    if pedido.status != "Entregue":
+        flash("O pedido ainda não pode ser avaliado.", "warning")
+        return redirect(url_for("pedidos.pedido"))
+
+    # Se já tem avaliação, não permite avaliar novamente
+    if pedido.avaliacao is not None:
+        flash("Este pedido já foi avaliado.", "info")
+        return redirect(url_for("pedidos.pedido"))
+
+    nota = request.form.get("avaliacao", type=int)
+
+    if nota and 1 <= nota <= 5:
+        pedido.avaliacao = nota
+        db.session.commit()
+        flash("Obrigado pela avaliação! 🤗", "success")
+
+    return redirect(url_for("pedidos.pedido"))
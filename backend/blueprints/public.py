@@ -0,0 +1,201 @@
+import re
+
+from flask import Blueprint, render_template, request, redirect, session, url_for, flash, make_response
+from werkzeug.security import generate_password_hash, check_password_hash
+
+from backend.models import db, Usuario
+from backend.auth import login_required
+from backend.query_budget import limite_queries
+from backend.catalog import catalogo
+from backend.search import buscar_ids, filtrar_em_memoria
+from backend.http_cache import etag_pagina, nao_modificado, com_etag
+from backend.cart import mesclar_carrinho_anonimo
+
+
+bp = Blueprint("publico", __name__)
+
+
+# =================== Rotas públicas ===================
+
+@bp.route("/")
+def index():
+    return redirect(url_for("publico.vitrine"))
+
+@bp.route("/vitrine")
+@limite_queries(1)
+def vitrine():
+    # Só cupcakes ativos na vitrine (cache em memória, sem query se o catálogo não mudou)
+    etag = etag_pagina("vitrine", catalogo.versao_atual())
+    nao_mudou = nao_modificado(etag)
+    if nao_mudou:
+        return nao_mudou
+
+    cupcakes = catalogo.obter()
+    return com_etag(make_response(render_template("vitrine.html", cupcakes=cupcakes)), etag)
+
+
+#rota login=================
+
+
+@bp.route("/login", methods=["GET", "POST"])
+def login():
+    if request.method == "POST":
+        email = request.form["email"]
+        senha = request.form["senha"]
+
+        usuario = Usuario.query.filter_by(email=email).first()
+        if usuario and check_password_hash(usuario.senha, senha):
+
+            # ✅ Dados salvos na sessão
+            session["usuario_id"] = usuario.id
+            session["usuario_nome"] = usuario.nome
+            session["usuario_email"] = usuario.email
+            session["is_admin"] = usuario.is_admin  
+
+            # carrinho montado antes do login vai para o carrinho do usuário
+            mesclar_carrinho_anonimo(usuario.id)
+            flash("Login realizado com sucesso!", "success")
+            return redirect(url_for("publico.home"))
+
+        flash("Email ou senha inválidos", "danger")
+
+    return render_template("login.html")
+
+
+#rota cadastro=================
+
+@bp.route("/cadastro")
+def cadastro():
+    return render_template("cadastro.html")
+
+
+@bp.route("/cadastrar", methods=["POST"])
+def cadastrar():
+    nome = request.form["nome"]
+    email = request.form["email"]
+    senha = request.form["senha"]
+    telefone = request.form.get("telefone")
+
+    # ------- VALIDAÇÃO DO TELEFONE -------
+    padrao_tel = r"^\(\d{2}\)\s?\d{4,5}-\d{4}$"
+    if not re.match(padrao_tel, telefone or ""):
+        flash("Telefone inválido! Use o formato (11) 98765-4321", "danger")
+        return redirect(url_for("publico.cadastro"))
+    # -------------------------------------
+
+    # verifica duplicidade de email
+    if Usuario.query.filter_by(email=email).first():
+        flash("Email já cadastrado!", "danger")
+        return redirect(url_for("publico.cadastro"))
+
+    novo = Usuario(
+        nome=nome,
+        email=email,
+        senha=generate_password_hash(senha),
+        telefone=telefone
+    )
+
+    db.session.add(novo)
+    db.session.commit()
+
+    flash("Cadastro realizado com sucesso!", "success")
+    return redirect(url_for("publico.login"))
+
+
+@bp.route("/logout")
+def logout():
+    session.clear()
+    flash("Logout realizado com sucesso.", "info")
+    return redirect(url_for("publico.vitrine"))
+
+
+# =================== Área do usuário ===================
+
+@bp.route("/home")
+@login_required
+def home():
+    return render_template("home.html", nome=session["usuario_nome"])
+
+
+@bp.route("/buscar_cupcakes")
+@limite_queries(2)
+def buscar_cupcakes():
+    termo = request.args.get("q", "").strip()
+
+    etag = etag_pagina("busca", termo, catalogo.versao_atual())
+    nao_mudou = nao_modificado(etag)
+    if nao_mudou:
+        return nao_mudou
+
+    # Catálogo em cache (somente cupcakes ativos); a busca só devolve os IDs por relevância
+    resultados = catalogo.obter()
+    if termo:
+        ids = buscar_ids(termo)
+        if ids is None:
+            resultados = filtrar_em_memoria(resultados, termo)
+        else:
+            por_id = {c.id: c for c in resultados}
+            resultados = [por_id[i] for i in ids if i in por_id]
+
+    return com_etag(make_response(render_template("partials/_lista_cupcakes.html", cupcakes=resultados)), etag)
+
+
+@bp.route("/esqueci_senha")
+def esqueci_senha():
+    telefone = "5511948083862"  # número da loja / suporte
+
+    mensagem = (
+        "Olá!%0A"
+        "Eu gostaria de redefinir minha senha no aplicativo de Cupcakes.%0A"
+        "Por favor, me ajude com o procedimento.%0A"
+        "Obrigado! 😊"
+    )
+
+    whatsapp_url = f"https://wa.me/{telefone}?text={mensagem}"
+
+    return redirect(whatsapp_url)
+
+@bp.route("/perfil/editar", methods=["GET", "POST"])
+@login_required
+def editar_perfil():
+    usuario = Usuario.query.get_or_404(session["usuario_id"])
+
+    if request.method == "POST":
+        novo_email = request.form["email"]
+
+        # 🔎 Verificar se o e-mail já pertence a outro usuário
+        email_existente = Usuario.query.filter_by(email=novo_email).first()
+        if email_existente and email_existente.id != usuario.id:
+            flash("Este e-mail já está sendo utilizado por outro usuário.", "danger")
+            return redirect(url_for("publico.editar_perfil"))
+
+        # ✔ Atualiza nome e email
+        usuario.nome = request.form["nome"]
+        usuario.email = novo_email
+        usuario.telefone = request.form.get("telefone")
+
+        # ✔ Atualiza senha apenas se foi preenchida
+        nova_senha = request.form.get("senha")
+        if nova_senha:
+            usuario.senha = generate_password_hash(nova_senha)
+
+        db.session.commit()
+        flash("Perfil atualizado com sucesso!", "success")
+        return redirect(url_for("publico.home"))  # ou vitrine/pedidos, como preferir
+
+    return render_template("editar_perfil.html", usuario=usuario)
+
+
+@bp.route("/fale_conosco")
+def fale_conosco():
+    telefone = "5511948083862"  # número da loja / suporte
+
+    mensagem = (
+        "Olá!%0A"
+        "Preciso de ajuda com minha compra ou tenho uma dúvida sobre os cupcakes.%0A"
+        "Poderiam me atender, por favor? 😊"
+    )
+
+    whatsapp_url = f"https://wa.me/{telefone}?text={mensagem}"
+
+    return redirect(whatsapp_url)
@@ -0,0 +1,218 @@
+import hashlib
+import json
+import os
+import secrets
+import threading
+from collections import OrderedDict
+from datetime import datetime, timedelta
+
+from flask import session
+
+from backend.models import db, Carrinho
+from backend.catalog import catalogo
+
+
+# memoria: LRU no próprio processo (desenvolvimento / um único worker)
+# banco:   tabela carrinhos, compartilhada entre os workers do gunicorn
+BACKEND = os.environ.get("CARRINHO_BACKEND", "banco")
+VALIDADE = timedelta(days=int(os.environ.get("CARRINHO_VALIDADE_DIAS", "7")))
+MAXIMO_EM_MEMORIA = int(os.environ.get("CARRINHO_MAXIMO_EM_MEMORIA", "10000"))
+
+QUANTIDADE_MAXIMA = 99       # por cupcake
+ALTERACOES_POR_LOTE = 50     # limite de um POST /api/carrinho
+
+
+# =================== Armazenamentos ===================
+
+class CarrinhoMemoria:
+    """
+    Carrinhos num OrderedDict em ordem de uso (LRU). Passando de `maximo`
+    o menos usado sai; carrinhos sem uso há mais de `validade` expiram.
+    """
+
+    def __init__(self, validade, maximo):
+        self.validade = validade
+        self.maximo = maximo
+        self.carrinhos = OrderedDict()   # id -> (última alteração, itens)
+        self.lock = threading.Lock()
+
+    def _expirado(self, alterado_em):
+        return datetime.utcnow() - alterado_em > self.validade
+
+    def obter(self, carrinho_id):
+        with self.lock:
+            registro = self.carrinhos.get(carrinho_id)
+            if registro is None:
+                return {}
+            if self._expirado(registro[0]):
+                del self.carrinhos[carrinho_id]
+                return {}
+            self.carrinhos.move_to_end(carrinho_id)
+            return dict(registro[1])
+
+    def salvar(self, carrinho_id, itens):
+        with self.lock:
+            if not itens:
+                self.carrinhos.pop(carrinho_id, None)
+                return
+            self.carrinhos[carrinho_id] = (datetime.utcnow(), dict(itens))
+            self.carrinhos.move_to_end(carrinho_id)
+            while len(self.carrinhos) > self.maximo:
+                self.carrinhos.popitem(last=False)
+
+    def remover(self, carrinho_id):
+        with self.lock:
+            self.carrinhos.pop(carrinho_id, None)
+
+    def limpar_expirados(self):
+        with self.lock:
+            vencidos = [cid for cid, (alterado_em, _) in self.carrinhos.items() if self._expirado(alterado_em)]
+            for cid in vencidos:
+                del self.carrinhos[cid]
+        return len(vencidos)
+
+
+class CarrinhoBanco:
+    """Carrinhos na tabela carrinhos (JSON), visíveis para todos os workers"""
+
+    def __init__(self, validade):
+        self.validade = validade
+
+    def obter(self, carrinho_id):
+        registro = db.session.get(Carrinho, carrinho_id)
+        if registro is None or datetime.utcnow() - registro.atualizado_em > self.validade:
+            return {}
+        return json.loads(registro.itens)
+
+    def salvar(self, carrinho_id, itens):
+        if not itens:
+            self.remover(carrinho_id)
+            return
+        db.session.merge(Carrinho(id=carrinho_id, itens=json.dumps(itens), atualizado_em=datetime.utcnow()))
+        db.session.commit()
+
+    def remover(self, carrinho_id):
+        Carrinho.query.filter_by(id=carrinho_id).delete(synchronize_session=False)
+        db.session.commit()
+
+    def limpar_expirados(self):
+        removidos = Carrinho.query.filter(
+            Carrinho.atualizado_em < datetime.utcnow() - self.validade
+        ).delete(synchronize_session=False)
+        db.session.commit()
+        return removidos
+
+
+def criar_armazenamento(backend=BACKEND):
+    if backend == "memoria":
+        return CarrinhoMemoria(VALIDADE, MAXIMO_EM_MEMORIA)
+    if backend == "banco":
+        return CarrinhoBanco(VALIDADE)
+    raise ValueError(f"CARRINHO_BACKEND inválido: {backend}")
+
+
+carrinhos = criar_armazenamento()
+
+
+# =================== Carrinho da sessão atual ===================
+
+def id_do_carrinho():
+    """
+    Id do carrinho de quem está navegando: fixo por usuário quando logado,
+    aleatório (guardado na sessão) para visitantes. O cookie só leva esse id.
+    """
+    if "usuario_id" in session:
+        return f"u{session['usuario_id']}"
+    if "carrinho_id" not in session:
+        session["carrinho_id"] = secrets.token_urlsafe(9)
+    return session["carrinho_id"]
+
+
+def carrinho_atual():
+    """Itens do carrinho atual: {str(cupcake_id): quantidade}"""
+    return carrinhos.obter(id_do_carrinho())
+
+
+def salvar_carrinho(itens):
+    carrinhos.salvar(id_do_carrinho(), itens)
+
+
+def revisao_carrinho(itens):
+    """Revisão do carrinho derivada do conteúdo: mesmos itens, mesma revisão (para ETag)"""
+    return hashlib.sha1(json.dumps(itens, sort_keys=True).encode()).hexdigest()[:12]
+
+
+def mesclar_carrinho_anonimo(usuario_id):
+    """No login: soma o carrinho do visitante ao carrinho do usuário"""
+    anonimo_id = session.pop("carrinho_id", None)
+    if not anonimo_id:
+        return
+
+    anonimo = carrinhos.obter(anonimo_id)
+    if anonimo:
+        destino = f"u{usuario_id}"
+        itens = carrinhos.obter(destino)
+        for cid, qtd in anonimo.items():
+            itens[cid] = min(itens.get(cid, 0) + qtd, QUANTIDADE_MAXIMA)
+        carrinhos.salvar(destino, itens)
+    carrinhos.remover(anonimo_id)
+
+
+# =================== Alterações em lote (API JSON) ===================
+
+def aplicar_alteracoes(carrinho, alteracoes):
+    """
+    Aplica uma lista de alterações ao carrinho (em memória, sem gravar):
+      {"id": 3, "delta": 2}       soma (ou subtrai, se negativo) à quantidade
+      {"id": 3, "quantidade": 0}  define a quantidade (0 remove o item)
+    Só cupcakes ativos do catálogo podem entrar no carrinho.
+    Devolve (carrinho, erros) com uma mensagem por alteração ignorada.
+    """
+    ativos = {c.id for c in catalogo.obter()}
+    erros = []
+
+    for alteracao in alteracoes:
+        try:
+            cid = int(alteracao["id"])
+            if "quantidade" in alteracao:
+                nova = int(alteracao["quantidade"])
+            else:
+                nova = carrinho.get(str(cid), 0) + int(alteracao.get("delta", 0))
+        except (KeyError, TypeError, ValueError):
+            erros.append(f"Alteração inválida: {alteracao!r}")
+            continue
+
+        chave = str(cid)
+        if nova <= 0:
+            carrinho.pop(chave, None)
+        elif cid not in ativos:
+            erros.append(f"Cupcake #{cid} não está disponível.")
+        else:
+            carrinho[chave] = min(nova, QUANTIDADE_MAXIMA)
+
+    return carrinho, erros
+
+
+def resumo_carrinho(carrinho):
+    """Linhas (com subtotal) e totais do carrinho, com preços do catálogo em cache (sem query)"""
+    por_id = {c.id: c for c in catalogo.obter()}
+    linhas = []
+
+    for chave, qtd in carrinho.items():
+        cupcake = por_id.get(int(chave))
+        if cupcake is None:
+            continue
+        linhas.append({
+            "id": cupcake.id,
+            "nome": cupcake.nome,
+            "preco": float(cupcake.preco),
+            "imagem_url": cupcake.imagem_url,
+            "quantidade": int(qtd),
+            "subtotal": float(cupcake.preco) * int(qtd),
+        })
+
+    return {
+        "itens": linhas,
+        "total": sum(l["subtotal"] for l in linhas),
+        "quantidade": sum(l["quantidade"] for l in linhas),
+    }
@@ -0,0 +1,94 @@
+import os
+import tempfile
+import threading
+import time
+from collections import namedtuple
+
+from backend.models import Cupcake
+
+
+# Arquivo compartilhado entre os workers do gunicorn com a versão do catálogo.
+# Em produção o gunicorn_conf exige a variável; o padrão em /tmp serve ao
+# desenvolvimento e aos scripts.
+ARQUIVO_VERSAO = os.environ.get(
+    "CATALOGO_VERSAO_ARQUIVO", os.path.join(tempfile.gettempdir(), "cupcake_catalogo.versao")
+)
+
+# Cópia imutável de um cupcake ativo, usada pelos templates da vitrine
+CupcakeVitrine = namedtuple("CupcakeVitrine", "id nome descricao preco imagem_url")
+
+
+class CacheCatalogo:
+    """
+    Cache em memória (por processo) dos cupcakes ativos.
+
+    A versão fica num arquivo compartilhado: as rotas do admin gravam uma nova
+    versão e cada worker só confere o arquivo com um os.stat() por acesso.
+    Enquanto nada muda, a vitrine é servida sem nenhuma query.
+
+    Sem o arquivo (primeira subida, reboot que limpou o /tmp) uma versão nova
+    é gravada na hora: recomeçar do 0 repetiria um número que um cliente já
+    guardou no ETag, com outro catálogo por trás.
+    """
+
+    def __init__(self, arquivo_versao):
+        self.arquivo_versao = arquivo_versao
+        self.assinatura = None   # (inode, mtime) do arquivo na última leitura
+        self.versao = 0
+        self.cupcakes = None
+        self.lock = threading.Lock()
+
+    def _assinatura(self):
+        try:
+            st = os.stat(self.arquivo_versao)
+        except FileNotFoundError:
+            return None
+        return (st.st_ino, st.st_mtime_ns)
+
+    def _ler_versao(self):
+        try:
+            with open(self.arquivo_versao) as f:
+                return int(f.read().strip() or 0)
+        except (FileNotFoundError, ValueError):
+            return 0
+
+    def obter(self):
+        """Tupla de CupcakeVitrine ativos; recarrega do banco só se a versão mudou"""
+        assinatura = self._assinatura()
+        if assinatura is None:
+            self.invalidar()
+            assinatura = self._assinatura()
+        if self.cupcakes is not None and assinatura == self.assinatura:
+            return self.cupcakes
+
+        with self.lock:
+            if self.cupcakes is None or assinatura != self.assinatura:
+                versao = self._ler_versao()
+                self.cupcakes = tuple(
+                    CupcakeVitrine(c.id, c.nome, c.descricao, c.preco, c.imagem_url)
+                    for c in Cupcake.query.filter_by(ativo=True).order_by(Cupcake.id).all()
+                )
+                self.versao = versao
+                self.assinatura = assinatura
+
+        return self.cupcakes
+
+    def versao_atual(self):
+        self.obter()
+        return self.versao
+
+    def invalidar(self):
+        """
+        Grava uma versão nova (chamar depois do commit de qualquer alteração de
+        cupcake). A versão é o relógio em nanossegundos, não o valor lido + 1:
+        dois workers invalidando ao mesmo tempo não gravam o mesmo número, e
+        uma versão nunca se repete para catálogos diferentes (ela entra nos ETags).
+        """
+        nova = max(time.time_ns(), self._ler_versao() + 1)   # relógio voltou: continua crescendo
+        temporario = f"{self.arquivo_versao}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(temporario, "w") as f:
+            f.write(str(nova))
+        os.replace(temporario, self.arquivo_versao)  # novo inode: os outros workers percebem
+
+
+catalogo = CacheCatalogo(ARQUIVO_VERSAO)
@@ -0,0 +1,141 @@
+from collections import namedtuple
+
+from sqlalchemy import insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import selectinload
+
+from backend.models import db, Cupcake, Pedido, PedidoCupcake, PedidoStatusLog
+
+
+TELEFONE_LOJA = "5511948083862"
+
+# O que as rotas usam do pedido gravado, copiado antes do commit: ler pedido.id
+# depois do commit (expire_on_commit) faria mais um SELECT só para recarregá-lo
+PedidoGravado = namedtuple("PedidoGravado", "id total")
+
+
+class CupcakesIndisponiveis(ValueError):
+    """Carrinho com cupcakes inativos ou removidos do catálogo"""
+
+    def __init__(self, ids, nomes):
+        self.ids = ids
+        self.nomes = nomes
+        super().__init__("Alguns cupcakes não estão mais disponíveis: " + ", ".join(nomes))
+
+
+def criar_pedido(usuario_id, carrinho, chave=None):
+    """
+    Grava o pedido do carrinho {str(cupcake_id): quantidade} numa única transação:
+    uma query IN para os cupcakes, o pedido + log de status num flush e os itens
+    num INSERT em lote. O número de idas ao banco não depende do tamanho do
+    carrinho e, se algo falhar no meio, nada fica gravado.
+
+    chave: token de idempotência do carrinho. Se já existe pedido com essa
+    chave (duplo clique, reenvio do navegador), ele é devolvido sem gravar de novo.
+
+    Devolve (PedidoGravado, itens) com os itens já montados em memória
+    (nome, quantidade, preço unitário e subtotal).
+    """
+    if chave:
+        existente = pedido_da_chave(usuario_id, chave)
+        if existente:
+            return existente
+
+    quantidades = {int(cid): int(qtd) for cid, qtd in carrinho.items() if int(qtd) > 0}
+    if not quantidades:
+        raise ValueError("Carrinho vazio!")
+
+    cupcakes = {c.id: c for c in Cupcake.query.filter(Cupcake.id.in_(list(quantidades))).all()}
+
+    indisponiveis = [cid for cid in quantidades if cid not in cupcakes or not cupcakes[cid].ativo]
+    if indisponiveis:
+        nomes = [cupcakes[cid].nome if cid in cupcakes else f"#{cid}" for cid in indisponiveis]
+        raise CupcakesIndisponiveis(indisponiveis, nomes)
+
+    itens = [
+        {
+            "cupcake_id": cid,
+            "nome": cupcakes[cid].nome,
+            "quantidade": qtd,
+            "preco_unitario": cupcakes[cid].preco,  # congela o preço da compra
+            "subtotal": cupcakes[cid].preco * qtd,
+        }
+        for cid, qtd in quantidades.items()
+    ]
+
+    try:
+        pedido = Pedido(
+            usuario_id=usuario_id,
+            finalizado=True,
+            status="Recebido",
+            total=sum(item["subtotal"] for item in itens),
+            chave_idempotencia=chave,
+        )
+        db.session.add(pedido)
+        db.session.add(PedidoStatusLog(pedido=pedido, status="Recebido"))
+        db.session.flush()  # INSERT do pedido e do log; gera pedido.id
+
+        db.session.execute(insert(PedidoCupcake), [
+            {
+                "pedido_id": pedido.id,
+                "cupcake_id": item["cupcake_id"],
+                "quantidade": item["quantidade"],
+                "preco_unitario": item["preco_unitario"],
+            }
+            for item in itens
+        ])
+
+        gravado = PedidoGravado(pedido.id, pedido.total)
+        db.session.commit()
+    except IntegrityError:
+        db.session.rollback()
+        # Outra requisição com a mesma chave gravou primeiro (a UNIQUE barrou esta)
+        existente = pedido_da_chave(usuario_id, chave) if chave else None
+        if existente is None:
+            raise
+        return existente
+    except Exception:
+        db.session.rollback()
+        raise
+
+    return gravado, itens
+
+
+def pedido_da_chave(usuario_id, chave):
+    """(PedidoGravado, itens) do pedido já gravado com essa chave de idempotência, ou None"""
+    pedido = (
+        Pedido.query
+        .options(selectinload(Pedido.itens).selectinload(PedidoCupcake.cupcake))
+        .filter_by(usuario_id=usuario_id, chave_idempotencia=chave)
+        .first()
+    )
+    if pedido is None:
+        return None
+
+    itens = [
+        {
+            "cupcake_id": item.cupcake_id,
+            "nome": item.cupcake.nome if item.cupcake else "Item removido",
+            "quantidade": item.quantidade,
+            "preco_unitario": item.preco_unitario or 0,
+            "subtotal": item.subtotal,
+        }
+        for item in pedido.itens
+    ]
+    return PedidoGravado(pedido.id, pedido.total), itens
+
+
+def link_whatsapp(pedido, itens):
+    """
+    Link do WhatsApp da loja com o resumo do pedido. Recebe o PedidoGravado e
+    os itens devolvidos por criar_pedido(): nada aqui consulta o banco.
+    """
+    mensagem = f"Olá! Gostaria de confirmar meu pedido nº {pedido.id}:%0A%0A"
+
+    for item in itens:
+        mensagem += f"- {item['nome']} (x{item['quantidade']}): R$ {item['subtotal']:.2f}%0A"
+
+    mensagem += f"%0A*Total:* R$ {pedido.total:.2f}%0A"
+    mensagem += "%0APor favor, me envie o endereço de entrega e a forma de pagamento."
+
+    return f"https://wa.me/{TELEFONE_LOJA}?text={mensagem}"
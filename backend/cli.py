@@ -0,0 +1,18 @@
+"""
+App da linha de comando: a mesma do site, com o Flask-Migrate registrado.
+
+Uso: flask --app backend.cli db upgrade
+
+O Flask-Migrate (e o Alembic) ficam fora de backend/app.py para não pesar
+no boot de cada worker do gunicorn, que nunca roda migrações.
+"""
+import os
+
+from flask_migrate import Migrate
+
+from backend.app import app
+from backend.models import db
+
+
+# Migrações do banco (Alembic) em backend/migrations
+migrate = Migrate(app, db, directory=os.path.join(os.path.dirname(__file__), "migrations"))
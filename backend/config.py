@@ -0,0 +1,63 @@
+import os
+
+
+def _inteiro(nome, padrao):
+    return int(os.environ.get(nome, padrao))
+
+
+# =================== Servidor (backend/gunicorn_conf.py) ===================
+
+CPUS = os.cpu_count() or 1
+WORKERS = _inteiro("WEB_CONCURRENCY", 2 * CPUS + 1)    # processos do gunicorn
+THREADS = _inteiro("GUNICORN_THREADS", 4)              # threads por processo (gthread)
+
+
+# =================== Banco ===================
+
+def url_do_banco():
+    """
+    DATABASE_URL do Render ("postgres://...") no formato do SQLAlchemy. Sem
+    driver explícito usamos o psycopg2 do requirements.txt (o padrão do
+    SQLAlchemy 2.1 para "postgresql://" é o psycopg 3).
+    """
+    url = os.environ.get("DATABASE_URL", "sqlite:///cupcake.db")
+    for prefixo in ("postgres://", "postgresql://"):
+        if url.startswith(prefixo):
+            return "postgresql+psycopg2://" + url[len(prefixo):]
+    return url
+
+
+# Pool por processo: cada thread usa no máximo uma conexão, então THREADS
+# conexões fixas bastam; o total no banco fica em WORKERS × (THREADS + overflow)
+# e precisa caber no max_connections do PostgreSQL.
+POOL_SIZE = _inteiro("DB_POOL_SIZE", THREADS)
+POOL_MAX_OVERFLOW = _inteiro("DB_POOL_MAX_OVERFLOW", 2)
+POOL_TIMEOUT = _inteiro("DB_POOL_TIMEOUT", 10)           # segundos esperando uma conexão livre
+POOL_RECYCLE = _inteiro("DB_POOL_RECYCLE", 1800)         # renova conexões antes do timeout do servidor
+
+
+class Config:
+    SQLALCHEMY_DATABASE_URI = url_do_banco()
+    SQLALCHEMY_TRACK_MODIFICATIONS = False
+    SQLALCHEMY_ENGINE_OPTIONS = {
+        "pool_size": POOL_SIZE,
+        "max_overflow": POOL_MAX_OVERFLOW,
+        "pool_timeout": POOL_TIMEOUT,
+        "pool_recycle": POOL_RECYCLE,
+        "pool_pre_ping": True,   # descarta conexões derrubadas (deploy/restart do banco) sem erro 500
+    }
+
+
+def estatisticas_pool(engine):
+    """Uso do pool de conexões deste processo (rota /admin/pool)"""
+    pool = engine.pool
+    if not hasattr(pool, "checkedout"):
+        return {"classe": type(pool).__name__}
+    return {
+        "classe": type(pool).__name__,
+        "tamanho": pool.size(),
+        "em_uso": pool.checkedout(),
+        "livres": pool.checkedin(),
+        "overflow": max(pool.overflow(), 0),   # o QueuePool conta a partir de -pool_size
+        "limite": pool.size() + POOL_MAX_OVERFLOW,
+    }
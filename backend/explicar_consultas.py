@@ -0,0 +1,118 @@
+"""
+Mostra o plano de execução (EXPLAIN) das consultas das rotas mais acessadas.
+
+Uso: python -m backend.explicar_consultas [--analyze]
+
+As rotas são chamadas de verdade (test client, com sessão de admin/cliente
+montada a partir dos dados do banco atual); cada SELECT emitido é capturado
+e reexecutado com EXPLAIN. Serve para conferir se os índices das migrações
+estão sendo usados: procure por "Seq Scan" (PostgreSQL) ou "SCAN <tabela>"
+sem índice (SQLite) nas tabelas grandes.
+"""
+import sys
+
+from sqlalchemy import event, func
+
+from backend.app import app
+from backend.models import db, Usuario, Cupcake, Pedido
+
+
+def rotas_quentes():
+    """(descrição, url, admin?) das rotas exercitadas, com ids reais do banco"""
+    cliente_id = (
+        db.session.query(Pedido.usuario_id)
+        .filter(Pedido.finalizado.is_(True))
+        .group_by(Pedido.usuario_id)
+        .order_by(func.count(Pedido.id).desc())
+        .limit(1)
+        .scalar()
+    )
+    pedido = Pedido.query.filter_by(usuario_id=cliente_id).order_by(Pedido.id.desc()).first()
+    cupcake = Cupcake.query.order_by(Cupcake.id).first()
+    admin = Usuario.query.filter_by(is_admin=True).first()
+
+    if not (cliente_id and pedido and cupcake and admin):
+        return None, None, []
+
+    rotas = [
+        ("Histórico do cliente", "/pedido", False),
+        ("Histórico do cliente (próxima página)", "/api/pedidos", False),
+        ("Dashboard admin", "/admin", True),
+        ("Dashboard admin filtrado por status", "/admin?status=Entregue", True),
+        ("Dashboard admin filtrado por período", "/admin?data_inicio=2025-01-01&data_fim=2025-01-31", True),
+        ("Detalhes do pedido (admin)", f"/admin/pedido/{pedido.id}", True),
+        ("PDF do pedido", f"/pedido/pdf/{pedido.id}", True),
+        ("Pedidos de um cupcake", f"/admin/cupcake/{cupcake.id}/pedidos", True),
+        ("Lista de cupcakes (médias/vendidos)", "/admin/cupcakes", True),
+        ("Vitrine", "/vitrine", False),
+        ("Busca de cupcakes", f"/buscar_cupcakes?q={cupcake.nome[:4]}", False),
+        ("Exportação CSV (status)", "/exportar_csv?status=Entregue", True),
+    ]
+    return admin, cliente_id, rotas
+
+
+def capturar_selects(cliente, url):
+    """Executa a rota e devolve os SELECTs emitidos (sem repetir o mesmo SQL)"""
+    capturadas = {}
+
+    def antes(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT") and statement not in capturadas:
+            capturadas[statement] = parameters
+
+    event.listen(db.engine, "before_cursor_execute", antes)
+    try:
+        resposta = cliente.get(url)
+        resposta.get_data()  # consome respostas em streaming
+    finally:
+        event.remove(db.engine, "before_cursor_execute", antes)
+
+    return resposta.status_code, list(capturadas.items())
+
+
+def explicar(statement, parameters, analyze=False):
+    dialeto = db.engine.dialect.name
+    if dialeto == "sqlite":
+        prefixo = "EXPLAIN QUERY PLAN "
+    elif dialeto == "postgresql":
+        prefixo = "EXPLAIN (ANALYZE, BUFFERS) " if analyze else "EXPLAIN "
+    else:
+        prefixo = "EXPLAIN "
+
+    with db.engine.connect() as conn:
+        linhas = conn.exec_driver_sql(prefixo + statement, parameters).fetchall()
+
+    if dialeto == "sqlite":
+        # (id, parent, notused, detail)
+        return [linha[-1] for linha in linhas]
+    return [linha[0] for linha in linhas]
+
+
+def main():
+    analyze = "--analyze" in sys.argv[1:]
+
+    with app.app_context():
+        admin, cliente_id, rotas = rotas_quentes()
+        if not rotas:
+            print("Banco sem dados suficientes (precisa de um admin, um cupcake e pedidos finalizados).")
+            return
+
+        print(f"Banco: {db.engine.dialect.name}")
+        cliente = app.test_client()
+
+        for descricao, url, como_admin in rotas:
+            with cliente.session_transaction() as sessao:
+                sessao.clear()
+                sessao["usuario_id"] = admin.id if como_admin else cliente_id
+                sessao["is_admin"] = como_admin
+
+            status, consultas = capturar_selects(cliente, url)
+            print(f"\n{'=' * 78}\n{descricao}: GET {url} -> {status} ({len(consultas)} consulta(s))")
+
+            for statement, parameters in consultas:
+                print(f"\n{' '.join(statement.split())}\n")
+                for linha in explicar(statement, parameters, analyze):
+                    print(f"    {linha}")
+
+
+if __name__ == "__main__":
+    main()
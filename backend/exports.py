@@ -0,0 +1,482 @@
+import csv
+import io
+import os
+import tempfile
+
+from flask import Response, stream_with_context
+from sqlalchemy import func, tuple_
+
+from backend.models import db, Usuario, Cupcake, Pedido, PedidoCupcake
+from backend.pdf_stream import PDFEmFluxo
+from backend.reports import aplicar_filtros
+
+
+TAMANHO_LOTE = 1000          # linhas lidas por vez do banco
+TAMANHO_BLOCO = 64 * 1024    # bytes enviados por vez na resposta
+TAMANHO_GRUPO_PARQUET = 50000  # linhas por row group no Parquet
+
+MIMETYPE_XLSX = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+COLUNAS_ITENS = [
+    "pedido_id", "data_pedido", "cliente", "status",
+    "cupcake_id", "cupcake", "quantidade", "preco_unitario", "subtotal",
+]
+
+
+# =================== Leitura em lotes ===================
+
+def linhas_pedidos(filtros):
+    """
+    Itera (id, cliente, status, total, data) dos pedidos filtrados em ordem
+    (data desc, id desc). Paginação por chave, TAMANHO_LOTE linhas por query:
+    entre um lote e outro não fica cursor aberto, então o worker consegue
+    gravar o progresso no meio da exportação (no SQLite um SELECT pela
+    metade trava as escritas das outras conexões).
+    """
+    query = (
+        db.session.query(
+            Pedido.id,
+            Usuario.nome,
+            Pedido.status,
+            Pedido.total,
+            Pedido.data_pedido,
+        )
+        .join(Usuario, Usuario.id == Pedido.usuario_id)
+    )
+    query = aplicar_filtros(query, filtros, com_usuario=True)
+
+    ultimo = None
+    while True:
+        pagina = query
+        if ultimo:
+            pagina = pagina.filter(tuple_(Pedido.data_pedido, Pedido.id) < ultimo)
+
+        lote = (
+            pagina.order_by(Pedido.data_pedido.desc(), Pedido.id.desc())
+            .limit(TAMANHO_LOTE)
+            .all()
+        )
+        yield from lote
+
+        if len(lote) < TAMANHO_LOTE:
+            break
+        ultimo = (lote[-1][4], lote[-1][0])
+
+
+def lotes_itens(filtros):
+    """
+    Itera lotes de linhas de itens (pedido_cupcake) dos pedidos filtrados.
+    Paginação por chave (pedido_cupcake.id > último id): cada lote é uma
+    query curta com LIMIT, sem OFFSET e sem cursor aberto entre lotes.
+    """
+    query = (
+        db.session.query(
+            PedidoCupcake.id,
+            Pedido.id,
+            Pedido.data_pedido,
+            Usuario.nome,
+            Pedido.status,
+            PedidoCupcake.cupcake_id,
+            Cupcake.nome,
+            PedidoCupcake.quantidade,
+            PedidoCupcake.preco_unitario,
+        )
+        .join(Pedido, Pedido.id == PedidoCupcake.pedido_id)
+        .join(Usuario, Usuario.id == Pedido.usuario_id)
+        .outerjoin(Cupcake, Cupcake.id == PedidoCupcake.cupcake_id)
+    )
+    query = aplicar_filtros(query, filtros, com_usuario=True)
+
+    ultimo_id = 0
+    while True:
+        lote = (
+            query.filter(PedidoCupcake.id > ultimo_id)
+            .order_by(PedidoCupcake.id)
+            .limit(TAMANHO_LOTE)
+            .all()
+        )
+        if not lote:
+            break
+
+        ultimo_id = lote[-1][0]
+        yield [
+            (pedido_id, data, cliente, status, cupcake_id, cupcake or "Item removido",
+             quantidade, preco or 0, (quantidade or 0) * (preco or 0))
+            for _, pedido_id, data, cliente, status, cupcake_id, cupcake, quantidade, preco in lote
+        ]
+
+        if len(lote) < TAMANHO_LOTE:
+            break
+
+
+def lotes_pedidos(filtros):
+    """
+    Itera lotes de pedidos filtrados em ordem (data desc, id desc), com
+    paginação por chave. Cada pedido vem como dict já com seus itens,
+    carregados numa única query IN por lote (sem lazy-load por pedido).
+    """
+    query = (
+        db.session.query(
+            Pedido.id,
+            Pedido.data_pedido,
+            Pedido.status,
+            Pedido.total,
+            Usuario.nome,
+        )
+        .join(Usuario, Usuario.id == Pedido.usuario_id)
+    )
+    query = aplicar_filtros(query, filtros, com_usuario=True)
+
+    ultimo = None
+    while True:
+        pagina = query
+        if ultimo:
+            pagina = pagina.filter(tuple_(Pedido.data_pedido, Pedido.id) < ultimo)
+
+        lote = (
+            pagina.order_by(Pedido.data_pedido.desc(), Pedido.id.desc())
+            .limit(TAMANHO_LOTE)
+            .all()
+        )
+        if not lote:
+            break
+
+        ultimo = (lote[-1][1], lote[-1][0])
+
+        pedidos = {
+            pedido_id: {
+                "id": pedido_id,
+                "data": data,
+                "status": status,
+                "total": total or 0,
+                "cliente": cliente,
+                "itens": [],
+            }
+            for pedido_id, data, status, total, cliente in lote
+        }
+
+        itens = (
+            db.session.query(
+                PedidoCupcake.pedido_id,
+                PedidoCupcake.quantidade,
+                PedidoCupcake.preco_unitario,
+                Cupcake.nome,
+            )
+            .outerjoin(Cupcake, Cupcake.id == PedidoCupcake.cupcake_id)
+            .filter(PedidoCupcake.pedido_id.in_(list(pedidos)))
+            .order_by(PedidoCupcake.id)
+        )
+        for pedido_id, quantidade, preco, nome in itens:
+            pedidos[pedido_id]["itens"].append((quantidade, nome or "Item removido", preco or 0))
+
+        yield list(pedidos.values())
+
+        if len(lote) < TAMANHO_LOTE:
+            break
+
+
+def resumo_pedidos(filtros):
+    """Totais por status e por dia, calculados no banco (GROUP BY)"""
+    por_status = aplicar_filtros(
+        db.session.query(Pedido.status, func.count(Pedido.id), func.coalesce(func.sum(Pedido.total), 0)),
+        filtros,
+    ).group_by(Pedido.status).order_by(Pedido.status).all()
+
+    dia = func.date(Pedido.data_pedido)
+    por_dia = aplicar_filtros(
+        db.session.query(dia, func.count(Pedido.id), func.coalesce(func.sum(Pedido.total), 0)),
+        filtros,
+    ).group_by(dia).order_by(dia).all()
+
+    return por_status, por_dia
+
+
+def ler_em_blocos(caminho):
+    """Envia o arquivo em blocos (quem apaga o temporário é a resposta, ver resposta_arquivo)"""
+    with open(caminho, "rb") as f:
+        while True:
+            bloco = f.read(TAMANHO_BLOCO)
+            if not bloco:
+                break
+            yield bloco
+
+
+def remover_temporario(caminho):
+    try:
+        os.remove(caminho)
+    except FileNotFoundError:
+        pass
+
+
+def resposta_arquivo(caminho, mimetype, nome_arquivo):
+    """
+    Resposta em streaming de um arquivo temporário. A remoção fica no
+    call_on_close: roda mesmo se o corpo nunca for lido (HEAD, cliente que
+    desconecta antes do primeiro bloco).
+    """
+    resp = Response(
+        ler_em_blocos(caminho),
+        mimetype=mimetype,
+        headers={"Content-Disposition": f"attachment; filename={nome_arquivo}"}
+    )
+    resp.call_on_close(lambda: remover_temporario(caminho))
+    return resp
+
+
+# =================== Excel ===================
+
+def gerar_excel(filtros, caminho, progresso=None):
+    """
+    Grava a planilha em modo constant_memory (uma linha por vez no disco).
+    progresso(n) é chamado a cada lote com o número de pedidos já gravados.
+    """
+    import xlsxwriter
+
+    workbook = xlsxwriter.Workbook(caminho, {"constant_memory": True})
+    sheet = workbook.add_worksheet("Pedidos")
+    moeda = workbook.add_format({"num_format": "0.00"})
+
+    sheet.write_row(0, 0, ["ID", "Cliente", "Status", "Total (R$)", "Data"])
+    sheet.set_column(1, 1, 30)
+    sheet.set_column(4, 4, 18)
+
+    linha = 1
+    for pedido_id, cliente, status, total, data in linhas_pedidos(filtros):
+        sheet.write_number(linha, 0, pedido_id)
+        sheet.write_string(linha, 1, cliente or "")
+        sheet.write_string(linha, 2, status or "")
+        sheet.write_number(linha, 3, round(total or 0, 2), moeda)
+        sheet.write_string(linha, 4, data.strftime("%d/%m/%Y %H:%M") if data else "-")
+        linha += 1
+
+        if progresso and linha % TAMANHO_LOTE == 0:
+            progresso(linha - 1)
+
+    workbook.close()
+    if progresso:
+        progresso(linha - 1)
+
+
+def resposta_excel(filtros, nome_arquivo="pedidos.xlsx"):
+    """Gera o Excel num arquivo temporário exclusivo da requisição e o envia em blocos"""
+    fd, caminho = tempfile.mkstemp(prefix="pedidos_", suffix=".xlsx")
+    os.close(fd)
+
+    try:
+        gerar_excel(filtros, caminho)
+    except Exception:
+        os.remove(caminho)
+        raise
+
+    return resposta_arquivo(caminho, MIMETYPE_XLSX, nome_arquivo)
+
+
+# =================== CSV ===================
+
+def gerar_csv(filtros, progresso=None):
+    """Gera o CSV linha a linha: cabeçalho primeiro, depois um bloco por lote"""
+    processados = 0
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    writer.writerow(COLUNAS_ITENS)
+    yield buffer.getvalue().encode("utf-8")
+
+    for lote in lotes_itens(filtros):
+        buffer.seek(0)
+        buffer.truncate()
+        for linha in lote:
+            writer.writerow(
+                linha[:1] + (linha[1].strftime("%Y-%m-%d %H:%M:%S") if linha[1] else "",) + linha[2:]
+            )
+        yield buffer.getvalue().encode("utf-8")
+
+        processados += len(lote)
+        if progresso:
+            progresso(processados)
+
+
+def resposta_csv(filtros, nome_arquivo="pedidos_itens.csv"):
+    return Response(
+        stream_with_context(gerar_csv(filtros)),
+        mimetype="text/csv",
+        headers={"Content-Disposition": f"attachment; filename={nome_arquivo}"}
+    )
+
+
+# =================== Parquet ===================
+
+class SaidaEmBlocos(io.RawIOBase):
+    """Destino de escrita que acumula os bytes até serem enviados na resposta"""
+
+    def __init__(self):
+        self.blocos = []
+        self.posicao = 0
+
+    def writable(self):
+        return True
+
+    def write(self, dados):
+        self.blocos.append(bytes(dados))
+        self.posicao += len(dados)
+        return len(dados)
+
+    def tell(self):
+        return self.posicao
+
+    def esvaziar(self):
+        dados = b"".join(self.blocos)
+        self.blocos = []
+        return dados
+
+
+def gerar_parquet(filtros, progresso=None):
+    """Grava um row group a cada TAMANHO_GRUPO_PARQUET linhas e envia os bytes já prontos"""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = pa.schema([
+        ("pedido_id", pa.int64()),
+        ("data_pedido", pa.timestamp("us")),
+        ("cliente", pa.string()),
+        ("status", pa.string()),
+        ("cupcake_id", pa.int64()),
+        ("cupcake", pa.string()),
+        ("quantidade", pa.int64()),
+        ("preco_unitario", pa.float64()),
+        ("subtotal", pa.float64()),
+    ])
+
+    saida = SaidaEmBlocos()
+    writer = pq.ParquetWriter(saida, schema)
+    yield saida.esvaziar()  # cabeçalho "PAR1" sai imediatamente
+
+    def gravar(linhas):
+        colunas = list(zip(*linhas))
+        writer.write_table(pa.Table.from_arrays(
+            [pa.array(col, type=campo.type) for col, campo in zip(colunas, schema)],
+            schema=schema,
+        ))
+
+    processados = 0
+    pendentes = []
+    for lote in lotes_itens(filtros):
+        pendentes.extend(lote)
+
+        processados += len(lote)
+        if progresso:
+            progresso(processados)
+
+        if len(pendentes) >= TAMANHO_GRUPO_PARQUET:
+            gravar(pendentes[:TAMANHO_GRUPO_PARQUET])
+            pendentes = pendentes[TAMANHO_GRUPO_PARQUET:]
+            yield saida.esvaziar()
+
+    if pendentes:
+        gravar(pendentes)
+
+    writer.close()
+    yield saida.esvaziar()
+
+
+def resposta_parquet(filtros, nome_arquivo="pedidos_itens.parquet"):
+    return Response(
+        stream_with_context(gerar_parquet(filtros)),
+        mimetype="application/vnd.apache.parquet",
+        headers={"Content-Disposition": f"attachment; filename={nome_arquivo}"}
+    )
+
+
+# =================== PDF ===================
+
+class PaginaPDF:
+    """Controle da posição vertical e da quebra de página sobre o PDFEmFluxo"""
+
+    TOPO = 800
+    MARGEM = 50
+
+    def __init__(self, destino):
+        self.pdf = PDFEmFluxo(destino)
+        self.y = self.TOPO
+
+    def fonte(self, nome, tamanho):
+        self.pdf.setFont(nome, tamanho)
+
+    def nova_pagina(self):
+        self.pdf.showPage()
+        self.y = self.TOPO
+
+    def linha(self, x, texto, espaco=15):
+        if self.y < self.MARGEM:
+            self.nova_pagina()
+        self.pdf.drawString(x, self.y, texto)
+        self.y -= espaco
+
+    def salvar(self):
+        self.pdf.save()
+
+
+def formatar_dia(dia):
+    # PostgreSQL devolve date, SQLite devolve "AAAA-MM-DD"
+    if hasattr(dia, "strftime"):
+        return dia.strftime("%d/%m/%Y")
+    ano, mes, d = str(dia).split("-")
+    return f"{d}/{mes}/{ano}"
+
+
+def gerar_pdf(filtros, progresso=None):
+    """
+    Página de resumo (por status e por dia) seguida da lista de pedidos.
+    As páginas prontas de cada lote são enviadas logo em seguida, então a
+    memória usada não cresce com o tamanho do relatório.
+    """
+    saida = SaidaEmBlocos()
+    pagina = PaginaPDF(saida)
+    por_status, por_dia = resumo_pedidos(filtros)
+
+    pagina.fonte("Helvetica-Bold", 14)
+    pagina.linha(50, "Relatório de Pedidos - Resumo", espaco=30)
+
+    pagina.fonte("Helvetica-Bold", 11)
+    pagina.linha(50, "Por status", espaco=18)
+    pagina.fonte("Helvetica", 10)
+    for status, quantidade, total in por_status:
+        pagina.linha(60, f"{status}: {quantidade} pedido(s) - R$ {float(total):.2f}")
+
+    pagina.y -= 15
+    pagina.fonte("Helvetica-Bold", 11)
+    pagina.linha(50, "Por dia", espaco=18)
+    pagina.fonte("Helvetica", 10)
+    for dia, quantidade, total in por_dia:
+        pagina.linha(60, f"{formatar_dia(dia)}: {quantidade} pedido(s) - R$ {float(total):.2f}")
+
+    pagina.nova_pagina()
+    pagina.fonte("Helvetica-Bold", 14)
+    pagina.linha(50, "Relatório de Pedidos", espaco=30)
+    pagina.fonte("Helvetica", 10)
+    yield saida.esvaziar()
+
+    processados = 0
+    for lote in lotes_pedidos(filtros):
+        for pedido in lote:
+            data = pedido["data"].strftime("%d/%m/%Y %H:%M") if pedido["data"] else "-"
+            pagina.linha(60, f"Pedido #{pedido['id']} - {pedido['status']} - Cliente: {pedido['cliente']}")
+            for quantidade, nome, preco in pedido["itens"]:
+                pagina.linha(80, f"- {quantidade}x {nome} (R$ {quantidade * preco:.2f})", espaco=13)
+            pagina.linha(80, f"Total: R$ {pedido['total']:.2f}   Data: {data}", espaco=25)
+        yield saida.esvaziar()
+
+        processados += len(lote)
+        if progresso:
+            progresso(processados)
+
+    pagina.salvar()
+    yield saida.esvaziar()
+
+
+def resposta_pdf(filtros, nome_arquivo="pedidos.pdf"):
+    return Response(
+        stream_with_context(gerar_pdf(filtros)),
+        mimetype="application/pdf",
+        headers={"Content-Disposition": f"attachment; filename={nome_arquivo}"}
+    )
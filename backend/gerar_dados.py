@@ -0,0 +1,344 @@
+"""
+Gera uma base sintética grande e realista para reproduzir localmente
+problemas de volume (milhões de pedidos, itens e log de status).
+
+Uso: python -m backend.gerar_dados --pedidos 1500000 [--usuarios N] [--cupcakes 40]
+         [--semente 42] [--inicio 2024-01-01 --dias 730] [--limpar]
+
+Rodar depois de python -m backend.init_db. Com a mesma semente a base gerada
+é sempre a mesma. Distribuições:
+
+- popularidade dos cupcakes segue Zipf (poucos sabores vendem a maior parte);
+- clientes recorrentes: o peso de cada cliente vem de uma Pareto, então uma
+  minoria faz a maioria dos pedidos;
+- sazonalidade: mais pedidos no fim de semana, em dezembro e nos horários de
+  almoço e fim de tarde, com crescimento ao longo do período;
+- status coerentes com a idade do pedido, com o histórico completo em
+  pedido_status_log (Recebido -> Em produção -> Pronto -> Entregue, ou Cancelado
+  no meio do caminho).
+
+A carga usa COPY no PostgreSQL e executemany no SQLite, em lotes; cada
+pedido gera ~7 linhas no total, então 1,5 milhão de pedidos ≈ 10 milhões de linhas.
+Todos os usuários têm a mesma senha (--senha); o admin é admin@exemplo.com.
+"""
+import argparse
+import io
+import random
+import time
+from datetime import datetime, timedelta
+from itertools import accumulate
+
+from werkzeug.security import generate_password_hash
+
+
+SENHA_PADRAO = "cupcake123"
+ADMIN_EMAIL = "admin@exemplo.com"
+CLIENTE_EMAIL = "cliente1@exemplo.com"   # cliente mais frequente (usuário 2)
+
+LOTE = 20_000   # pedidos por lote de COPY/executemany
+
+SABORES = [
+    "Chocolate", "Morango", "Limão", "Baunilha", "Doce de leite", "Maracujá", "Coco",
+    "Red velvet", "Café", "Pistache", "Nutella", "Brigadeiro", "Paçoca", "Framboesa",
+]
+COBERTURAS = ["com ganache", "com chantilly", "com cream cheese", "com merengue", "com raspas de limão"]
+IMAGENS = ["chocolate.jpg", "morango.jpg", "limao.jpg", "baunilha.jpg"]
+
+ZIPF_EXPOENTE = 1.1
+PARETO_ALFA = 1.2
+
+# seg..dom, jan..dez e 0h..23h (pesos relativos)
+PESO_DIA_SEMANA = [0.8, 0.8, 0.9, 1.0, 1.3, 1.6, 1.4]
+PESO_MES = [0.8, 0.9, 1.0, 1.0, 1.2, 1.0, 0.9, 1.0, 1.0, 1.1, 1.1, 1.6]
+PESO_HORA = [0, 0, 0, 0, 0, 0, 0.1, 0.3, 0.6, 0.9, 1.2, 1.8, 2.0, 1.5, 1.1, 1.3,
+             1.7, 1.9, 1.6, 1.2, 0.8, 0.5, 0.2, 0.05]
+
+ITENS_POR_PEDIDO = ([1, 2, 3, 4, 5], [45, 30, 15, 7, 3])
+QUANTIDADES = ([1, 2, 3, 4, 6, 12], [35, 25, 10, 8, 15, 7])   # caixas de 6 e 12 são comuns
+NOTAS = ([1, 2, 3, 4, 5], [2, 3, 10, 30, 55])
+
+# minutos entre uma etapa e a próxima (mínimo, máximo)
+ETAPAS = [("Em produção", 5, 60), ("Pronto", 30, 180), ("Entregue", 20, 240)]
+CANCELAMENTO = 0.07   # cancelados em vez de irem para produção ou de ficarem prontos
+AVALIADOS = 0.35
+
+TABELAS = ["pedido_status_log", "pedido_cupcake", "pedidos", "carrinhos",
+           "tarefas_exportacao", "tarefas_imagem", "cupcakes", "usuarios"]
+COLUNAS = {
+    "usuarios": ("id", "nome", "email", "senha", "telefone", "is_admin"),
+    "cupcakes": ("id", "nome", "descricao", "preco", "imagem_url", "ativo"),
+    "pedidos": ("id", "usuario_id", "finalizado", "status", "data_pedido", "avaliacao", "total"),
+    "pedido_cupcake": ("id", "pedido_id", "cupcake_id", "quantidade", "preco_unitario"),
+    "pedido_status_log": ("id", "pedido_id", "status", "data_hora"),
+}
+
+
+# =================== Carga em lote ===================
+
+class CargaPostgres:
+    """COPY ... FROM STDIN (formato texto) pela conexão do psycopg2"""
+
+    def __init__(self, conexao):
+        self.conexao = conexao
+        self.cursor = conexao.cursor()
+
+    def inserir(self, tabela, linhas):
+        buffer = io.StringIO()
+        for linha in linhas:
+            buffer.write("\t".join(r"\N" if v is None else str(v) for v in linha))
+            buffer.write("\n")
+        buffer.seek(0)
+        self.cursor.copy_expert(f"COPY {tabela} ({', '.join(COLUNAS[tabela])}) FROM STDIN", buffer)
+
+    def limpar(self):
+        self.cursor.execute(f"TRUNCATE {', '.join(TABELAS)} RESTART IDENTITY CASCADE")
+
+    def finalizar(self):
+        # os ids foram informados: as sequências continuam do máximo
+        for tabela in COLUNAS:
+            self.cursor.execute(
+                f"SELECT setval(pg_get_serial_sequence('{tabela}', 'id'), "
+                f"(SELECT coalesce(max(id), 1) FROM {tabela}))"
+            )
+        self.conexao.commit()
+        self.cursor.execute("ANALYZE")   # contagem_estimada() do painel lê as estatísticas
+
+
+class CargaSQLite:
+    """executemany sem fsync durante a carga (synchronous volta a FULL no fim)"""
+
+    def __init__(self, conexao):
+        self.conexao = conexao
+        self.cursor = conexao.cursor()
+        self.cursor.execute("PRAGMA synchronous = OFF")
+
+    def inserir(self, tabela, linhas):
+        colunas = COLUNAS[tabela]
+        self.cursor.executemany(
+            f"INSERT INTO {tabela} ({', '.join(colunas)}) VALUES ({', '.join('?' * len(colunas))})",
+            linhas,
+        )
+
+    def limpar(self):
+        for tabela in TABELAS:
+            self.cursor.execute(f"DELETE FROM {tabela}")
+
+    def finalizar(self):
+        self.conexao.commit()
+        self.cursor.execute("PRAGMA synchronous = FULL")
+        self.cursor.execute("ANALYZE")
+
+
+# =================== Geração ===================
+
+def formatar(data):
+    return data.isoformat(" ", "microseconds")
+
+
+def pesos_zipf(n, expoente=ZIPF_EXPOENTE):
+    return list(accumulate(1 / (posicao ** expoente) for posicao in range(1, n + 1)))
+
+
+def pedidos_por_dia(rnd, total, inicio, dias):
+    """Quantos pedidos cada dia recebe: dia da semana × mês × crescimento de 50% no período"""
+    pesos = [
+        PESO_DIA_SEMANA[(inicio + timedelta(days=d)).weekday()]
+        * PESO_MES[(inicio + timedelta(days=d)).month - 1]
+        * (1 + 0.5 * d / dias)
+        for d in range(dias)
+    ]
+    soma = sum(pesos)
+    contagens = [int(total * p / soma) for p in pesos]
+    # o que sobrou do arredondamento vai para dias sorteados pelo mesmo peso
+    for d in rnd.choices(range(dias), weights=pesos, k=total - sum(contagens)):
+        contagens[d] += 1
+    return contagens
+
+
+def gerar_usuarios(n, senha):
+    # pbkdf2 com sal curto: o scrypt padrão do Werkzeug não cabe em usuarios.senha (VARCHAR(100))
+    hash_senha = generate_password_hash(senha, method="pbkdf2:sha256", salt_length=8)
+    yield (1, "Admin", ADMIN_EMAIL, hash_senha, "(11) 90000-0000", True)
+    for i in range(2, n + 1):
+        yield (i, f"Cliente {i - 1}", f"cliente{i - 1}@exemplo.com", hash_senha,
+               f"(11) 9{i % 10_000:04d}-{i // 10_000 % 10_000:04d}", False)
+
+
+def gerar_cupcakes(rnd, n):
+    cupcakes = []
+    for i in range(1, n + 1):
+        sabor = SABORES[(i - 1) % len(SABORES)]
+        cupcakes.append((
+            i,
+            sabor if i <= len(SABORES) else f"{sabor} {rnd.choice(COBERTURAS).split()[-1]} {i}",
+            f"Cupcake de {sabor.lower()} {rnd.choice(COBERTURAS)}",
+            round(rnd.uniform(6, 15), 2),
+            rnd.choice(IMAGENS),
+            i <= 5 or rnd.random() > 0.1,   # ~10% inativos (nunca os mais vendidos)
+        ))
+    return cupcakes
+
+
+def gerar_pedidos(rnd, n_pedidos, n_usuarios, cupcakes, inicio, dias):
+    """
+    Pedidos em ordem cronológica (o id cresce com a data, como em produção),
+    entregues em lotes de LOTE: (pedidos, itens, logs).
+    """
+    fim = inicio + timedelta(days=dias)
+    precos = {c[0]: c[3] for c in cupcakes}
+    # a popularidade segue a ordem dos ids: cupcake 1 é o mais vendido
+    ids_cupcakes = [c[0] for c in cupcakes]
+    acumulado_cupcakes = pesos_zipf(len(ids_cupcakes))
+    # clientes recorrentes: peso de Pareto por cliente, o cliente 1 (usuário 2) é o mais fiel
+    pesos_clientes = sorted((rnd.paretovariate(PARETO_ALFA) for _ in range(n_usuarios - 1)), reverse=True)
+    ids_clientes = list(range(2, n_usuarios + 1))
+    acumulado_clientes = list(accumulate(pesos_clientes))
+    acumulado_horas = list(accumulate(PESO_HORA))
+    horas = range(24)
+
+    pedidos, itens, logs = [], [], []
+    pedido_id = item_id = log_id = 0
+
+    for dia, quantidade in enumerate(pedidos_por_dia(rnd, n_pedidos, inicio, dias)):
+        if not quantidade:
+            continue
+        data_dia = inicio + timedelta(days=dia)
+        segundos = sorted(
+            h * 3600 + rnd.randrange(3600)
+            for h in rnd.choices(horas, cum_weights=acumulado_horas, k=quantidade)
+        )
+        clientes = rnd.choices(ids_clientes, cum_weights=acumulado_clientes, k=quantidade)
+        n_itens = rnd.choices(*ITENS_POR_PEDIDO, k=quantidade)
+        sorteados = iter(rnd.choices(ids_cupcakes, cum_weights=acumulado_cupcakes, k=sum(n_itens)))
+        qtds = iter(rnd.choices(*QUANTIDADES, k=sum(n_itens)))
+
+        for segundo, cliente, k in zip(segundos, clientes, n_itens):
+            pedido_id += 1
+            data = data_dia + timedelta(seconds=segundo)
+
+            # itens (sorteios repetidos do mesmo cupcake somam quantidade)
+            carrinho = {}
+            for _ in range(k):
+                cupcake_id = next(sorteados)
+                carrinho[cupcake_id] = carrinho.get(cupcake_id, 0) + next(qtds)
+            total = 0.0
+            for cupcake_id, qtd in carrinho.items():
+                item_id += 1
+                itens.append((item_id, pedido_id, cupcake_id, qtd, precos[cupcake_id]))
+                total += qtd * precos[cupcake_id]
+
+            # histórico de status até a idade do pedido
+            log_id += 1
+            logs.append((log_id, pedido_id, "Recebido", formatar(data)))
+            status, momento = "Recebido", data
+            cancelar_em = rnd.choice(("Em produção", "Pronto")) if rnd.random() < CANCELAMENTO else None
+            for etapa, minimo, maximo in ETAPAS:
+                proximo = momento + timedelta(minutes=rnd.randint(minimo, maximo))
+                if proximo > fim:
+                    break   # pedidos das últimas horas ainda em andamento
+                status, momento = ("Cancelado" if etapa == cancelar_em else etapa), proximo
+                log_id += 1
+                logs.append((log_id, pedido_id, status, formatar(momento)))
+                if status == "Cancelado":
+                    break
+
+            avaliacao = None
+            if status == "Entregue" and rnd.random() < AVALIADOS:
+                avaliacao = rnd.choices(*NOTAS)[0]
+
+            pedidos.append((pedido_id, cliente, True, status, formatar(data), avaliacao, round(total, 2)))
+
+            if len(pedidos) >= LOTE:
+                yield pedidos, itens, logs
+                pedidos, itens, logs = [], [], []
+
+    if pedidos:
+        yield pedidos, itens, logs
+
+
+def gerar(pedidos, usuarios=None, cupcakes=40, semente=42, inicio=datetime(2024, 1, 1), dias=730,
+          senha=SENHA_PADRAO, limpar=False, progresso=None):
+    """
+    Gera e grava a base (dentro de um app_context). Devolve o número de linhas
+    por tabela. `progresso(linhas)` é chamado a cada lote.
+    """
+    from backend.models import db
+    from backend.catalog import catalogo
+
+    usuarios = usuarios or max(10, pedidos // 8)
+    rnd = random.Random(semente)
+
+    conexao = db.engine.raw_connection()
+    try:
+        carga = CargaPostgres(conexao) if db.engine.dialect.name == "postgresql" else CargaSQLite(conexao)
+        if limpar:
+            carga.limpar()
+        else:
+            cursor = conexao.cursor()
+            cursor.execute("SELECT count(*) FROM usuarios")
+            if cursor.fetchone()[0]:
+                raise ValueError("O banco já tem dados; use --limpar para apagar tudo antes de gerar")
+
+        contagem = dict.fromkeys(COLUNAS, 0)
+
+        def inserir(tabela, linhas):
+            carga.inserir(tabela, linhas)
+            contagem[tabela] += len(linhas)
+
+        inserir("usuarios", list(gerar_usuarios(usuarios, senha)))
+        lista_cupcakes = gerar_cupcakes(rnd, cupcakes)
+        inserir("cupcakes", lista_cupcakes)
+
+        for lote_pedidos, lote_itens, lote_logs in gerar_pedidos(
+            rnd, pedidos, usuarios, lista_cupcakes, inicio, dias
+        ):
+            inserir("pedidos", lote_pedidos)
+            inserir("pedido_cupcake", lote_itens)
+            inserir("pedido_status_log", lote_logs)
+            if progresso:
+                progresso(sum(contagem.values()))
+
+        carga.finalizar()
+    except Exception:
+        conexao.rollback()
+        raise
+    finally:
+        conexao.close()
+
+    catalogo.invalidar()
+    return contagem
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--pedidos", type=int, required=True)
+    parser.add_argument("--usuarios", type=int, help="padrão: pedidos / 8")
+    parser.add_argument("--cupcakes", type=int, default=40)
+    parser.add_argument("--semente", type=int, default=42)
+    parser.add_argument("--inicio", type=datetime.fromisoformat, default=datetime(2024, 1, 1))
+    parser.add_argument("--dias", type=int, default=730)
+    parser.add_argument("--senha", default=SENHA_PADRAO, help="senha de todos os usuários")
+    parser.add_argument("--limpar", action="store_true", help="apaga usuários, cupcakes e pedidos antes")
+    args = parser.parse_args()
+
+    from backend.app import app
+
+    t0 = time.perf_counter()
+
+    def progresso(linhas):
+        decorrido = time.perf_counter() - t0
+        print(f"\r{linhas:,} linhas em {decorrido:.0f}s ({linhas / decorrido:,.0f}/s)", end="", flush=True)
+
+    with app.app_context():
+        try:
+            contagem = gerar(
+                args.pedidos, args.usuarios, args.cupcakes, args.semente, args.inicio, args.dias,
+                args.senha, args.limpar, progresso,
+            )
+        except ValueError as e:
+            raise SystemExit(str(e))
+
+    print()
+    for tabela, linhas in contagem.items():
+        print(f"{tabela:20} {linhas:>12,}")
+    print(f"Total: {sum(contagem.values()):,} linhas em {time.perf_counter() - t0:.1f}s")
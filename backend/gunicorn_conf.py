@@ -0,0 +1,97 @@
+"""
+Configuração do gunicorn em produção.
+
+Uso: gunicorn -c python:backend.gunicorn_conf backend.app:app
+
+Workers gthread: WEB_CONCURRENCY processos (padrão 2 × CPUs + 1) com
+GUNICORN_THREADS threads cada (padrão 4). Um PDF lento ocupa uma thread,
+não o processo inteiro. O pool do SQLAlchemy de cada processo tem o mesmo
+número de conexões que de threads (backend/config.py).
+
+O worker das exportações e imagens (backend/worker.py) sobe junto, como
+filho supervisionado do master: se ele cair, volta sozinho. Com
+WORKER_TAREFAS=0 o site sobe sem ele (worker rodando em outro lugar).
+"""
+import os
+import tempfile
+
+from backend.config import WORKERS, THREADS
+
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '8000')}"
+workers = WORKERS
+threads = THREADS
+worker_class = "gthread"
+
+# App carregada no master antes do fork: os workers compartilham o código (e as
+# bibliotecas de exportação, com PRECARREGAR_BIBLIOTECAS) por copy-on-write
+preload_app = True
+os.environ.setdefault("PRECARREGAR_BIBLIOTECAS", "1")   # lido por backend/app.py no preload
+
+# Versão do catálogo (backend/catalog.py) num arquivo que sobrevive ao reboot:
+# com ele em /tmp, cada reinício invalida a vitrine e os ETags de todos os clientes
+if not os.environ.get("CATALOGO_VERSAO_ARQUIVO"):
+    raise RuntimeError("Defina CATALOGO_VERSAO_ARQUIVO (arquivo da versão do catálogo, fora do /tmp)")
+
+# /metrics soma os workers pelos arquivos desta pasta (backend/metrics.py)
+os.environ.setdefault("METRICAS_DIR", os.path.join(tempfile.gettempdir(), "cupcake_metricas"))
+
+timeout = int(os.environ.get("GUNICORN_TIMEOUT", "60"))
+graceful_timeout = 30
+keepalive = 5
+
+# Recicla os workers de tempos em tempos (memória de exportações grandes volta ao SO)
+max_requests = int(os.environ.get("GUNICORN_MAX_REQUESTS", "10000"))
+max_requests_jitter = max_requests // 10
+
+# Worker das tarefas em segundo plano, supervisionado pelo master
+WORKER_TAREFAS = os.environ.get("WORKER_TAREFAS", "1") == "1"
+_supervisor = None
+
+accesslog = "-"
+errorlog = "-"
+
+
+def on_starting(server):
+    """Contadores começam do zero a cada subida do servidor"""
+    from backend.metrics import metricas
+
+    metricas.limpar_pasta()
+
+
+def when_ready(server):
+    """Sobe o worker das tarefas depois que o site já está aceitando conexões"""
+    global _supervisor
+    if WORKER_TAREFAS and _supervisor is None:
+        from backend.worker import Supervisor
+
+        _supervisor = Supervisor(server.log)
+        _supervisor.iniciar()
+
+
+def on_exit(server):
+    if _supervisor is not None:
+        _supervisor.parar()
+
+
+def post_fork(server, worker):
+    """Conexões abertas no master não podem ser usadas pelos filhos: cada worker abre as suas"""
+    from backend.app import app
+    from backend.models import db
+
+    with app.app_context():
+        db.engine.dispose(close=False)
+
+
+def worker_exit(server, worker):
+    """Últimos números do worker em disco antes de ele sair"""
+    from backend.metrics import metricas
+
+    metricas.gravar()
+
+
+def child_exit(server, worker):
+    """No master: o arquivo do worker encerrado entra no acumulado (mortos.json)"""
+    from backend.metrics import metricas
+
+    metricas.consolidar(worker.pid)
@@ -0,0 +1,88 @@
+import hashlib
+import os
+
+from flask import Response, request, session
+from sqlalchemy import func
+
+from backend.assets import estaticos
+from backend.models import db, Pedido, PedidoStatusLog, Usuario
+
+
+PASTA_TEMPLATES = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "frontend", "templates"))
+
+
+def _versao_templates():
+    """Hash do conteúdo dos templates: igual em todos os workers, muda a cada deploy"""
+    resumo = hashlib.sha1()
+    for raiz, _, arquivos in sorted(os.walk(PASTA_TEMPLATES)):
+        for nome in sorted(arquivos):
+            with open(os.path.join(raiz, nome), "rb") as f:
+                resumo.update(nome.encode() + f.read())
+    return resumo.hexdigest()[:12]
+
+
+VERSAO_TEMPLATES = _versao_templates()
+
+
+# =================== ETags ===================
+
+def etag_de(*partes):
+    """ETag forte a partir de entradas baratas (versões, timestamps), nunca do corpo"""
+    return hashlib.sha1("|".join(str(p) for p in partes).encode()).hexdigest()[:24]
+
+
+def etag_pagina(*partes):
+    """
+    ETag de página HTML: inclui os templates, os estáticos (as URLs /assets com
+    hash que o HTML referencia) e o que o base.html mostra da sessão
+    """
+    return etag_de(
+        VERSAO_TEMPLATES,
+        estaticos.versao,
+        session.get("usuario_id"),
+        session.get("usuario_nome"),
+        session.get("is_admin"),
+        *partes,
+    )
+
+
+def nao_modificado(etag):
+    """
+    Resposta 304 se o navegador já tem essa versão (If-None-Match), senão None.
+    Chamar antes de renderizar: no 304 nada do corpo é montado.
+    Com flash pendente a página precisa ser renderizada para exibi-lo.
+    """
+    if "_flashes" in session or not request.if_none_match.contains(etag):
+        return None
+    resp = Response(status=304)
+    return com_etag(resp, etag)
+
+
+def com_etag(resp, etag):
+    """Marca a resposta com a ETag; private + no-cache: o navegador guarda, mas sempre revalida"""
+    resp.set_etag(etag)
+    resp.headers["Cache-Control"] = "private, no-cache"
+    resp.vary.add("Cookie")
+    return resp
+
+
+# =================== Versões ===================
+
+def versao_pedido(pedido_id, usuario_id=None):
+    """
+    O que muda o PDF de um pedido, numa query pelos índices: status, avaliação,
+    último registro do log de status e dados do cliente. None se o pedido não existe
+    (ou não é do usuario_id, quando informado).
+    """
+    query = (
+        db.session.query(
+            Pedido.status, Pedido.avaliacao, func.max(PedidoStatusLog.data_hora), Usuario.nome, Usuario.email
+        )
+        .join(Usuario, Usuario.id == Pedido.usuario_id)
+        .outerjoin(PedidoStatusLog, PedidoStatusLog.pedido_id == Pedido.id)
+        .filter(Pedido.id == pedido_id)
+        .group_by(Pedido.id, Pedido.status, Pedido.avaliacao, Usuario.nome, Usuario.email)
+    )
+    if usuario_id is not None:
+        query = query.filter(Pedido.usuario_id == usuario_id)
+    return query.first()
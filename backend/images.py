@@ -0,0 +1,166 @@
+import hashlib
+import os
+import secrets
+import tempfile
+from datetime import datetime
+
+from sqlalchemy import update
+from werkzeug.utils import secure_filename
+
+from backend.models import db, Cupcake, TarefaImagem
+from backend.catalog import catalogo
+from backend.jobs import TEMPO_MAXIMO_SEM_ATUALIZAR
+from backend.assets import estaticos
+
+
+# Pasta pública das variantes e pasta privada dos arquivos enviados (com EXIF, tamanho original)
+PASTA_IMG = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "frontend", "static", "img"))
+PASTA_VARIANTES = os.path.join(PASTA_IMG, "cupcakes")
+PASTA_ORIGINAIS = os.environ.get(
+    "IMAGENS_ORIGINAIS_DIR", os.path.join(tempfile.gettempdir(), "cupcake_originais")
+)
+
+# Largura (px) de cada variante: miniatura (admin/carrinho), card da vitrine e detalhe
+VARIANTES = {"thumb": 160, "card": 480, "detalhe": 1200}
+QUALIDADE = {"webp": 80, "jpg": 82}
+EXTENSOES_ACEITAS = {".jpg", ".jpeg", ".png", ".webp", ".gif"}   # o que o Pillow abre sem plugins
+
+PREFIXO = "cupcakes/"        # imagem_url das imagens processadas: "cupcakes/<hash>"
+PLACEHOLDER = "sem_imagem.svg"
+
+
+# =================== Lado web ===================
+
+def salvar_upload(arquivo):
+    """
+    Grava o arquivo enviado (sem processar) na pasta privada como
+    <hash do conteúdo>_<sufixo aleatório>: cada tarefa tem o seu original e
+    apaga só ele, mesmo com a mesma foto enviada para dois cupcakes. As
+    variantes continuam nomeadas só pelo hash. Devolve o caminho ou None se a
+    extensão não for aceita.
+    """
+    extensao = os.path.splitext(secure_filename(arquivo.filename or ""))[1].lower()
+    if extensao not in EXTENSOES_ACEITAS:
+        return None
+
+    os.makedirs(PASTA_ORIGINAIS, exist_ok=True)
+    resumo = hashlib.sha256()
+    fd, temporario = tempfile.mkstemp(dir=PASTA_ORIGINAIS, suffix=".parcial")
+    with os.fdopen(fd, "wb") as destino:
+        for bloco in iter(lambda: arquivo.stream.read(64 * 1024), b""):
+            resumo.update(bloco)
+            destino.write(bloco)
+
+    caminho = os.path.join(PASTA_ORIGINAIS, f"{resumo.hexdigest()[:20]}_{secrets.token_hex(4)}{extensao}")
+    os.replace(temporario, caminho)
+    return caminho
+
+
+def enfileirar_imagem(cupcake, arquivo):
+    """
+    Salva o upload e agenda as variantes para o worker. O cupcake fica com a
+    imagem anterior (ou o placeholder) até o processamento terminar.
+    Devolve False se o arquivo não for uma imagem aceita.
+    """
+    caminho = salvar_upload(arquivo)
+    if caminho is None:
+        return False
+
+    db.session.add(TarefaImagem(cupcake_id=cupcake.id, original=caminho))
+    return True
+
+
+def url_imagem(imagem_url, variante="card", formato="jpg"):
+    """URL de uma variante (imagens processadas) ou do arquivo antigo/placeholder"""
+    if not imagem_url:
+        return estaticos.url("img/" + PLACEHOLDER)
+    if not imagem_url.startswith(PREFIXO):
+        return estaticos.url("img/" + imagem_url)   # imagens anteriores ao pipeline
+    return estaticos.url(f"img/{imagem_url}-{VARIANTES[variante]}.{formato}")
+
+
+def srcset_imagem(imagem_url, formato="jpg"):
+    """Atributo srcset com todas as larguras; vazio para imagens não processadas"""
+    if not imagem_url or not imagem_url.startswith(PREFIXO):
+        return ""
+    return ", ".join(
+        f"{estaticos.url(f'img/{imagem_url}-{largura}.{formato}')} {largura}w"
+        for largura in sorted(VARIANTES.values())
+    )
+
+
+# =================== Lado worker ===================
+
+def gravar_variante(imagem, caminho, formato):
+    temporario = caminho + ".parcial"
+    if formato == "webp":
+        imagem.save(temporario, "WEBP", quality=QUALIDADE["webp"], method=6)
+    else:
+        imagem.save(temporario, "JPEG", quality=QUALIDADE["jpg"], optimize=True, progressive=True)
+    os.replace(temporario, caminho)
+
+
+def gerar_variantes(original):
+    """
+    Gera thumb/card/detalhe em WebP e JPEG. Só os pixels são copiados: EXIF
+    (inclusive GPS), ICC e comentários ficam de fora. Devolve o imagem_url.
+    """
+    from PIL import Image, ImageOps
+
+    base = os.path.basename(original).split("_")[0]   # hash do conteúdo (sem o sufixo do upload)
+    os.makedirs(PASTA_VARIANTES, exist_ok=True)
+
+    with Image.open(original) as aberta:
+        imagem = ImageOps.exif_transpose(aberta)   # aplica a rotação da câmera antes de descartar o EXIF
+        if imagem.mode in ("RGBA", "LA", "P"):
+            imagem = imagem.convert("RGBA")
+            fundo = Image.new("RGB", imagem.size, (255, 255, 255))
+            fundo.paste(imagem, mask=imagem.getchannel("A"))
+            imagem = fundo
+        else:
+            imagem = imagem.convert("RGB")
+
+        for largura in VARIANTES.values():
+            copia = imagem.copy()
+            copia.thumbnail((largura, largura * 4), Image.LANCZOS)   # nunca aumenta
+            for formato in ("webp", "jpg"):
+                gravar_variante(copia, os.path.join(PASTA_VARIANTES, f"{base}-{largura}.{formato}"), formato)
+
+    return PREFIXO + base
+
+
+def processar_imagem(tarefa):
+    """Executa uma TarefaImagem: gera as variantes e troca a imagem do cupcake"""
+    try:
+        imagem_url = gerar_variantes(tarefa.original)
+    except Exception as e:
+        db.session.rollback()
+        tarefa.status = "erro"
+        tarefa.mensagem = str(e)[:500]
+        tarefa.atualizado_em = datetime.utcnow()
+        db.session.commit()
+        raise
+
+    cupcake = db.session.get(Cupcake, tarefa.cupcake_id)
+    if cupcake is not None:
+        cupcake.imagem_url = imagem_url
+    tarefa.status = "concluido"
+    tarefa.atualizado_em = datetime.utcnow()
+    db.session.commit()
+    catalogo.invalidar()
+
+    if os.path.exists(tarefa.original):
+        os.remove(tarefa.original)
+
+
+def devolver_tarefas_travadas():
+    """Tarefas de imagem "executando" há muito tempo (worker caiu) voltam para a fila"""
+    db.session.execute(
+        update(TarefaImagem)
+        .where(
+            TarefaImagem.status == "executando",
+            TarefaImagem.atualizado_em < datetime.utcnow() - TEMPO_MAXIMO_SEM_ATUALIZAR,
+        )
+        .values(status="pendente")
+    )
+    db.session.commit()
@@ -1,5 +1,8 @@
-from app import app, db
+from flask_migrate import upgrade
+
+from backend.cli import app
 
 with app.app_context():
-    db.create_all()
-    print("Tabelas criadas com sucesso!")
+    # Aplica as migrações de backend/migrations (tabelas, índices e índice de busca)
+    upgrade()
+    print("Banco atualizado com sucesso!")
@@ -0,0 +1,185 @@
+import json
+import os
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from flask import current_app
+from sqlalchemy import func, update
+from sqlalchemy.exc import OperationalError
+
+from backend.models import db, Pedido, PedidoCupcake, TarefaExportacao
+from backend.reports import ler_filtros, aplicar_filtros
+from backend import exports
+
+
+# Diretório dos arquivos gerados e tempo até expirarem
+PASTA_ARTEFATOS = os.environ.get(
+    "EXPORTACOES_DIR", os.path.join(tempfile.gettempdir(), "cupcake_exportacoes")
+)
+VALIDADE = timedelta(hours=int(os.environ.get("EXPORTACOES_VALIDADE_HORAS", "24")))
+
+# Tarefa "executando" sem atualização por esse tempo volta para a fila (worker caiu)
+TEMPO_MAXIMO_SEM_ATUALIZAR = timedelta(minutes=15)
+# Mesmo sem mudar o percentual, o progresso é regravado a cada intervalo (sinal de vida)
+INTERVALO_SINAL_DE_VIDA = 60   # segundos
+
+FORMATOS = {
+    "excel": (".xlsx", exports.MIMETYPE_XLSX),
+    "pdf": (".pdf", "application/pdf"),
+    "csv": (".csv", "text/csv"),
+    "parquet": (".parquet", "application/vnd.apache.parquet"),
+}
+
+CAMPOS_FILTRO = ("status", "cliente", "data_inicio", "data_fim")
+
+
+# =================== Lado web ===================
+
+def criar_tarefa(usuario_id, formato, args):
+    """Enfileira uma exportação; os filtros são os mesmos de request.args"""
+    if formato not in FORMATOS:
+        raise ValueError(f"Formato inválido: {formato}")
+
+    filtros = {campo: args.get(campo) for campo in CAMPOS_FILTRO if args.get(campo)}
+    tarefa = TarefaExportacao(usuario_id=usuario_id, formato=formato, filtros=json.dumps(filtros))
+    db.session.add(tarefa)
+    db.session.commit()
+    return tarefa
+
+
+def tarefa_expirada(tarefa):
+    return tarefa.expira_em is not None and tarefa.expira_em < datetime.utcnow()
+
+
+# =================== Lado worker ===================
+
+def pegar_proxima_tarefa(modelo=TarefaExportacao):
+    """
+    Reserva a tarefa pendente mais antiga da fila (tabela do modelo: exportações
+    ou imagens). O UPDATE condicional (status ainda "pendente") garante que dois
+    workers nunca peguem a mesma tarefa.
+    """
+    while True:
+        tarefa_id = (
+            db.session.query(modelo.id)
+            .filter(modelo.status == "pendente")
+            .order_by(modelo.id)
+            .limit(1)
+            .scalar()
+        )
+        if tarefa_id is None:
+            db.session.commit()
+            return None
+
+        reservada = db.session.execute(
+            update(modelo)
+            .where(modelo.id == tarefa_id, modelo.status == "pendente")
+            .values(status="executando", atualizado_em=datetime.utcnow())
+        ).rowcount
+        db.session.commit()
+
+        if reservada:
+            return db.session.get(modelo, tarefa_id)
+
+
+def contar_linhas(formato, filtros):
+    """Total usado no cálculo do progresso: pedidos (excel/pdf) ou itens (csv/parquet)"""
+    if formato in ("csv", "parquet"):
+        query = db.session.query(func.count(PedidoCupcake.id)) \
+            .join(Pedido, Pedido.id == PedidoCupcake.pedido_id)
+    else:
+        query = db.session.query(func.count(Pedido.id))
+    return aplicar_filtros(query, filtros).scalar() or 0
+
+
+def salvar_progresso(tarefa_id, **valores):
+    """
+    Atualiza a tarefa numa conexão separada: a sessão principal pode estar
+    no meio de uma leitura em lotes (cursor no servidor) que um commit fecharia.
+    """
+    valores["atualizado_em"] = datetime.utcnow()
+    with db.engine.begin() as conn:
+        conn.execute(update(TarefaExportacao).where(TarefaExportacao.id == tarefa_id).values(**valores))
+
+
+def executar_tarefa(tarefa):
+    """Gera o arquivo da tarefa em PASTA_ARTEFATOS, atualizando o progresso"""
+    tarefa_id, formato = tarefa.id, tarefa.formato
+    filtros = ler_filtros(json.loads(tarefa.filtros or "{}"))
+    sufixo, _ = FORMATOS[formato]
+
+    os.makedirs(PASTA_ARTEFATOS, exist_ok=True)
+    destino = os.path.join(PASTA_ARTEFATOS, f"exportacao_{tarefa_id}{sufixo}")
+    parcial = destino + ".parcial"
+
+    total = contar_linhas(formato, filtros)
+    gravado = {"percentual": -1, "em": time.monotonic()}
+
+    def progresso(processados):
+        percentual = min(99, processados * 100 // total) if total else 99
+        agora = time.monotonic()
+        if percentual == gravado["percentual"] and agora - gravado["em"] < INTERVALO_SINAL_DE_VIDA:
+            return
+        try:
+            salvar_progresso(tarefa_id, progresso=percentual)
+        except OperationalError:
+            # tenta de novo na próxima chamada; sem atualizado_em em dia a
+            # tarefa volta para a fila depois de TEMPO_MAXIMO_SEM_ATUALIZAR
+            current_app.logger.exception("Falha ao gravar o progresso da exportação #%s", tarefa_id)
+            return
+        gravado.update(percentual=percentual, em=agora)
+
+    try:
+        if formato == "excel":
+            exports.gerar_excel(filtros, parcial, progresso)
+        else:
+            gerador = {
+                "pdf": exports.gerar_pdf,
+                "csv": exports.gerar_csv,
+                "parquet": exports.gerar_parquet,
+            }[formato]
+            with open(parcial, "wb") as f:
+                for bloco in gerador(filtros, progresso):
+                    f.write(bloco)
+
+        os.replace(parcial, destino)
+    except Exception as e:
+        db.session.rollback()
+        if os.path.exists(parcial):
+            os.remove(parcial)
+        salvar_progresso(tarefa_id, status="erro", mensagem=str(e)[:500])
+        raise
+
+    agora = datetime.utcnow()
+    salvar_progresso(
+        tarefa_id,
+        status="concluido",
+        progresso=100,
+        arquivo=destino,
+        concluido_em=agora,
+        expira_em=agora + VALIDADE,
+    )
+
+
+def expirar_artefatos():
+    """Apaga os arquivos vencidos e devolve para a fila tarefas de workers que caíram"""
+    agora = datetime.utcnow()
+
+    vencidas = TarefaExportacao.query.filter(
+        TarefaExportacao.status == "concluido",
+        TarefaExportacao.expira_em < agora,
+    ).all()
+    for tarefa in vencidas:
+        if tarefa.arquivo and os.path.exists(tarefa.arquivo):
+            os.remove(tarefa.arquivo)
+        tarefa.status = "expirado"
+        tarefa.arquivo = None
+
+    TarefaExportacao.query.filter(
+        TarefaExportacao.status == "executando",
+        TarefaExportacao.atualizado_em < agora - TEMPO_MAXIMO_SEM_ATUALIZAR,
+    ).update({"status": "pendente", "progresso": 0}, synchronize_session=False)
+
+    db.session.commit()
+    return len(vencidas)
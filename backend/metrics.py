@@ -0,0 +1,220 @@
+import glob
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+
+from flask import Response, abort, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+
+# Pasta compartilhada pelos workers do gunicorn (backend/gunicorn_conf.py define
+# o padrão). Sem ela, /metrics mostra só o processo que atendeu a requisição.
+PASTA = os.environ.get("METRICAS_DIR")
+INTERVALO = float(os.environ.get("METRICAS_INTERVALO", "5"))   # segundos entre gravações por worker
+TOKEN = os.environ.get("METRICAS_TOKEN")                        # se definido, exigido em /metrics
+
+# Limites dos buckets do histograma de latência (segundos)
+LIMITES = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+N = len(LIMITES) + 1            # + o bucket +Inf
+SOMA, CONTAGEM, SQL_N, SQL_T = N, N + 1, N + 2, N + 3   # posições depois dos buckets
+
+ARQUIVO_MORTOS = "mortos.json"  # workers já encerrados (consolidados pelo master)
+
+_local = threading.local()      # por thread: [queries, segundos em SQL] da requisição atual
+
+
+class Metricas:
+    """
+    Latência, status e SQL por endpoint, expostos em /metrics no formato texto
+    do Prometheus.
+
+    Cada processo acumula em memória (um lock, um bisect e algumas somas por
+    requisição) e, com PASTA definida, grava o seu estado em <pid>.json no
+    máximo a cada INTERVALO segundos. /metrics soma os arquivos de todos os
+    workers; os de workers encerrados são juntados em mortos.json pelo master,
+    então os contadores nunca voltam atrás quando um worker é reciclado.
+    """
+
+    def __init__(self, pasta=None):
+        self.pasta = pasta
+        self.lock = threading.Lock()
+        self.rotas = {}      # (endpoint, metodo) -> [buckets..., soma, contagem, queries, segundos SQL]
+        self.status = {}     # (endpoint, metodo, status) -> requisições
+        self.gravado_em = time.monotonic()
+
+    def instalar(self, app):
+        app.before_request(self._inicio)
+        app.after_request(self._fim)
+        app.add_url_rule("/metrics", "metricas", self.resposta)
+        if not event.contains(Engine, "before_cursor_execute", _antes_sql):   # create_app() mais de uma vez
+            event.listen(Engine, "before_cursor_execute", _antes_sql)
+            event.listen(Engine, "after_cursor_execute", _depois_sql)
+
+    # ---------- coleta ----------
+
+    def _inicio(self):
+        _local.inicio = time.perf_counter()
+        _local.sql = [0, 0.0]
+
+    def _fim(self, resp):
+        req = request._get_current_object()   # o proxy custa mais que o resto da coleta
+        chave = (req.endpoint or "desconhecido", req.method)
+        inicio, sql, status = _local.inicio, _local.sql, resp.status_code
+        # no fechamento da resposta: inclui o corpo em streaming (exportações)
+        resp.call_on_close(lambda: self.registrar(chave, status, time.perf_counter() - inicio, sql))
+        return resp
+
+    def registrar(self, chave, status, duracao, sql):
+        _local.sql = None
+        with self.lock:
+            valores = self.rotas.get(chave)
+            if valores is None:
+                valores = self.rotas[chave] = [0] * N + [0.0, 0, 0, 0.0]
+            valores[bisect_left(LIMITES, duracao)] += 1
+            valores[SOMA] += duracao
+            valores[CONTAGEM] += 1
+            valores[SQL_N] += sql[0]
+            valores[SQL_T] += sql[1]
+            chave_status = chave + (status,)
+            self.status[chave_status] = self.status.get(chave_status, 0) + 1
+
+            if self.pasta is None or time.monotonic() - self.gravado_em < INTERVALO:
+                return
+            self.gravado_em = time.monotonic()
+        try:
+            self.gravar()
+        except OSError:
+            pass   # disco cheio/sem permissão: tenta de novo no próximo intervalo
+
+    # ---------- multiprocesso ----------
+
+    def estado(self):
+        """Cópia serializável em JSON (chaves "endpoint|metodo" e "endpoint|metodo|status")"""
+        with self.lock:
+            return {
+                "rotas": {"|".join(k): list(v) for k, v in self.rotas.items()},
+                "status": {f"{e}|{m}|{s}": n for (e, m, s), n in self.status.items()},
+            }
+
+    def gravar(self):
+        """Estado deste processo em <pasta>/<pid>.json (troca atômica)"""
+        if self.pasta is None:
+            return
+        os.makedirs(self.pasta, exist_ok=True)
+        caminho = os.path.join(self.pasta, f"{os.getpid()}.json")
+        temporario = caminho + ".tmp"
+        with open(temporario, "w") as f:
+            json.dump(self.estado(), f)
+        os.replace(temporario, caminho)
+
+    def limpar_pasta(self):
+        """Na subida do master: descarta os contadores da execução anterior"""
+        if self.pasta is None:
+            return
+        os.makedirs(self.pasta, exist_ok=True)
+        for caminho in glob.glob(os.path.join(self.pasta, "*.json")):
+            os.remove(caminho)
+
+    def consolidar(self, pid):
+        """No master, quando um worker termina: soma o arquivo dele em mortos.json"""
+        if self.pasta is None:
+            return
+        caminho = os.path.join(self.pasta, f"{pid}.json")
+        mortos = os.path.join(self.pasta, ARQUIVO_MORTOS)
+        estado = somar([ler(mortos), ler(caminho)])
+        temporario = mortos + ".tmp"
+        with open(temporario, "w") as f:
+            json.dump(estado, f)
+        os.replace(temporario, mortos)
+        if os.path.exists(caminho):
+            os.remove(caminho)
+
+    def agregado(self):
+        if self.pasta is None:
+            return self.estado()
+        self.gravar()   # o processo que atende entra com os números atuais
+        return somar(ler(c) for c in glob.glob(os.path.join(self.pasta, "*.json")))
+
+    # ---------- exposição ----------
+
+    def resposta(self):
+        if TOKEN and request.headers.get("Authorization") != f"Bearer {TOKEN}":
+            abort(401)
+        return Response(formatar(self.agregado()), mimetype="text/plain; version=0.0.4")
+
+
+# =================== SQL por requisição ===================
+
+def _antes_sql(conn, cursor, statement, parameters, context, executemany):
+    conn.info["metricas_inicio"] = time.perf_counter()
+
+
+def _depois_sql(conn, cursor, statement, parameters, context, executemany):
+    sql = getattr(_local, "sql", None)
+    if sql is not None:   # fora de requisição (worker, scripts): ignora
+        sql[0] += 1
+        sql[1] += time.perf_counter() - conn.info.pop("metricas_inicio", time.perf_counter())
+
+
+# =================== Arquivos e formato ===================
+
+def ler(caminho):
+    try:
+        with open(caminho) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {"rotas": {}, "status": {}}   # worker ainda sem arquivo ou gravando
+
+
+def somar(estados):
+    total = {"rotas": {}, "status": {}}
+    for estado in estados:
+        for chave, valores in estado["rotas"].items():
+            atual = total["rotas"].get(chave)
+            total["rotas"][chave] = valores if atual is None else [a + b for a, b in zip(atual, valores)]
+        for chave, n in estado["status"].items():
+            total["status"][chave] = total["status"].get(chave, 0) + n
+    return total
+
+
+def formatar(estado):
+    """Formato texto do Prometheus (exposition format 0.0.4)"""
+    duracao = [
+        "# HELP http_request_duration_seconds Tempo de resposta por endpoint (inclui o corpo em streaming).",
+        "# TYPE http_request_duration_seconds histogram",
+    ]
+    queries = [
+        "# HELP http_request_sql_queries_total Queries SQL executadas pelas requisições de cada endpoint.",
+        "# TYPE http_request_sql_queries_total counter",
+    ]
+    tempo_sql = [
+        "# HELP http_request_sql_seconds_total Tempo gasto em SQL pelas requisições de cada endpoint.",
+        "# TYPE http_request_sql_seconds_total counter",
+    ]
+    for chave, valores in sorted(estado["rotas"].items()):
+        endpoint, metodo = chave.split("|")
+        rotulos = f'endpoint="{endpoint}",method="{metodo}"'
+        acumulado = 0
+        for limite, n in zip(LIMITES + ("+Inf",), valores[:N]):
+            acumulado += n
+            duracao.append(f'http_request_duration_seconds_bucket{{{rotulos},le="{limite}"}} {acumulado}')
+        duracao.append(f"http_request_duration_seconds_sum{{{rotulos}}} {valores[SOMA]}")
+        duracao.append(f"http_request_duration_seconds_count{{{rotulos}}} {valores[CONTAGEM]}")
+        queries.append(f"http_request_sql_queries_total{{{rotulos}}} {valores[SQL_N]}")
+        tempo_sql.append(f"http_request_sql_seconds_total{{{rotulos}}} {valores[SQL_T]}")
+
+    requisicoes = [
+        "# HELP http_requests_total Requisições por endpoint e status HTTP.",
+        "# TYPE http_requests_total counter",
+    ]
+    for chave, n in sorted(estado["status"].items()):
+        endpoint, metodo, status = chave.split("|")
+        requisicoes.append(f'http_requests_total{{endpoint="{endpoint}",method="{metodo}",status="{status}"}} {n}')
+
+    return "\n".join(duracao + requisicoes + queries + tempo_sql) + "\n"
+
+
+metricas = Metricas(PASTA)
@@ -0,0 +1,77 @@
+"""esquema inicial (tabelas do dump database/db_cupcakeapp.sql)
+
+Revision ID: 0001_esquema_inicial
+Revises:
+Create Date: 2026-10-18 00:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0001_esquema_inicial'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Bancos antigos foram criados pelo db.create_all() ou pelo dump: só cria o que falta
+    existentes = set(sa.inspect(op.get_bind()).get_table_names())
+
+    if "usuarios" not in existentes:
+        op.create_table(
+            "usuarios",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("nome", sa.String(100), nullable=False),
+            sa.Column("email", sa.String(100), nullable=False, unique=True),
+            sa.Column("senha", sa.String(100), nullable=False),
+            sa.Column("telefone", sa.String(20), nullable=True),
+            sa.Column("is_admin", sa.Boolean(), nullable=True),
+        )
+
+    if "cupcakes" not in existentes:
+        op.create_table(
+            "cupcakes",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("nome", sa.String(100), nullable=False),
+            sa.Column("descricao", sa.Text(), nullable=False),
+            sa.Column("preco", sa.Float(), nullable=False),
+            sa.Column("imagem_url", sa.String(255), nullable=False),
+            sa.Column("ativo", sa.Boolean(), nullable=False, server_default=sa.true()),
+        )
+
+    if "pedidos" not in existentes:
+        op.create_table(
+            "pedidos",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("usuario_id", sa.Integer(), sa.ForeignKey("usuarios.id"), nullable=False),
+            sa.Column("finalizado", sa.Boolean(), nullable=True),
+            sa.Column("status", sa.String(30), nullable=True),
+            sa.Column("data_pedido", sa.DateTime(), nullable=True),
+            sa.Column("avaliacao", sa.Integer(), nullable=True),
+        )
+
+    if "pedido_cupcake" not in existentes:
+        op.create_table(
+            "pedido_cupcake",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("pedido_id", sa.Integer(), sa.ForeignKey("pedidos.id"), nullable=False),
+            sa.Column("cupcake_id", sa.Integer(), sa.ForeignKey("cupcakes.id"), nullable=False),
+            sa.Column("quantidade", sa.Integer(), nullable=False),
+        )
+
+    if "pedido_status_log" not in existentes:
+        op.create_table(
+            "pedido_status_log",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("pedido_id", sa.Integer(), sa.ForeignKey("pedidos.id", ondelete="CASCADE"), nullable=False),
+            sa.Column("status", sa.String(30), nullable=False),
+            sa.Column("data_hora", sa.DateTime(), nullable=True),
+        )
+
+
+def downgrade():
+    for tabela in ("pedido_status_log", "pedido_cupcake", "pedidos", "cupcakes", "usuarios"):
+        op.drop_table(tabela)
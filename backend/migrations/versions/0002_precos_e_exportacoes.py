@@ -0,0 +1,77 @@
+"""preço gravado nos pedidos e tabela de exportações em segundo plano
+
+Revision ID: 0002_precos_e_exportacoes
+Revises: 0001_esquema_inicial
+Create Date: 2026-10-18 00:00:01
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0002_precos_e_exportacoes'
+down_revision = '0001_esquema_inicial'
+branch_labels = None
+depends_on = None
+
+
+# Pedidos antigos não guardavam o preço da compra: usa o preço ATUAL do cupcake
+# (o mesmo backfill de backend/backfill_precos.py). Só linhas NULL são alteradas.
+BACKFILL_ITENS = """
+    UPDATE pedido_cupcake
+       SET preco_unitario = (SELECT c.preco FROM cupcakes c WHERE c.id = pedido_cupcake.cupcake_id)
+     WHERE preco_unitario IS NULL
+"""
+BACKFILL_PEDIDOS = """
+    UPDATE pedidos
+       SET total = (SELECT COALESCE(SUM(pc.quantidade * pc.preco_unitario), 0)
+                      FROM pedido_cupcake pc
+                     WHERE pc.pedido_id = pedidos.id)
+     WHERE total IS NULL
+"""
+
+
+def colunas(inspetor, tabela):
+    return {c["name"] for c in inspetor.get_columns(tabela)}
+
+
+def upgrade():
+    inspetor = sa.inspect(op.get_bind())
+
+    # Mesmas colunas que backend/backfill_precos.py cria
+    if "preco_unitario" not in colunas(inspetor, "pedido_cupcake"):
+        op.add_column("pedido_cupcake", sa.Column("preco_unitario", sa.Float(), nullable=True))
+    if "total" not in colunas(inspetor, "pedidos"):
+        op.add_column("pedidos", sa.Column("total", sa.Float(), nullable=True))
+
+    # Preenche os pedidos existentes no deploy (init_db), sem passo manual
+    op.execute(BACKFILL_ITENS)
+    op.execute(BACKFILL_PEDIDOS)
+
+    if "tarefas_exportacao" not in inspetor.get_table_names():
+        op.create_table(
+            "tarefas_exportacao",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("usuario_id", sa.Integer(), sa.ForeignKey("usuarios.id"), nullable=False),
+            sa.Column("formato", sa.String(10), nullable=False),
+            sa.Column("filtros", sa.Text(), nullable=False),
+            sa.Column("status", sa.String(20), nullable=False),
+            sa.Column("progresso", sa.Integer(), nullable=False),
+            sa.Column("arquivo", sa.String(255), nullable=True),
+            sa.Column("mensagem", sa.Text(), nullable=True),
+            sa.Column("criado_em", sa.DateTime(), nullable=True),
+            sa.Column("atualizado_em", sa.DateTime(), nullable=True),
+            sa.Column("concluido_em", sa.DateTime(), nullable=True),
+            sa.Column("expira_em", sa.DateTime(), nullable=True),
+        )
+        op.create_index("ix_tarefas_exportacao_status", "tarefas_exportacao", ["status"])
+
+
+def downgrade():
+    op.drop_index("ix_tarefas_exportacao_status", table_name="tarefas_exportacao")
+    op.drop_table("tarefas_exportacao")
+    with op.batch_alter_table("pedidos") as batch:
+        batch.drop_column("total")
+    with op.batch_alter_table("pedido_cupcake") as batch:
+        batch.drop_column("preco_unitario")
@@ -0,0 +1,45 @@
+"""índices compostos das consultas mais frequentes
+
+Revision ID: 0003_indices_consultas
+Revises: 0002_precos_e_exportacoes
+Create Date: 2026-10-18 00:00:02
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0003_indices_consultas'
+down_revision = '0002_precos_e_exportacoes'
+branch_labels = None
+depends_on = None
+
+
+# (nome, tabela, colunas) — os mesmos declarados em backend/models.py
+INDICES = [
+    # histórico do cliente (/pedido, /api/pedidos) e carrinho aberto
+    ("ix_pedidos_usuario_finalizado_data", "pedidos", ["usuario_id", "finalizado", "data_pedido", "id"]),
+    # dashboard e exportações filtrados por status, ordenados por data
+    ("ix_pedidos_status_data", "pedidos", ["status", "data_pedido", "id"]),
+    # dashboard sem filtro, filtro por período e paginação por chave (data_pedido, id)
+    ("ix_pedidos_data", "pedidos", ["data_pedido", "id"]),
+    # chaves estrangeiras usadas nos joins e no selectinload dos itens
+    ("ix_pedido_cupcake_pedido_id", "pedido_cupcake", ["pedido_id"]),
+    ("ix_pedido_cupcake_cupcake_id", "pedido_cupcake", ["cupcake_id"]),
+    # linha do tempo de status de um pedido
+    ("ix_pedido_status_log_pedido_data", "pedido_status_log", ["pedido_id", "data_hora"]),
+]
+
+
+def upgrade():
+    inspetor = sa.inspect(op.get_bind())
+    for nome, tabela, colunas in INDICES:
+        existentes = {i["name"] for i in inspetor.get_indexes(tabela)}
+        if nome not in existentes:
+            op.create_index(nome, tabela, colunas)
+
+
+def downgrade():
+    for nome, tabela, _ in reversed(INDICES):
+        op.drop_index(nome, table_name=tabela)
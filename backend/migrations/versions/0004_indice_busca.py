@@ -0,0 +1,73 @@
+"""índice de busca textual dos cupcakes (ver backend/search.py)
+
+Revision ID: 0004_indice_busca
+Revises: 0003_indices_consultas
+Create Date: 2026-10-18 00:00:03
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0004_indice_busca'
+down_revision = '0003_indices_consultas'
+branch_labels = None
+depends_on = None
+
+
+# DDL copiada aqui de propósito: a migração não pode mudar junto com o código da
+# busca. A expressão do índice fts é a VETOR_PG de backend/search.py.
+
+# PostgreSQL: unaccent + tsvector (nome peso A, descrição peso B) + trigramas no nome
+DDL_PG = [
+    "CREATE EXTENSION IF NOT EXISTS unaccent",
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    # unaccent() é STABLE; o índice precisa de uma função IMMUTABLE
+    """CREATE OR REPLACE FUNCTION cupcake_unaccent(text) RETURNS text
+       AS $$ SELECT public.unaccent('public.unaccent', $1) $$
+       LANGUAGE sql IMMUTABLE PARALLEL SAFE STRICT""",
+    """CREATE INDEX IF NOT EXISTS ix_cupcakes_busca_fts ON cupcakes USING gin ((
+           setweight(to_tsvector('portuguese', cupcake_unaccent(coalesce(nome, ''))), 'A') ||
+           setweight(to_tsvector('portuguese', cupcake_unaccent(coalesce(descricao, ''))), 'B')
+       ))""",
+    "CREATE INDEX IF NOT EXISTS ix_cupcakes_nome_trgm ON cupcakes USING gin (cupcake_unaccent(nome) gin_trgm_ops)",
+]
+
+# SQLite: FTS5 com remoção de acentos, sincronizado com cupcakes por triggers
+DDL_SQLITE = [
+    """CREATE VIRTUAL TABLE IF NOT EXISTS cupcakes_busca USING fts5(
+           nome, descricao, content='cupcakes', content_rowid='id',
+           tokenize='unicode61 remove_diacritics 2')""",
+    """CREATE TRIGGER IF NOT EXISTS cupcakes_busca_ai AFTER INSERT ON cupcakes BEGIN
+           INSERT INTO cupcakes_busca(rowid, nome, descricao) VALUES (new.id, new.nome, new.descricao);
+       END""",
+    """CREATE TRIGGER IF NOT EXISTS cupcakes_busca_ad AFTER DELETE ON cupcakes BEGIN
+           INSERT INTO cupcakes_busca(cupcakes_busca, rowid, nome, descricao)
+           VALUES ('delete', old.id, old.nome, old.descricao);
+       END""",
+    """CREATE TRIGGER IF NOT EXISTS cupcakes_busca_au AFTER UPDATE ON cupcakes BEGIN
+           INSERT INTO cupcakes_busca(cupcakes_busca, rowid, nome, descricao)
+           VALUES ('delete', old.id, old.nome, old.descricao);
+           INSERT INTO cupcakes_busca(rowid, nome, descricao) VALUES (new.id, new.nome, new.descricao);
+       END""",
+    "INSERT INTO cupcakes_busca(cupcakes_busca) VALUES ('rebuild')",
+]
+
+
+def upgrade():
+    comandos = {"postgresql": DDL_PG, "sqlite": DDL_SQLITE}.get(op.get_bind().dialect.name, [])
+    for comando in comandos:
+        op.execute(sa.text(comando))
+
+
+def downgrade():
+    dialeto = op.get_bind().dialect.name
+    if dialeto == "postgresql":
+        op.execute("DROP INDEX IF EXISTS ix_cupcakes_nome_trgm")
+        op.execute("DROP INDEX IF EXISTS ix_cupcakes_busca_fts")
+        op.execute("DROP FUNCTION IF EXISTS cupcake_unaccent(text)")
+    elif dialeto == "sqlite":
+        for gatilho in ("cupcakes_busca_ai", "cupcakes_busca_ad", "cupcakes_busca_au"):
+            op.execute(f"DROP TRIGGER IF EXISTS {gatilho}")
+        op.execute("DROP TABLE IF EXISTS cupcakes_busca")
@@ -0,0 +1,32 @@
+"""chave de idempotência do checkout
+
+Revision ID: 0005_chave_idempotencia
+Revises: 0004_indice_busca
+Create Date: 2026-10-18 00:00:04
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0005_chave_idempotencia'
+down_revision = '0004_indice_busca'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    inspetor = sa.inspect(op.get_bind())
+    if "chave_idempotencia" not in {c["name"] for c in inspetor.get_columns("pedidos")}:
+        op.add_column("pedidos", sa.Column("chave_idempotencia", sa.String(64), nullable=True))
+
+    # UNIQUE via índice (pedidos antigos ficam com NULL, que não conflita)
+    if "uq_pedidos_chave_idempotencia" not in {i["name"] for i in inspetor.get_indexes("pedidos")}:
+        op.create_index("uq_pedidos_chave_idempotencia", "pedidos", ["chave_idempotencia"], unique=True)
+
+
+def downgrade():
+    op.drop_index("uq_pedidos_chave_idempotencia", table_name="pedidos")
+    with op.batch_alter_table("pedidos") as batch:
+        batch.drop_column("chave_idempotencia")
@@ -0,0 +1,34 @@
+"""carrinhos guardados no servidor
+
+Revision ID: 0006_carrinhos
+Revises: 0005_chave_idempotencia
+Create Date: 2026-10-18 00:00:05
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0006_carrinhos'
+down_revision = '0005_chave_idempotencia'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    if "carrinhos" in sa.inspect(op.get_bind()).get_table_names():
+        return
+
+    op.create_table(
+        "carrinhos",
+        sa.Column("id", sa.String(32), primary_key=True),
+        sa.Column("itens", sa.Text(), nullable=False),
+        sa.Column("atualizado_em", sa.DateTime(), nullable=True),
+    )
+    op.create_index("ix_carrinhos_atualizado_em", "carrinhos", ["atualizado_em"])
+
+
+def downgrade():
+    op.drop_index("ix_carrinhos_atualizado_em", table_name="carrinhos")
+    op.drop_table("carrinhos")
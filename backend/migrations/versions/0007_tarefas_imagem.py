@@ -0,0 +1,38 @@
+"""fila de processamento das imagens dos cupcakes
+
+Revision ID: 0007_tarefas_imagem
+Revises: 0006_carrinhos
+Create Date: 2026-10-18 00:00:06
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0007_tarefas_imagem'
+down_revision = '0006_carrinhos'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    if "tarefas_imagem" in sa.inspect(op.get_bind()).get_table_names():
+        return
+
+    op.create_table(
+        "tarefas_imagem",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("cupcake_id", sa.Integer(), sa.ForeignKey("cupcakes.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("original", sa.String(255), nullable=False),
+        sa.Column("status", sa.String(20), nullable=False),
+        sa.Column("mensagem", sa.Text(), nullable=True),
+        sa.Column("criado_em", sa.DateTime(), nullable=True),
+        sa.Column("atualizado_em", sa.DateTime(), nullable=True),
+    )
+    op.create_index("ix_tarefas_imagem_status", "tarefas_imagem", ["status"])
+
+
+def downgrade():
+    op.drop_index("ix_tarefas_imagem_status", table_name="tarefas_imagem")
+    op.drop_table("tarefas_imagem")
@@ -31,6 +31,19 @@ class Pedido(db.Model):
     status = db.Column(db.String(30), default="Recebido")
     data_pedido = db.Column(db.DateTime, default=datetime.utcnow) 
     avaliacao = db.Column(db.Integer, nullable=True)  # ★ Avaliação 1–5
+    total = db.Column(db.Float, nullable=True)  # gravado no checkout (soma dos itens)
+    chave_idempotencia = db.Column(db.String(64), nullable=True)  # token do carrinho (checkout idempotente)
+
+    __table_args__ = (
+        # histórico do cliente e carrinho aberto: WHERE usuario_id = ? AND finalizado = ? ORDER BY data_pedido, id
+        db.Index("ix_pedidos_usuario_finalizado_data", "usuario_id", "finalizado", "data_pedido", "id"),
+        # dashboard/exportações filtrados por status, em ordem de data
+        db.Index("ix_pedidos_status_data", "status", "data_pedido", "id"),
+        # dashboard sem filtro, intervalo de datas e paginação por chave (data_pedido, id)
+        db.Index("ix_pedidos_data", "data_pedido", "id"),
+        # um pedido por token de checkout: reenvios do mesmo formulário não duplicam o pedido
+        db.Index("uq_pedidos_chave_idempotencia", "chave_idempotencia", unique=True),
+    )
 
 
 class PedidoCupcake(db.Model):
@@ -39,10 +52,20 @@ class PedidoCupcake(db.Model):
     pedido_id = db.Column(db.Integer, db.ForeignKey('pedidos.id'), nullable=False)
     cupcake_id = db.Column(db.Integer, db.ForeignKey('cupcakes.id'), nullable=False)
     quantidade = db.Column(db.Integer, nullable=False)
+    preco_unitario = db.Column(db.Float, nullable=True)  # preço do cupcake no momento da compra
 
     pedido = db.relationship('Pedido', backref=db.backref('itens', lazy=True))
     cupcake = db.relationship('Cupcake')
 
+    __table_args__ = (
+        db.Index("ix_pedido_cupcake_pedido_id", "pedido_id"),    # itens de um pedido (selectinload)
+        db.Index("ix_pedido_cupcake_cupcake_id", "cupcake_id"),  # pedidos por cupcake / avaliações
+    )
+
+    @property
+    def subtotal(self):
+        return (self.quantidade or 0) * (self.preco_unitario or 0)
+
 class PedidoStatusLog(db.Model):
     __tablename__ = "pedido_status_log"
 
@@ -51,4 +74,48 @@ class PedidoStatusLog(db.Model):
     status = db.Column(db.String(30), nullable=False)
     data_hora = db.Column(db.DateTime, default=datetime.utcnow)
 
-    pedido = db.relationship("Pedido", backref=db.backref("status_log", order_by="PedidoStatusLog.data_hora"))
\ No newline at end of file
+    pedido = db.relationship("Pedido", backref=db.backref("status_log", order_by="PedidoStatusLog.data_hora"))
+
+    __table_args__ = (
+        db.Index("ix_pedido_status_log_pedido_data", "pedido_id", "data_hora"),  # histórico de status do pedido
+    )
+
+
+class TarefaExportacao(db.Model):
+    """Exportação pesada executada pelo worker (backend/worker.py) fora da requisição"""
+    __tablename__ = "tarefas_exportacao"
+
+    id = db.Column(db.Integer, primary_key=True)
+    usuario_id = db.Column(db.Integer, db.ForeignKey("usuarios.id"), nullable=False)
+    formato = db.Column(db.String(10), nullable=False)          # excel, pdf, csv, parquet
+    filtros = db.Column(db.Text, nullable=False, default="{}")  # JSON com status/cliente/datas
+    status = db.Column(db.String(20), nullable=False, default="pendente", index=True)
+    progresso = db.Column(db.Integer, nullable=False, default=0)  # 0–100
+    arquivo = db.Column(db.String(255), nullable=True)
+    mensagem = db.Column(db.Text, nullable=True)
+    criado_em = db.Column(db.DateTime, default=datetime.utcnow)
+    atualizado_em = db.Column(db.DateTime, default=datetime.utcnow)
+    concluido_em = db.Column(db.DateTime, nullable=True)
+    expira_em = db.Column(db.DateTime, nullable=True)
+
+
+class TarefaImagem(db.Model):
+    """Processamento de uma imagem enviada pelo admin (variantes feitas pelo worker)"""
+    __tablename__ = "tarefas_imagem"
+
+    id = db.Column(db.Integer, primary_key=True)
+    cupcake_id = db.Column(db.Integer, db.ForeignKey("cupcakes.id", ondelete="CASCADE"), nullable=False)
+    original = db.Column(db.String(255), nullable=False)    # arquivo enviado (fora da pasta pública)
+    status = db.Column(db.String(20), nullable=False, default="pendente", index=True)
+    mensagem = db.Column(db.Text, nullable=True)
+    criado_em = db.Column(db.DateTime, default=datetime.utcnow)
+    atualizado_em = db.Column(db.DateTime, default=datetime.utcnow)
+
+
+class Carrinho(db.Model):
+    """Carrinho guardado no servidor (backend/cart.py); a sessão só leva o id"""
+    __tablename__ = "carrinhos"
+
+    id = db.Column(db.String(32), primary_key=True)              # "u<usuario_id>" ou id aleatório do visitante
+    itens = db.Column(db.Text, nullable=False, default="{}")     # JSON {cupcake_id: quantidade}
+    atualizado_em = db.Column(db.DateTime, default=datetime.utcnow, index=True)
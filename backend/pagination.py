@@ -0,0 +1,98 @@
+import base64
+import json
+from datetime import datetime
+
+from sqlalchemy import tuple_
+
+from backend.models import db
+
+
+# =================== Paginação por chave (keyset) ===================
+
+def codificar_cursor(data, pedido_id):
+    """Token opaco para a posição (data_pedido, id) de um pedido"""
+    bruto = json.dumps([data.isoformat() if data else None, pedido_id])
+    return base64.urlsafe_b64encode(bruto.encode()).decode().rstrip("=")
+
+
+def decodificar_cursor(token):
+    """Devolve (data_pedido, id) ou None se o token for inválido"""
+    if not token:
+        return None
+    try:
+        bruto = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        data, pedido_id = json.loads(bruto)
+        return (datetime.fromisoformat(data) if data else None, int(pedido_id))
+    except (ValueError, TypeError):
+        return None
+
+
+def pagina_por_chave(query, coluna_data, coluna_id, cursor, por_pagina):
+    """
+    Próxima página em ordem (data desc, id desc) a partir do cursor.
+    Devolve (itens, proximo_cursor); busca um item a mais para saber se há próxima.
+    """
+    if cursor:
+        query = query.filter(tuple_(coluna_data, coluna_id) < cursor)
+
+    itens = query.order_by(coluna_data.desc(), coluna_id.desc()).limit(por_pagina + 1).all()
+
+    proximo = None
+    if len(itens) > por_pagina:
+        itens = itens[:por_pagina]
+        ultimo = itens[-1]
+        proximo = codificar_cursor(getattr(ultimo, coluna_data.key), getattr(ultimo, coluna_id.key))
+
+    return itens, proximo
+
+
+def pagina_nos_dois_sentidos(query, coluna_data, coluna_id, por_pagina, depois=None, antes=None):
+    """
+    Página em ordem (data desc, id desc) navegável para frente e para trás.
+
+    depois: cursor do último item da página anterior (avançar)
+    antes:  cursor do primeiro item da página seguinte (voltar)
+
+    Devolve (itens, proximo_cursor, anterior_cursor). O custo é o mesmo em
+    qualquer página: o índice (data, id) é percorrido a partir do cursor.
+    """
+    if antes:
+        # Volta lendo em ordem crescente a partir do cursor e inverte o resultado
+        itens = (
+            query.filter(tuple_(coluna_data, coluna_id) > antes)
+            .order_by(coluna_data.asc(), coluna_id.asc())
+            .limit(por_pagina + 1)
+            .all()
+        )
+        tem_anterior = len(itens) > por_pagina
+        itens = itens[:por_pagina][::-1]
+        tem_proximo = True
+    else:
+        if depois:
+            query = query.filter(tuple_(coluna_data, coluna_id) < depois)
+        itens = query.order_by(coluna_data.desc(), coluna_id.desc()).limit(por_pagina + 1).all()
+        tem_proximo = len(itens) > por_pagina
+        itens = itens[:por_pagina]
+        tem_anterior = depois is not None
+
+    def cursor_de(item):
+        return codificar_cursor(getattr(item, coluna_data.key), getattr(item, coluna_id.key))
+
+    proximo = cursor_de(itens[-1]) if itens and tem_proximo else None
+    anterior = cursor_de(itens[0]) if itens and tem_anterior else None
+    return itens, proximo, anterior
+
+
+def contagem_estimada(query):
+    """
+    Número aproximado de linhas da consulta segundo as estatísticas do
+    planejador do PostgreSQL (EXPLAIN, sem executar). None em outros bancos.
+    """
+    if db.engine.dialect.name != "postgresql":
+        return None
+
+    compilado = query.order_by(None).statement.compile(dialect=db.engine.dialect)
+    plano = db.session.connection().exec_driver_sql(
+        "EXPLAIN (FORMAT JSON) " + str(compilado), compilado.params
+    ).scalar()
+    return int(plano[0]["Plan"]["Plan Rows"])
@@ -0,0 +1,83 @@
+import glob
+import os
+import tempfile
+import threading
+
+
+# PDFs dos pedidos já gerados, compartilhados entre os workers do gunicorn
+PASTA = os.environ.get("PDF_CACHE_DIR", os.path.join(tempfile.gettempdir(), "cupcake_pdfs"))
+MAXIMO_BYTES = int(os.environ.get("PDF_CACHE_MAX_MB", "100")) * 1024 * 1024
+
+
+class CachePDF:
+    """
+    Cache em disco dos PDFs de pedido, com tamanho máximo e remoção LRU.
+
+    O arquivo se chama pedido_<id>_<versao>.pdf; a versão vem do status, da
+    avaliação e do último log de status (a mesma usada na ETag), então um PDF
+    desatualizado nunca é servido. O mtime marca o último uso: cada acesso
+    "toca" o arquivo e, passando do limite, os menos usados são apagados.
+    """
+
+    def __init__(self, pasta, maximo_bytes):
+        self.pasta = pasta
+        self.maximo_bytes = maximo_bytes
+        self.lock = threading.Lock()
+
+    def _caminho(self, pedido_id, versao):
+        return os.path.join(self.pasta, f"pedido_{pedido_id}_{versao}.pdf")
+
+    def abrir(self, pedido_id, versao):
+        """Arquivo aberto (pronto para send_file/sendfile) ou None se não está no cache"""
+        caminho = self._caminho(pedido_id, versao)
+        try:
+            arquivo = open(caminho, "rb")
+        except FileNotFoundError:
+            return None
+        try:
+            os.utime(caminho)   # uso recente para o LRU
+        except FileNotFoundError:
+            pass                # removido por outro worker; o descritor aberto continua válido
+        return arquivo
+
+    def salvar(self, pedido_id, versao, conteudo):
+        os.makedirs(self.pasta, exist_ok=True)
+        caminho = self._caminho(pedido_id, versao)
+        temporario = f"{caminho}.{os.getpid()}.tmp"
+        with open(temporario, "wb") as f:
+            f.write(conteudo)
+        os.replace(temporario, caminho)
+        self.limitar_tamanho()
+
+    def invalidar(self, pedido_id):
+        """Remove todas as versões do pedido (chamar depois de alterar o status)"""
+        for caminho in glob.glob(os.path.join(self.pasta, f"pedido_{pedido_id}_*.pdf")):
+            try:
+                os.remove(caminho)
+            except FileNotFoundError:
+                pass
+
+    def limitar_tamanho(self):
+        """Apaga os PDFs usados há mais tempo até caber em maximo_bytes"""
+        with self.lock:
+            arquivos = []
+            for entrada in os.scandir(self.pasta):
+                if entrada.name.endswith(".pdf"):
+                    try:
+                        st = entrada.stat()
+                    except FileNotFoundError:
+                        continue
+                    arquivos.append((st.st_mtime, st.st_size, entrada.path))
+
+            total = sum(tamanho for _, tamanho, _ in arquivos)
+            for _, tamanho, caminho in sorted(arquivos):
+                if total <= self.maximo_bytes:
+                    break
+                try:
+                    os.remove(caminho)
+                except FileNotFoundError:
+                    pass
+                total -= tamanho
+
+
+pdfs = CachePDF(PASTA, MAXIMO_BYTES)
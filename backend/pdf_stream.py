@@ -0,0 +1,132 @@
+import codecs
+import unicodedata
+import zlib
+from array import array
+
+
+# Letras com traço, que o NFKD não decompõe
+SEM_DECOMPOSICAO = str.maketrans({"Ł": "L", "ł": "l", "Đ": "D", "đ": "d", "Ħ": "H", "ħ": "h", "ı": "i"})
+
+
+def _fora_do_winansi(erro):
+    """
+    Caracteres sem lugar no cp1252 viram a letra sem o acento (ő -> o, Ł -> L)
+    e, se nem assim couberem (emoji, CJK), "?"
+    """
+    trecho = erro.object[erro.start:erro.end]
+    base = "".join(
+        c for c in unicodedata.normalize("NFKD", trecho.translate(SEM_DECOMPOSICAO))
+        if not unicodedata.combining(c)
+    )
+    return base.encode("cp1252", "replace").decode("cp1252"), erro.end
+
+
+codecs.register_error("pdf_winansi", _fora_do_winansi)
+
+
+class PDFEmFluxo:
+    """
+    Escritor de PDF que grava cada página no destino assim que ela termina.
+
+    Usa a mesma interface básica do canvas do reportlab (setFont, drawString,
+    showPage, save), mas não guarda as páginas em memória: só o offset de
+    cada objeto (para a tabela xref) fica guardado até o final.
+    Fontes: Helvetica e Helvetica-Bold (Type1 padrão, WinAnsiEncoding).
+
+    O texto vai em cp1252, o único alfabeto dessas fontes sem embutir um
+    arquivo de fonte: português e as línguas da Europa ocidental saem
+    inteiros; outras letras acentuadas perdem o acento e o que não tem
+    equivalente (emoji, CJK) sai como "?".
+    """
+
+    LARGURA, ALTURA = 595.27, 841.89  # A4 em pontos
+    FONTES = {"Helvetica": "F1", "Helvetica-Bold": "F2"}
+
+    # objetos fixos: 1 catálogo, 2 árvore de páginas, 3 e 4 fontes
+    CATALOGO, PAGINAS, PRIMEIRO_LIVRE = 1, 2, 5
+
+    def __init__(self, destino):
+        self.destino = destino
+        self.posicao = 0
+        self.offsets = array("Q", [0] * self.PRIMEIRO_LIVRE)
+        self.paginas = array("L")
+        self.comandos = []
+        self.fonte = ("F1", 10)
+
+        self._escrever(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+        for numero, nome in ((3, "Helvetica"), (4, "Helvetica-Bold")):
+            self._objeto(numero, (
+                f"<< /Type /Font /Subtype /Type1 /BaseFont /{nome} "
+                f"/Encoding /WinAnsiEncoding >>"
+            ).encode())
+
+    # ---------- interface estilo reportlab ----------
+
+    def setFont(self, nome, tamanho):
+        self.fonte = (self.FONTES[nome], tamanho)
+
+    def drawString(self, x, y, texto):
+        fonte, tamanho = self.fonte
+        self.comandos.append(
+            b"BT /%s %g Tf %.2f %.2f Td (%s) Tj ET" % (fonte.encode(), tamanho, x, y, self._texto(texto))
+        )
+
+    def showPage(self):
+        conteudo = zlib.compress(b"\n".join(self.comandos))
+        self.comandos = []
+
+        numero_conteudo = self._novo_objeto()
+        self._objeto(
+            numero_conteudo,
+            b"<< /Length %d /Filter /FlateDecode >>\nstream\n%s\nendstream" % (len(conteudo), conteudo),
+        )
+
+        numero_pagina = self._novo_objeto()
+        self._objeto(numero_pagina, (
+            f"<< /Type /Page /Parent {self.PAGINAS} 0 R "
+            f"/MediaBox [0 0 {self.LARGURA} {self.ALTURA}] "
+            f"/Resources << /Font << /F1 3 0 R /F2 4 0 R >> >> "
+            f"/Contents {numero_conteudo} 0 R >>"
+        ).encode())
+        self.paginas.append(numero_pagina)
+
+    def save(self):
+        if self.comandos or not self.paginas:
+            self.showPage()
+
+        # árvore de páginas: /Kids escrito em partes para não montar uma string gigante
+        self.offsets[self.PAGINAS] = self.posicao
+        self._escrever(b"%d 0 obj\n<< /Type /Pages /Count %d /Kids [" % (self.PAGINAS, len(self.paginas)))
+        for inicio in range(0, len(self.paginas), 1000):
+            self._escrever(b"".join(b"%d 0 R " % n for n in self.paginas[inicio:inicio + 1000]))
+        self._escrever(b"] >>\nendobj\n")
+
+        self._objeto(self.CATALOGO, b"<< /Type /Catalog /Pages %d 0 R >>" % self.PAGINAS)
+
+        inicio_xref = self.posicao
+        self._escrever(b"xref\n0 %d\n0000000000 65535 f \n" % len(self.offsets))
+        for inicio in range(1, len(self.offsets), 1000):
+            self._escrever(b"".join(b"%010d 00000 n \n" % o for o in self.offsets[inicio:inicio + 1000]))
+        self._escrever(
+            b"trailer\n<< /Size %d /Root %d 0 R >>\nstartxref\n%d\n%%%%EOF\n"
+            % (len(self.offsets), self.CATALOGO, inicio_xref)
+        )
+
+    # ---------- auxiliares ----------
+
+    def _escrever(self, dados):
+        self.destino.write(dados)
+        self.posicao += len(dados)
+
+    def _novo_objeto(self):
+        self.offsets.append(0)
+        return len(self.offsets) - 1
+
+    def _objeto(self, numero, corpo):
+        self.offsets[numero] = self.posicao
+        self._escrever(b"%d 0 obj\n%s\nendobj\n" % (numero, corpo))
+
+    @staticmethod
+    def _texto(texto):
+        dados = str(texto).encode("cp1252", "pdf_winansi")
+        return dados.replace(b"\\", b"\\\\").replace(b"(", b"\\(").replace(b")", b"\\)")
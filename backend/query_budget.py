@@ -0,0 +1,152 @@
+import os
+import re
+import threading
+from collections import Counter
+from contextlib import contextmanager
+from functools import wraps
+
+from flask import current_app, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+
+# Estourar o limite vira exceção (500) em vez de só um aviso no log. Com
+# app.testing também: a rota acima do limite derruba o teste que a chamou.
+ESTRITO = os.environ.get("LIMITE_QUERIES_ESTRITO") == "1"
+# Rastreia todas as requisições (não só as rotas com @limite_queries) e avisa
+# dos N+1; em debug fica ligado sempre
+DETECTAR_N1 = os.environ.get("DETECTAR_N1") == "1"
+REPETICOES_N1 = int(os.environ.get("N1_REPETICOES", "5"))   # mesma query repetida = suspeita de N+1
+
+IN_LOTE = "IN (?...)"        # lista de parâmetros de um IN, na forma normalizada
+
+_local = threading.local()   # rastreadores ativos nesta thread
+
+
+class LimiteQueriesExcedido(Exception):
+    pass
+
+
+class Rastreador:
+    """Queries executadas dentro de um bloco, agrupadas pela forma do SQL"""
+
+    def __init__(self):
+        self.total = 0
+        self.formas = Counter()
+
+    def suspeitas_n1(self, repeticoes=REPETICOES_N1):
+        """
+        Formas repetidas pelo menos `repeticoes` vezes: o padrão do lazy-load
+        dentro de um loop. Queries com IN (...) ficam de fora: são carregamentos
+        em lote (selectinload, yield_per), uma por bloco de linhas e não por linha.
+        """
+        return [
+            (forma, n) for forma, n in self.formas.most_common()
+            if n >= repeticoes and IN_LOTE not in forma
+        ]
+
+
+def forma_sql(statement):
+    """
+    SQL sem os valores: os parâmetros já vêm separados, só falta juntar as
+    listas de IN (?, ?, ?) de tamanhos diferentes e os espaços.
+    """
+    forma = re.sub(r"%\(\w+\)s|\?", "?", statement)
+    forma = re.sub(r"\bIN \(\?(?:\s*,\s*\?)*\)", IN_LOTE, forma, flags=re.IGNORECASE)
+    return " ".join(forma.split())
+
+
+def _registrar(conn, cursor, statement, parameters, context, executemany):
+    ativos = getattr(_local, "ativos", None)
+    if ativos:
+        forma = forma_sql(statement)
+        for rastreador in ativos:
+            rastreador.total += 1
+            rastreador.formas[forma] += 1
+
+
+def _ativos():
+    """Rastreadores desta thread (o listener é registrado no primeiro uso)"""
+    if not event.contains(Engine, "after_cursor_execute", _registrar):
+        event.listen(Engine, "after_cursor_execute", _registrar)
+    return _local.__dict__.setdefault("ativos", [])
+
+
+@contextmanager
+def rastrear():
+    """Conta as queries feitas no bloco (nesta thread): with rastrear() as r: ...; r.total"""
+    rastreador = Rastreador()
+    ativos = _ativos()
+    ativos.append(rastreador)
+    try:
+        yield rastreador
+    finally:
+        ativos.remove(rastreador)
+
+
+def verificar(rastreador, nome, maximo=None):
+    problemas = []
+    if maximo is not None and rastreador.total > maximo:
+        problemas.append(f"{rastreador.total} queries (limite {maximo})")
+    for forma, n in rastreador.suspeitas_n1():
+        problemas.append(f"possível N+1: {n}x {forma[:300]}")
+    if not problemas:
+        return
+
+    mensagem = f"{nome}: " + "; ".join(problemas)
+    if ESTRITO or current_app.testing:
+        raise LimiteQueriesExcedido(mensagem)
+    current_app.logger.warning(mensagem)
+
+
+def limite_queries(maximo):
+    """
+    Limite de queries da rota (só as feitas pela view, incluindo o render do
+    template). Acima do limite, ou com a mesma query repetida REPETICOES_N1
+    vezes, registra um aviso; com LIMITE_QUERIES_ESTRITO=1 ou app.testing
+    levanta LimiteQueriesExcedido.
+
+        @bp.route("/pedido")
+        @login_required
+        @limite_queries(4)
+        def pedido(): ...
+    """
+    def decorador(f):
+        @wraps(f)
+        def decorated_function(*args, **kwargs):
+            with rastrear() as rastreador:
+                resposta = f(*args, **kwargs)
+            verificar(rastreador, request.endpoint, maximo)
+            return resposta
+
+        decorated_function.limite_queries = maximo
+        return decorated_function
+    return decorador
+
+
+# =================== Todas as requisições (DETECTAR_N1) ===================
+
+def instalar(app):
+    """Com DETECTAR_N1=1 (ou em debug) toda requisição é rastreada: N+1 no log e X-Queries na resposta"""
+    if not (DETECTAR_N1 or app.debug):
+        return
+
+    @app.before_request
+    def _iniciar_rastreio():
+        _local.requisicao = Rastreador()
+        _ativos().append(_local.requisicao)
+
+    @app.after_request
+    def _verificar_rastreio(resp):
+        rastreador = getattr(_local, "requisicao", None)
+        if rastreador is not None:
+            resp.headers["X-Queries"] = str(rastreador.total)
+            verificar(rastreador, request.endpoint)
+        return resp
+
+    @app.teardown_request
+    def _encerrar_rastreio(exc):
+        rastreador = getattr(_local, "requisicao", None)
+        if rastreador is not None:
+            _local.requisicao = None
+            _ativos().remove(rastreador)
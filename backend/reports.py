@@ -0,0 +1,94 @@
+from datetime import datetime
+
+from sqlalchemy import case, distinct, func
+
+from backend.models import db, Usuario, Pedido
+
+
+STATUS_PEDIDO = ["Recebido", "Em produção", "Pronto", "Entregue", "Cancelado"]
+
+
+# =================== Filtros do painel ===================
+
+def ler_filtros(args):
+    """Lê os filtros de pedidos (status, cliente, datas) de request.args"""
+    filtros = {
+        "status": args.get("status") or None,
+        "cliente": args.get("cliente") or None,
+        "data_inicio": args.get("data_inicio") or None,
+        "data_fim": args.get("data_fim") or None,
+        "inicio": None,
+        "fim": None,
+    }
+
+    if filtros["data_inicio"]:
+        try:
+            filtros["inicio"] = datetime.strptime(filtros["data_inicio"], "%Y-%m-%d")
+        except ValueError:
+            pass
+
+    if filtros["data_fim"]:
+        try:
+            df = datetime.strptime(filtros["data_fim"], "%Y-%m-%d")
+            filtros["fim"] = df.replace(hour=23, minute=59, second=59)
+        except ValueError:
+            pass
+
+    return filtros
+
+
+def aplicar_filtros(query, filtros, com_usuario=False):
+    """
+    Aplica os filtros em qualquer query que já selecione a partir de Pedido.
+    com_usuario=True indica que a query já faz JOIN com usuarios.
+    """
+    if filtros["status"]:
+        query = query.filter(Pedido.status == filtros["status"])
+
+    # JOIN no usuario só quando o filtro por nome é usado
+    if filtros["cliente"]:
+        if not com_usuario:
+            query = query.join(Usuario, Usuario.id == Pedido.usuario_id)
+        query = query.filter(Usuario.nome.ilike(f"%{filtros['cliente']}%"))
+
+    if filtros["inicio"]:
+        query = query.filter(Pedido.data_pedido >= filtros["inicio"])
+
+    if filtros["fim"]:
+        query = query.filter(Pedido.data_pedido <= filtros["fim"])
+
+    return query
+
+
+# =================== Métricas do painel ===================
+
+def metricas_dashboard(filtros):
+    """
+    Calcula as métricas do painel em UMA query agregada sobre pedidos:
+    total de pedidos, clientes distintos, faturamento e contagem por status.
+    O faturamento usa o total gravado no checkout (Pedido.total).
+    """
+    por_status = [
+        func.count(case((Pedido.status == status, Pedido.id)))
+        for status in STATUS_PEDIDO
+    ]
+
+    query = (
+        db.session.query(
+            func.count(Pedido.id),
+            func.count(distinct(Pedido.usuario_id)),
+            func.coalesce(func.sum(Pedido.total), 0),
+            *por_status
+        )
+        .select_from(Pedido)
+    )
+
+    linha = aplicar_filtros(query, filtros).one()
+    total_pedidos, total_clientes, total_faturado = linha[0], linha[1], linha[2]
+
+    return {
+        "total_pedidos": total_pedidos,
+        "total_clientes": total_clientes,
+        "total_faturado": float(total_faturado or 0),
+        "stats_status": dict(zip(STATUS_PEDIDO, linha[3:])),
+    }
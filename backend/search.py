@@ -0,0 +1,97 @@
+import re
+import unicodedata
+
+from flask import current_app
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
+
+from backend.models import db
+
+
+LIMITE_RESULTADOS = 50
+
+
+# =================== Índice ===================
+
+# Criado pela migração 0004_indice_busca (python -m backend.init_db). A consulta
+# do PostgreSQL usa o índice GIN só se VETOR_PG for a mesma expressão dele.
+
+# PostgreSQL: unaccent + tsvector (nome peso A, descrição peso B) + trigramas no nome
+VETOR_PG = (
+    "setweight(to_tsvector('portuguese', cupcake_unaccent(coalesce(nome, ''))), 'A') || "
+    "setweight(to_tsvector('portuguese', cupcake_unaccent(coalesce(descricao, ''))), 'B')"
+)
+
+
+# =================== Consulta ===================
+
+def termos(busca):
+    """Quebra a busca em palavras (só letras/números, sem acento e em minúsculas)"""
+    return [remover_acentos(t) for t in re.findall(r"\w+", busca.casefold())]
+
+
+def remover_acentos(texto):
+    return "".join(
+        c for c in unicodedata.normalize("NFKD", texto) if not unicodedata.combining(c)
+    )
+
+
+def _buscar_pg(palavras, busca, limite):
+    tsquery = " & ".join(f"{p}:*" for p in palavras)  # prefixo: busca enquanto digita
+    linhas = db.session.execute(text(f"""
+        SELECT c.id
+          FROM cupcakes c, to_tsquery('portuguese', cupcake_unaccent(:tsquery)) q
+         WHERE c.ativo
+           AND (({VETOR_PG}) @@ q OR cupcake_unaccent(c.nome) % cupcake_unaccent(:busca))
+         ORDER BY ts_rank(({VETOR_PG}), q) + similarity(cupcake_unaccent(c.nome), cupcake_unaccent(:busca)) DESC,
+                  c.id
+         LIMIT :limite
+    """), {"tsquery": tsquery, "busca": busca, "limite": limite})
+    return [id for (id,) in linhas]
+
+
+def _buscar_sqlite(palavras, busca, limite):
+    consulta = " ".join(f'"{p}"*' for p in palavras)
+    linhas = db.session.execute(text("""
+        SELECT c.id
+          FROM cupcakes_busca
+          JOIN cupcakes c ON c.id = cupcakes_busca.rowid
+         WHERE cupcakes_busca MATCH :consulta
+           AND c.ativo = 1
+         ORDER BY bm25(cupcakes_busca, 10.0, 1.0), c.id
+         LIMIT :limite
+    """), {"consulta": consulta, "limite": limite})
+    return [id for (id,) in linhas]
+
+
+def buscar_ids(busca, limite=LIMITE_RESULTADOS):
+    """
+    IDs dos cupcakes ativos que combinam com a busca, do mais relevante ao
+    menos relevante. Devolve None se o banco não tiver índice de busca
+    (quem chama usa a busca em memória).
+    """
+    palavras = termos(busca)
+    if not palavras:
+        return []
+
+    buscador = {"postgresql": _buscar_pg, "sqlite": _buscar_sqlite}.get(db.engine.dialect.name)
+    if buscador is None:
+        return None
+
+    try:
+        return buscador(palavras, busca, limite)
+    except DBAPIError:
+        db.session.rollback()
+        current_app.logger.warning("Índice de busca ausente; rode python -m backend.init_db")
+        return None
+
+
+def filtrar_em_memoria(cupcakes, busca):
+    """Alternativa sem índice: todas as palavras como prefixo de alguma palavra do nome/descrição"""
+    palavras = termos(busca)
+
+    def combina(c):
+        texto = termos(f"{c.nome} {c.descricao or ''}")
+        return all(any(t.startswith(p) for t in texto) for p in palavras)
+
+    return [c for c in cupcakes if combina(c)]
@@ -0,0 +1,132 @@
+"""
+Worker das exportações e das imagens em segundo plano.
+
+Uso: python -m backend.worker
+
+Em produção ele roda como filho supervisionado do master do gunicorn
+(backend/gunicorn_conf.py): precisa do mesmo disco do site (uploads,
+variantes das imagens e arquivos exportados).
+
+Fica consultando as tabelas tarefas_imagem e tarefas_exportacao (imagens
+primeiro: são rápidas e deixam a vitrine com placeholder), executa uma
+tarefa por vez e remove os arquivos vencidos (e os carrinhos abandonados, quando guardados
+no banco). Pode haver mais de um worker rodando.
+"""
+import os
+import subprocess
+import sys
+import threading
+import time
+import traceback
+
+from backend.app import app
+from backend.models import db, TarefaImagem
+from backend.images import processar_imagem, devolver_tarefas_travadas
+from backend.jobs import pegar_proxima_tarefa, executar_tarefa, expirar_artefatos
+from backend.cart import carrinhos
+
+
+INTERVALO = float(os.environ.get("WORKER_INTERVALO", "2"))  # segundos entre consultas
+INTERVALO_LIMPEZA = 60
+ESPERA_MAXIMA = 60   # segundos entre reinícios quando o worker cai logo depois de subir
+
+
+def main():
+    with app.app_context():
+        print("Worker de exportações e imagens iniciado.", flush=True)
+
+        ultima_limpeza = 0
+        while True:
+            if time.monotonic() - ultima_limpeza > INTERVALO_LIMPEZA:
+                removidos = expirar_artefatos()
+                if removidos:
+                    print(f"{removidos} arquivo(s) expirado(s) removido(s).", flush=True)
+                carrinhos.limpar_expirados()
+                devolver_tarefas_travadas()
+                ultima_limpeza = time.monotonic()
+
+            imagem = pegar_proxima_tarefa(TarefaImagem)
+            if imagem is not None:
+                print(f"Processando imagem do cupcake #{imagem.cupcake_id}...", flush=True)
+                try:
+                    processar_imagem(imagem)
+                except Exception:
+                    traceback.print_exc()
+                finally:
+                    db.session.remove()
+                continue
+
+            tarefa = pegar_proxima_tarefa()
+            if tarefa is None:
+                db.session.remove()
+                time.sleep(INTERVALO)
+                continue
+
+            print(f"Executando exportação #{tarefa.id} ({tarefa.formato})...", flush=True)
+            try:
+                executar_tarefa(tarefa)
+                print(f"Exportação #{tarefa.id} concluída.", flush=True)
+            except Exception:
+                traceback.print_exc()
+            finally:
+                db.session.remove()
+
+
+class Supervisor:
+    """
+    Mantém um `python -m backend.worker` rodando ao lado do site. Se ele sair,
+    o erro vai para o log e um novo sobe; caindo logo depois de subir, a
+    espera dobra a cada tentativa (até ESPERA_MAXIMA). Saída com código 0 é
+    o Ctrl+C/SIGINT do grupo: o servidor está parando e o worker não volta.
+    """
+
+    def __init__(self, log):
+        self.log = log
+        self.processo = None
+        self.parando = threading.Event()
+        self.thread = None
+        # O Popen roda numa thread do master enquanto ele faz fork dos workers do
+        # site; um fork no meio do Popen herdaria o pipe interno dele, e o Popen
+        # ficaria esperando aquele worker do site terminar. Um espera o outro.
+        self.lancando = threading.Lock()
+        os.register_at_fork(before=self.lancando.acquire,
+                            after_in_parent=self.lancando.release,
+                            after_in_child=self.lancando.release)
+
+    def iniciar(self):
+        if self.thread is None:
+            self.thread = threading.Thread(target=self._manter, name="supervisor-worker", daemon=True)
+            self.thread.start()
+
+    def _manter(self):
+        espera = 1
+        while not self.parando.is_set():
+            inicio = time.monotonic()
+            with self.lancando:
+                self.processo = subprocess.Popen([sys.executable, "-m", "backend.worker"])
+            self.log.info("Worker de tarefas iniciado (pid %s)", self.processo.pid)
+            codigo = self.processo.wait()
+            if self.parando.is_set() or codigo == 0:
+                self.log.info("Worker de tarefas encerrado")
+                return
+
+            espera = 1 if time.monotonic() - inicio > ESPERA_MAXIMA else min(espera * 2, ESPERA_MAXIMA)
+            self.log.error("Worker de tarefas saiu (código %s); reiniciando em %ss", codigo, espera)
+            self.parando.wait(espera)
+
+    def parar(self, timeout=10):
+        self.parando.set()
+        if self.processo is None or self.processo.poll() is not None:
+            return
+        self.processo.terminate()
+        try:
+            self.processo.wait(timeout)
+        except subprocess.TimeoutExpired:
+            self.processo.kill()
+
+
+if __name__ == "__main__":
+    try:
+        main()
+    except KeyboardInterrupt:   # Ctrl+C, ou o SIGINT do grupo quando o gunicorn para
+        print("Worker encerrado.", flush=True)
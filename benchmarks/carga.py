@@ -0,0 +1,116 @@
+"""
+Teste de carga HTTP contra um servidor já rodando (gunicorn ou flask run).
+
+Uso: python -m benchmarks.carga http://127.0.0.1:8000 [-c 32] [-d 20]
+         [--email admin@x --senha ...] [/vitrine /buscar_cupcakes?q=limao ...]
+
+Cada conexão simulada é uma thread com seu próprio cookie de sessão que
+repete as URLs em sequência. No fim mostra requisições por segundo,
+latências (p50/p95/p99) e erros, por URL e no total.
+"""
+import argparse
+import http.client
+import http.cookies
+import statistics
+import threading
+import time
+from urllib.parse import urlencode, urlsplit
+
+
+URLS_PADRAO = ["/vitrine", "/buscar_cupcakes?q=chocolate", "/api/carrinho"]
+
+
+class Cliente:
+    """Conexão keep-alive com cookie de sessão (um por thread)"""
+
+    def __init__(self, base):
+        partes = urlsplit(base)
+        self.conexao = http.client.HTTPConnection(partes.hostname, partes.port or 80, timeout=120)
+        self.cookies = {}
+
+    def requisitar(self, metodo, caminho, corpo=None):
+        cabecalhos = {"Accept-Encoding": "gzip"}
+        if self.cookies:
+            cabecalhos["Cookie"] = "; ".join(f"{k}={v}" for k, v in self.cookies.items())
+        if corpo is not None:
+            cabecalhos["Content-Type"] = "application/x-www-form-urlencoded"
+        try:
+            self.conexao.request(metodo, caminho, body=corpo, headers=cabecalhos)
+            resposta = self.conexao.getresponse()
+            resposta.read()
+        except (http.client.HTTPException, OSError):
+            self.conexao.close()   # reconecta na próxima
+            return None
+        for valor in resposta.headers.get_all("Set-Cookie") or []:
+            cookie = http.cookies.SimpleCookie(valor)
+            self.cookies.update({k: m.value for k, m in cookie.items()})
+        return resposta.status
+
+    def login(self, email, senha):
+        self.requisitar("POST", "/login", urlencode({"email": email, "senha": senha}))
+
+
+def percentil(valores, p):
+    if not valores:
+        return 0.0
+    valores = sorted(valores)
+    return valores[min(len(valores) - 1, int(len(valores) * p / 100))]
+
+
+def rodar(base, urls, conexoes, duracao, email=None, senha=None):
+    """Dispara a carga e devolve {url: {"latencias": [...], "erros": n}}"""
+    resultados = {url: {"latencias": [], "erros": 0} for url in urls}
+    lock = threading.Lock()
+    fim = time.monotonic() + duracao
+
+    def trabalhar(indice):
+        cliente = Cliente(base)
+        if email:
+            cliente.login(email, senha)
+        posicao = indice   # conexões começam em URLs diferentes
+        while time.monotonic() < fim:
+            url = urls[posicao % len(urls)]
+            posicao += 1
+            t0 = time.perf_counter()
+            status = cliente.requisitar("GET", url)
+            decorrido = time.perf_counter() - t0
+            with lock:
+                if status is None or status >= 500:
+                    resultados[url]["erros"] += 1
+                else:
+                    resultados[url]["latencias"].append(decorrido)
+
+    threads = [threading.Thread(target=trabalhar, args=(i,)) for i in range(conexoes)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return resultados
+
+
+def imprimir(resultados, duracao):
+    print(f"{'URL':40} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'erros':>6}")
+    todas = []
+    for url, r in resultados.items():
+        lat = r["latencias"]
+        todas += lat
+        print(f"{url[:40]:40} {len(lat) / duracao:8.1f} {percentil(lat, 50) * 1000:8.1f} "
+              f"{percentil(lat, 95) * 1000:8.1f} {percentil(lat, 99) * 1000:8.1f} {r['erros']:6}")
+    erros = sum(r["erros"] for r in resultados.values())
+    media = statistics.mean(todas) * 1000 if todas else 0
+    print(f"{'TOTAL':40} {len(todas) / duracao:8.1f} {percentil(todas, 50) * 1000:8.1f} "
+          f"{percentil(todas, 95) * 1000:8.1f} {percentil(todas, 99) * 1000:8.1f} {erros:6}  (média {media:.1f} ms)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("base", help="ex.: http://127.0.0.1:8000")
+    parser.add_argument("urls", nargs="*", default=URLS_PADRAO)
+    parser.add_argument("-c", "--conexoes", type=int, default=32)
+    parser.add_argument("-d", "--duracao", type=float, default=20, help="segundos")
+    parser.add_argument("--email")
+    parser.add_argument("--senha")
+    args = parser.parse_intermixed_args()
+
+    resultados = rodar(args.base, args.urls, args.conexoes, args.duracao, args.email, args.senha)
+    imprimir(resultados, args.duracao)
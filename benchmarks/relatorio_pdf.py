@@ -0,0 +1,103 @@
+"""
+Benchmark do relatório PDF (/exportar_pdf): tempo e pico de memória.
+
+Uso: python -m benchmarks.relatorio_pdf [10000 100000 500000]
+
+Cada tamanho roda num processo filho, com um banco SQLite temporário
+populado com pedidos sintéticos (1 a 3 itens por pedido). O pico de memória
+é o ru_maxrss do processo filho, medido antes e depois da geração.
+"""
+import multiprocessing
+import os
+import random
+import resource
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from flask import Flask
+
+from backend.models import db, Usuario, Cupcake, Pedido, PedidoCupcake
+from backend.exports import gerar_pdf
+from backend.reports import ler_filtros
+
+
+TAMANHOS = [10_000, 100_000, 500_000]
+STATUS = ["Recebido", "Em produção", "Pronto", "Entregue", "Cancelado"]
+
+
+def criar_app(caminho_db):
+    app = Flask(__name__)
+    app.config["SQLALCHEMY_DATABASE_URI"] = f"sqlite:///{caminho_db}"
+    app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
+    db.init_app(app)
+    return app
+
+
+def popular(n_pedidos, lote=20_000):
+    rnd = random.Random(42)
+    db.create_all()
+
+    db.session.execute(Usuario.__table__.insert(), [
+        {"id": i, "nome": f"Cliente {i}", "email": f"c{i}@ex.com", "senha": "x"}
+        for i in range(1, 1001)
+    ])
+    db.session.execute(Cupcake.__table__.insert(), [
+        {"id": i, "nome": f"Cupcake {i}", "descricao": "-", "preco": 5.0 + i, "imagem_url": "x.jpg", "ativo": True}
+        for i in range(1, 21)
+    ])
+
+    inicio = datetime(2024, 1, 1)
+    item_id = 1
+    for base in range(1, n_pedidos + 1, lote):
+        pedidos, itens = [], []
+        for pid in range(base, min(base + lote, n_pedidos + 1)):
+            total = 0.0
+            for _ in range(rnd.randint(1, 3)):
+                cid, qtd = rnd.randint(1, 20), rnd.randint(1, 4)
+                itens.append({"id": item_id, "pedido_id": pid, "cupcake_id": cid,
+                              "quantidade": qtd, "preco_unitario": 5.0 + cid})
+                total += qtd * (5.0 + cid)
+                item_id += 1
+            pedidos.append({"id": pid, "usuario_id": rnd.randint(1, 1000), "finalizado": True,
+                            "status": rnd.choice(STATUS), "total": total,
+                            "data_pedido": inicio + timedelta(minutes=rnd.randint(0, 525_600))})
+        db.session.execute(Pedido.__table__.insert(), pedidos)
+        db.session.execute(PedidoCupcake.__table__.insert(), itens)
+    db.session.commit()
+
+
+def rss_maximo():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024  # KiB -> MiB (Linux)
+
+
+def medir(n_pedidos):
+    with tempfile.TemporaryDirectory() as tmp:
+        app = criar_app(os.path.join(tmp, "bench.db"))
+        with app.app_context():
+            popular(n_pedidos)
+            db.session.remove()
+            saida = os.path.join(tmp, "relatorio.pdf")
+
+            rss_antes = rss_maximo()
+            t0 = time.perf_counter()
+            with open(saida, "wb") as f:
+                for bloco in gerar_pdf(ler_filtros({})):
+                    f.write(bloco)
+            segundos = time.perf_counter() - t0
+            rss_depois = rss_maximo()
+
+            tamanho = os.path.getsize(saida)
+
+    print(f"{n_pedidos:>9,} pedidos | {segundos:8.2f} s | {n_pedidos / segundos:8.0f} pedidos/s "
+          f"| RSS máx {rss_depois:7.1f} MiB (+{rss_depois - rss_antes:6.1f}) | PDF {tamanho / 2**20:6.1f} MiB",
+          flush=True)
+
+
+if __name__ == "__main__":
+    for n in [int(a) for a in sys.argv[1:]] or TAMANHOS:
+        # processo novo por tamanho: o ru_maxrss não carrega o pico da rodada anterior
+        processo = multiprocessing.get_context("spawn").Process(target=medir, args=(n,))
+        processo.start()
+        processo.join()
@@ -0,0 +1,292 @@
+"""
+Benchmark reproduzível das rotas principais (vitrine, busca, carrinho,
+checkout, histórico, painel do admin e exportações) contra uma base sintética.
+
+Uso: python -m benchmarks.rotas [--db sqlite:////tmp/bench.db | postgresql://...]
+         [--usuarios 200 --cupcakes 40 --pedidos 5000] [-r 30] [--saida antes.json]
+     python -m benchmarks.rotas --comparar antes.json depois.json [--limite 10]
+
+As requisições passam pelo test_client do Flask (sem rede), na mesma app
+criada por create_app(). Para cada rota: latência p50/p95/p99, requisições
+por segundo (sequenciais), queries por requisição e o pico de RSS do
+processo. O resultado vai para um JSON; --comparar mostra a diferença entre
+duas rodadas e termina com código 1 se alguma métrica piorou além do limite.
+
+A base é recriada pelas migrations (mesmos índices e busca da produção) e
+populada por backend/gerar_dados.py, sempre com a mesma semente. Em PostgreSQL
+o banco informado é APAGADO — use um banco só para isso.
+"""
+import argparse
+import json
+import os
+import platform
+import re
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+from benchmarks.carga import percentil
+
+
+def rss_maximo():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024  # MB (Linux)
+
+
+def commit_atual():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+# =================== Base ===================
+
+def preparar_banco(app, tamanhos):
+    """Banco zerado pelas migrations e populado com a massa sintética"""
+    from flask_migrate import downgrade, upgrade
+    from backend.gerar_dados import gerar
+
+    with app.app_context():
+        downgrade(revision="base")
+        upgrade()
+        gerar(**tamanhos)
+
+
+# =================== Cenários ===================
+
+class Cenario:
+    """
+    Uma rota medida. `requisicao(cliente)` faz a chamada; `preparar(cliente)`
+    (opcional) roda antes de cada repetição, fora da medição, e o que ele
+    devolver vai como segundo argumento de `requisicao`.
+    """
+
+    def __init__(self, nome, usuario, requisicao, repeticoes=None, preparar=None):
+        self.nome = nome
+        self.usuario = usuario        # "cliente", "admin" ou None (visitante)
+        self.requisicao = requisicao
+        self.repeticoes = repeticoes  # None: usa o -r da linha de comando
+        self.preparar = preparar
+
+
+def encher_carrinho(cliente):
+    cliente.post("/api/carrinho", json={"alteracoes": [
+        {"id": 1, "quantidade": 2}, {"id": 2, "quantidade": 1}, {"id": 3, "quantidade": 3},
+    ]})
+
+
+def abrir_checkout(cliente):
+    """Carrinho cheio e o token do formulário de /carrinho, como no navegador"""
+    encher_carrinho(cliente)
+    html = cliente.get("/carrinho").get_data(as_text=True)
+    return re.search(r'name="chave_checkout" value="(\w+)"', html).group(1)
+
+
+CENARIOS = [
+    Cenario("vitrine", None, lambda c: c.get("/vitrine")),
+    Cenario("buscar_cupcakes", None, lambda c: c.get("/buscar_cupcakes?q=chocolate")),
+    Cenario("adicionar_ao_carrinho", "cliente", lambda c: c.post("/adicionar_ao_carrinho/1")),
+    Cenario("carrinho", "cliente", lambda c: c.get("/carrinho")),
+    Cenario("api_carrinho", "cliente", lambda c: c.get("/api/carrinho")),
+    Cenario("api_carrinho_alterar", "cliente", lambda c: c.post(
+        "/api/carrinho", json={"alteracoes": [{"id": 2, "delta": 1}, {"id": 3, "delta": 1}]}
+    )),
+    Cenario("finalizar_pedido", "cliente",
+            lambda c, chave: c.post("/finalizar_pedido", data={"chave_checkout": chave}),
+            preparar=abrir_checkout),
+    Cenario("pedido", "cliente", lambda c: c.get("/pedido")),
+    Cenario("admin_dashboard", "admin", lambda c: c.get("/admin")),
+    Cenario("exportar_excel", "admin", lambda c: c.get("/exportar_excel"), repeticoes=3),
+    Cenario("exportar_csv", "admin", lambda c: c.get("/exportar_csv"), repeticoes=3),
+    Cenario("exportar_parquet", "admin", lambda c: c.get("/exportar_parquet"), repeticoes=3),
+    Cenario("exportar_pdf", "admin", lambda c: c.get("/exportar_pdf"), repeticoes=3),
+]
+
+
+# =================== Medição ===================
+
+class ContadorQueries:
+    """Conta os comandos enviados ao banco pelo engine da app"""
+
+    def __init__(self, engine):
+        from sqlalchemy import event
+
+        self.total = 0
+        event.listen(engine, "before_cursor_execute", self._contar)
+
+    def _contar(self, *args):
+        self.total += 1
+
+
+def logar(app, email):
+    from backend.gerar_dados import SENHA_PADRAO
+
+    cliente = app.test_client()
+    resp = cliente.post("/login", data={"email": email, "senha": SENHA_PADRAO})
+    if resp.status_code != 302:
+        raise SystemExit(f"Login de {email} falhou ({resp.status_code})")
+    return cliente
+
+
+def medir(cenario, cliente, repeticoes, contador):
+    def chamar():
+        preparado = (cenario.preparar(cliente),) if cenario.preparar else ()
+        antes = contador.total
+        t0 = time.perf_counter()
+        resp = cenario.requisicao(cliente, *preparado)
+        resp.get_data()   # consome respostas em streaming (exportações)
+        decorrido = time.perf_counter() - t0
+        resp.close()
+        return resp.status_code, decorrido, contador.total - antes
+
+    status, _, _ = chamar()   # aquecimento (imports preguiçosos, caches)
+    if status >= 400:
+        raise SystemExit(f"{cenario.nome}: HTTP {status}")
+
+    latencias, queries, codigos = [], [], set()
+    for _ in range(repeticoes):
+        status, decorrido, n = chamar()
+        latencias.append(decorrido)
+        queries.append(n)
+        codigos.add(status)
+
+    return {
+        "repeticoes": repeticoes,
+        "status": sorted(codigos),
+        "p50_ms": percentil(latencias, 50) * 1000,
+        "p95_ms": percentil(latencias, 95) * 1000,
+        "p99_ms": percentil(latencias, 99) * 1000,
+        "media_ms": sum(latencias) / len(latencias) * 1000,
+        "req_s": len(latencias) / sum(latencias),
+        "queries": sum(queries) / len(queries),
+        "rss_mb": rss_maximo(),   # pico do processo até aqui
+    }
+
+
+def rodar(db_url, tamanhos, repeticoes, filtro=None):
+    # Config lê DATABASE_URL na importação: precisa vir antes do backend
+    os.environ["DATABASE_URL"] = db_url
+    # rota acima do @limite_queries derruba a rodada (backend/query_budget.py)
+    os.environ.setdefault("LIMITE_QUERIES_ESTRITO", "1")
+    # versão do catálogo própria: as invalidações da medição não mexem no arquivo
+    # compartilhado de um site rodando na mesma máquina
+    os.environ["CATALOGO_VERSAO_ARQUIVO"] = os.path.join(
+        tempfile.mkdtemp(prefix="cupcake_bench_"), "catalogo.versao"
+    )
+    from backend.cli import app   # a app do site com o Flask-Migrate (usado em preparar_banco)
+    from backend.models import db
+    from backend.gerar_dados import ADMIN_EMAIL, CLIENTE_EMAIL
+
+    preparar_banco(app, tamanhos)
+
+    with app.app_context():
+        contador = ContadorQueries(db.engine)
+        dialeto = db.engine.dialect.name
+
+    clientes = {
+        None: app.test_client(),
+        "cliente": logar(app, CLIENTE_EMAIL),
+        "admin": logar(app, ADMIN_EMAIL),
+    }
+
+    rotas = {}
+    for cenario in CENARIOS:
+        if filtro and cenario.nome not in filtro:
+            continue
+        rotas[cenario.nome] = medir(
+            cenario, clientes[cenario.usuario], cenario.repeticoes or repeticoes, contador
+        )
+        r = rotas[cenario.nome]
+        print(f"{cenario.nome:24} p50 {r['p50_ms']:8.1f} ms  p95 {r['p95_ms']:8.1f} ms  "
+              f"{r['req_s']:7.1f} req/s  {r['queries']:5.1f} queries  RSS {r['rss_mb']:6.1f} MB",
+              flush=True)
+
+    return {
+        "meta": {
+            "data": datetime.now().isoformat(timespec="seconds"),
+            "commit": commit_atual(),
+            "banco": dialeto,
+            "tamanhos": tamanhos,
+            "repeticoes": repeticoes,
+            "python": platform.python_version(),
+            "cpus": os.cpu_count(),
+        },
+        "rotas": rotas,
+        "rss_pico_mb": rss_maximo(),
+    }
+
+
+# =================== Comparação ===================
+
+# métrica -> True se maior é melhor
+METRICAS = {"p50_ms": False, "p95_ms": False, "p99_ms": False, "req_s": True, "queries": False, "rss_mb": False}
+
+
+def variacao(antes, depois):
+    if antes == 0:
+        return 0.0 if depois == 0 else float("inf")
+    return (depois - antes) / antes * 100
+
+
+def comparar(arquivo_antes, arquivo_depois, limite):
+    """Tabela rota × métrica com a variação percentual; devolve as pioras acima do limite"""
+    with open(arquivo_antes, encoding="utf-8") as f:
+        antes = json.load(f)
+    with open(arquivo_depois, encoding="utf-8") as f:
+        depois = json.load(f)
+
+    for nome, dados in (("antes", antes), ("depois", depois)):
+        m = dados["meta"]
+        print(f"{nome:7} {m['data']}  commit {m['commit']}  {m['banco']}  {m['tamanhos']}")
+    if antes["meta"]["tamanhos"] != depois["meta"]["tamanhos"] or antes["meta"]["banco"] != depois["meta"]["banco"]:
+        print("ATENÇÃO: rodadas com bancos ou tamanhos de base diferentes")
+    print()
+
+    pioras = []
+    print(f"{'rota':24} {'métrica':8} {'antes':>10} {'depois':>10} {'var.':>8}")
+    for rota, r_antes in antes["rotas"].items():
+        r_depois = depois["rotas"].get(rota)
+        if r_depois is None:
+            print(f"{rota:24} (ausente na segunda rodada)")
+            continue
+        for metrica, maior_melhor in METRICAS.items():
+            v = variacao(r_antes[metrica], r_depois[metrica])
+            piorou = (-v if maior_melhor else v) > limite
+            if piorou:
+                pioras.append((rota, metrica, v))
+            print(f"{rota:24} {metrica:8} {r_antes[metrica]:10.1f} {r_depois[metrica]:10.1f} "
+                  f"{v:+7.1f}%{'  <-- pior' if piorou else ''}")
+    return pioras
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--db", help="URL do banco (padrão: SQLite temporário). O banco é apagado!")
+    parser.add_argument("--usuarios", type=int, default=200)
+    parser.add_argument("--cupcakes", type=int, default=40)
+    parser.add_argument("--pedidos", type=int, default=5_000)
+    parser.add_argument("-r", "--repeticoes", type=int, default=30)
+    parser.add_argument("--rotas", nargs="+", help="mede só estas rotas (nomes dos cenários)")
+    parser.add_argument("--saida", default="benchmark_rotas.json")
+    parser.add_argument("--comparar", nargs=2, metavar=("ANTES", "DEPOIS"))
+    parser.add_argument("--limite", type=float, default=10, help="%% de piora tolerada no --comparar")
+    args = parser.parse_args()
+
+    if args.comparar:
+        pioras = comparar(*args.comparar, args.limite)
+        if pioras:
+            print(f"\n{len(pioras)} métrica(s) piorou(aram) mais de {args.limite:.0f}%")
+        sys.exit(1 if pioras else 0)
+
+    db_url = args.db or "sqlite:///" + os.path.join(tempfile.mkdtemp(prefix="bench_rotas_"), "bench.db")
+    tamanhos = {"usuarios": args.usuarios, "cupcakes": args.cupcakes, "pedidos": args.pedidos}
+    resultado = rodar(db_url, tamanhos, args.repeticoes, args.rotas)
+
+    with open(args.saida, "w", encoding="utf-8") as f:
+        json.dump(resultado, f, indent=2, ensure_ascii=False)
+    print(f"\nPico de RSS: {resultado['rss_pico_mb']:.1f} MB — resultado em {args.saida}")
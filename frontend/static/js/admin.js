@@ -45,6 +45,45 @@ document.addEventListener("DOMContentLoaded", () => {
     }
   }
 
+  // ====== EXPORTAÇÃO EM SEGUNDO PLANO ======
+  const exportBox = document.querySelector(".export-background");
+  if (exportBox) {
+    const progresso = exportBox.querySelector(".export-progress");
+
+    const acompanhar = url => {
+      fetch(url)
+        .then(r => r.json())
+        .then(tarefa => {
+          if (tarefa.status === "concluido") {
+            progresso.innerHTML = `<a href="${tarefa.download_url}" class="btn-small btn-primary">⬇ Baixar ${tarefa.formato}</a>`;
+          } else if (tarefa.status === "erro" || tarefa.status === "expirado") {
+            progresso.textContent = `Falhou: ${tarefa.mensagem || tarefa.status}`;
+          } else {
+            progresso.textContent = `Gerando... ${tarefa.progresso}%`;
+            setTimeout(() => acompanhar(url), 1500);
+          }
+        })
+        .catch(err => console.error("Erro ao consultar exportação:", err));
+    };
+
+    exportBox.querySelectorAll("button[data-formato]").forEach(btn => {
+      btn.addEventListener("click", () => {
+        const dados = new FormData();
+        dados.append("formato", btn.dataset.formato);
+        ["status", "cliente", "dataInicio", "dataFim"].forEach(campo => {
+          const valor = exportBox.dataset[campo];
+          if (valor) dados.append(campo.replace(/[A-Z]/g, l => "_" + l.toLowerCase()), valor);
+        });
+
+        progresso.textContent = "Na fila...";
+        fetch(exportBox.dataset.url, { method: "POST", body: dados })
+          .then(r => r.json())
+          .then(tarefa => acompanhar(tarefa.status_url))
+          .catch(err => console.error("Erro ao criar exportação:", err));
+      });
+    });
+  }
+
   // ====== CONFIRMAÇÃO DE STATUS ======
   document.querySelectorAll("form[data-confirm-status]").forEach(form => {
     form.addEventListener("submit", e => {
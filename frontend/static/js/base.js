@@ -34,6 +34,116 @@ document.addEventListener("DOMContentLoaded", () => {
     });
   });
 
+  // ===== CHECKOUT: bloqueia o segundo clique (o servidor também é idempotente) =====
+  document.querySelectorAll(".form-finalizar").forEach(form => {
+    form.addEventListener("submit", () => {
+      form.querySelectorAll("button").forEach(btn => btn.disabled = true);
+    });
+  });
+
+  // ===== CARRINHO SEM RECARREGAR A PÁGINA =====
+  // Os formulários com data-cupcake-id continuam funcionando sem JS; com JS,
+  // os cliques viram alterações acumuladas e enviadas juntas para /api/carrinho.
+  const API_CARRINHO = "/api/carrinho";
+  let pendentes = new Map();   // id -> {delta} ou {quantidade}
+  let timerCarrinho = null;
+
+  const reais = valor => "R$ " + valor.toFixed(2);
+
+  function mostrarAviso(texto, categoria) {
+    const container = document.querySelector("main .page-container");
+    if (!container) return;
+    const aviso = document.createElement("div");
+    aviso.className = "flash " + categoria;
+    aviso.textContent = texto;
+    container.prepend(aviso);
+    setTimeout(() => {
+      aviso.style.transition = "opacity 0.5s ease";
+      aviso.style.opacity = "0";
+      setTimeout(() => aviso.remove(), 500);
+    }, 4000);
+  }
+
+  function enfileirar(id, alteracao) {
+    const atual = pendentes.get(id);
+    if (!atual || "quantidade" in alteracao) {
+      pendentes.set(id, { ...alteracao });
+    } else if ("quantidade" in atual) {
+      atual.quantidade = Math.max(0, atual.quantidade + alteracao.delta);
+    } else {
+      atual.delta += alteracao.delta;
+    }
+    clearTimeout(timerCarrinho);
+    timerCarrinho = setTimeout(enviarCarrinho, 250);
+  }
+
+  function enviarCarrinho() {
+    const alteracoes = [...pendentes].map(([id, alteracao]) => ({ id, ...alteracao }));
+    pendentes = new Map();
+    if (!alteracoes.length) return;
+
+    fetch(API_CARRINHO, {
+      method: "POST",
+      headers: { "Content-Type": "application/json" },
+      body: JSON.stringify({ alteracoes })
+    })
+      .then(resp => resp.ok ? resp.json() : Promise.reject(resp))
+      .then(atualizarCarrinho)
+      .catch(() => mostrarAviso("Não foi possível atualizar o carrinho.", "danger"));
+  }
+
+  function atualizarCarrinho(dados) {
+    dados.erros.forEach(erro => mostrarAviso(erro, "warning"));
+
+    const cards = document.querySelectorAll("[data-cupcake-card]");
+    if (!cards.length) {
+      // vitrine: só confirma
+      mostrarAviso(`Carrinho atualizado: ${dados.quantidade} item(ns).`, "success");
+      return;
+    }
+
+    if (!dados.itens.length) {
+      location.reload();   // mostra o "carrinho vazio" do template
+      return;
+    }
+
+    const linhas = new Map(dados.itens.map(item => [String(item.id), item]));
+    cards.forEach(card => {
+      const linha = linhas.get(card.dataset.cupcakeCard);
+      if (!linha) {
+        card.remove();
+        return;
+      }
+      card.querySelector(".cart-qty-input").value = linha.quantidade;
+      card.querySelector(".subtotal").textContent = "Subtotal: " + reais(linha.subtotal);
+    });
+
+    const total = document.querySelector(".total-value");
+    if (total) total.textContent = reais(dados.total);
+  }
+
+  document.addEventListener("submit", e => {
+    const form = e.target.closest("form[data-cupcake-id]");
+    if (!form) return;
+    e.preventDefault();
+
+    const id = Number(form.dataset.cupcakeId);
+    const card = form.closest("[data-cupcake-card]");
+
+    if (form.dataset.quantidade !== undefined) {
+      enfileirar(id, { quantidade: Number(form.dataset.quantidade) });
+      if (card) card.style.opacity = "0.5";
+      return;
+    }
+
+    const delta = Number(form.dataset.delta);
+    enfileirar(id, { delta });
+
+    // resposta imediata na tela; o servidor confirma em seguida
+    const campo = card && card.querySelector(".cart-qty-input");
+    if (campo) campo.value = Math.max(0, Number(campo.value) + delta);
+  });
+
   // ===== PREVIEW DE IMAGEM (cadastro e edição de cupcake) =====
   const imageInputs = document.querySelectorAll("input[type='file'][data-preview-target]");
   imageInputs.forEach(input => {
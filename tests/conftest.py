@@ -0,0 +1,58 @@
+"""
+Fixtures dos testes: a app do site com app.testing, sobre um SQLite em arquivo
+criado pelas migrations (mesmos índices e busca da produção) e populado por
+backend/gerar_dados.py.
+
+Uso: python -m pytest -q
+"""
+import os
+import tempfile
+
+import pytest
+
+
+PASTA = tempfile.mkdtemp(prefix="cupcake_testes_")
+
+# Config e os módulos do backend leem estas variáveis na importação: precisam vir antes
+os.environ["DATABASE_URL"] = "sqlite:///" + os.path.join(PASTA, "testes.db")
+os.environ["CATALOGO_VERSAO_ARQUIVO"] = os.path.join(PASTA, "catalogo.versao")
+os.environ["EXPORTACOES_DIR"] = os.path.join(PASTA, "exportacoes")
+os.environ["PDF_CACHE_DIR"] = os.path.join(PASTA, "pdfs")
+os.environ["IMAGENS_ORIGINAIS_DIR"] = os.path.join(PASTA, "originais")
+os.environ.pop("METRICAS_DIR", None)
+
+# Base pequena, mas com o formato da produção (cliente frequente, cupcakes inativos)
+TAMANHOS = {"pedidos": 400, "usuarios": 20, "cupcakes": 12}
+
+
+@pytest.fixture(scope="session")
+def app():
+    from flask_migrate import upgrade
+    from backend.cli import app   # a app do site com o Flask-Migrate
+    from backend.gerar_dados import gerar
+
+    app.config["TESTING"] = True   # rota acima do @limite_queries levanta LimiteQueriesExcedido
+    with app.app_context():
+        upgrade()
+        gerar(**TAMANHOS)
+    return app
+
+
+def entrar(app, usuario_id, admin=False):
+    """test_client já logado (sessão montada direto, sem o hash da senha a cada teste)"""
+    cliente = app.test_client()
+    with cliente.session_transaction() as sessao:
+        sessao["usuario_id"] = usuario_id
+        sessao["usuario_nome"] = "Admin" if admin else f"Cliente {usuario_id - 1}"
+        sessao["is_admin"] = admin
+    return cliente
+
+
+@pytest.fixture
+def cliente(app):
+    return entrar(app, 2)   # cliente1@exemplo.com, o que mais compra
+
+
+@pytest.fixture
+def admin(app):
+    return entrar(app, 1, admin=True)
@@ -0,0 +1,20 @@
+from backend.cart import QUANTIDADE_MAXIMA
+from backend.gerar_dados import SENHA_PADRAO
+
+
+def quantidades(cliente):
+    return {item["id"]: item["quantidade"] for item in cliente.get("/api/carrinho").get_json()}
+
+
+def test_login_mescla_carrinho_sem_passar_do_maximo(app):
+    usuario = app.test_client()
+    usuario.post("/login", data={"email": "cliente2@exemplo.com", "senha": SENHA_PADRAO})
+    usuario.post("/api/carrinho", json={"alteracoes": [{"id": 1, "quantidade": 60}]})
+
+    visitante = app.test_client()
+    visitante.post("/api/carrinho", json={"alteracoes": [
+        {"id": 1, "quantidade": QUANTIDADE_MAXIMA}, {"id": 2, "quantidade": 3},
+    ]})
+    visitante.post("/login", data={"email": "cliente2@exemplo.com", "senha": SENHA_PADRAO})
+
+    assert quantidades(visitante) == {1: QUANTIDADE_MAXIMA, 2: 3}
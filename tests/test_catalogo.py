@@ -0,0 +1,13 @@
+import os
+
+from backend.catalog import catalogo
+
+
+def test_arquivo_apagado_nao_repete_versao(app):
+    with app.app_context():
+        catalogo.invalidar()
+        anterior = catalogo.versao_atual()
+
+        os.remove(catalogo.arquivo_versao)   # reboot que limpou a pasta do arquivo
+        assert catalogo.versao_atual() > anterior
+        assert os.path.exists(catalogo.arquivo_versao)
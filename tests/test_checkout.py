@@ -0,0 +1,35 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from backend.models import Pedido, PedidoStatusLog
+from conftest import entrar
+
+
+ENVIOS = 8   # POSTs simultâneos do mesmo formulário (duplo clique, reenvio, abas)
+
+
+def test_envios_simultaneos_gravam_um_pedido(app):
+    clientes = [entrar(app, 2) for _ in range(ENVIOS)]
+    for cliente in clientes:
+        cliente.post("/adicionar_ao_carrinho/1", data={"quantidade": 2})
+    clientes[0].get("/carrinho")   # emite o token do formulário, como no navegador
+    with clientes[0].session_transaction() as sessao:
+        chave = sessao["chave_checkout"]
+
+    largada = threading.Barrier(ENVIOS)
+
+    def enviar(cliente):
+        largada.wait()
+        return cliente.post("/checkout/finalizar", data={"chave_checkout": chave})
+
+    with ThreadPoolExecutor(ENVIOS) as executor:
+        respostas = list(executor.map(enviar, clientes))
+
+    with app.app_context():
+        pedidos = Pedido.query.filter_by(chave_idempotencia=chave).all()
+        assert len(pedidos) == 1
+        pedido_id = pedidos[0].id
+        assert PedidoStatusLog.query.filter_by(pedido_id=pedido_id).count() == 1
+
+    assert [r.status_code for r in respostas] == [302] * ENVIOS
+    assert {r.location for r in respostas} == {f"/checkout/sucesso/{pedido_id}"}
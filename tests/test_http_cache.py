@@ -0,0 +1,25 @@
+import os
+import shutil
+
+from backend.assets import estaticos
+
+
+def test_deploy_so_de_css_muda_o_etag_da_vitrine(app, monkeypatch, tmp_path):
+    cliente = app.test_client()
+    antes = cliente.get("/vitrine")
+    assert cliente.get("/vitrine", headers={"If-None-Match": antes.headers["ETag"]}).status_code == 304
+
+    # mesmo catálogo e templates, só o style.css mudou
+    pasta = tmp_path / "static"
+    shutil.copytree(app.static_folder, pasta)
+    with open(os.path.join(pasta, "css", "style.css"), "a") as f:
+        f.write("\n/* deploy novo */\n")
+    monkeypatch.setattr(estaticos, "por_nome", {})
+    monkeypatch.setattr(estaticos, "por_versionado", {})
+    monkeypatch.setattr(estaticos, "versao", estaticos.versao)
+    estaticos.carregar(str(pasta))
+
+    depois = cliente.get("/vitrine", headers={"If-None-Match": antes.headers["ETag"]})
+    assert depois.status_code == 200
+    with app.test_request_context("/"):
+        assert estaticos.url("css/style.css") in depois.get_data(as_text=True)
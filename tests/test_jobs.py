@@ -0,0 +1,34 @@
+import logging
+import os
+
+import pytest
+
+from backend import exports, jobs
+from backend.models import db, TarefaExportacao
+
+
+@pytest.mark.parametrize("formato", sorted(jobs.FORMATOS))
+def test_exportacao_grava_o_progresso_durante_a_leitura(app, monkeypatch, caplog, formato):
+    # lotes pequenos: várias gravações de progresso no meio da leitura
+    monkeypatch.setattr(exports, "TAMANHO_LOTE", 50)
+    gravados = []
+    salvar_progresso = jobs.salvar_progresso
+
+    def registrar(tarefa_id, **valores):
+        salvar_progresso(tarefa_id, **valores)
+        gravados.append(valores.get("progresso"))
+
+    monkeypatch.setattr(jobs, "salvar_progresso", registrar)
+
+    with app.app_context():
+        jobs.criar_tarefa(1, formato, {})
+        tarefa = jobs.pegar_proxima_tarefa()
+        with caplog.at_level(logging.WARNING):
+            jobs.executar_tarefa(tarefa)
+        db.session.remove()
+        tarefa = db.session.get(TarefaExportacao, tarefa.id)
+
+    # nenhuma escrita esbarrou num cursor de leitura aberto (SQLite: "database is locked")
+    assert "Falha ao gravar o progresso" not in caplog.text
+    assert len(gravados) > 3 and gravados[-1] == 100
+    assert tarefa.status == "concluido" and os.path.getsize(tarefa.arquivo) > 0
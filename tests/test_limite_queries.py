@@ -0,0 +1,106 @@
+import pytest
+
+from backend import query_budget
+from backend.catalog import catalogo
+from backend.models import Pedido
+from backend.query_budget import LimiteQueriesExcedido, limite_queries, rastrear
+
+
+CARRINHO = {"alteracoes": [
+    {"id": 1, "quantidade": 2}, {"id": 2, "quantidade": 1}, {"id": 3, "quantidade": 3},
+]}
+
+
+def ids_de_pedidos(app, usuario_id):
+    with app.app_context():
+        return [p.id for p in Pedido.query.filter_by(usuario_id=usuario_id, finalizado=True)
+                .order_by(Pedido.id.desc()).limit(2)]
+
+
+def finalizar_com_token(cliente):
+    """Caminho do formulário: o token emitido em /carrinho vai junto no POST"""
+    cliente.post("/api/carrinho", json=CARRINHO)
+    cliente.get("/carrinho")
+    with cliente.session_transaction() as sessao:
+        chave = sessao["chave_checkout"]
+    primeira = cliente.post("/finalizar_pedido", data={"chave_checkout": chave})
+    repetida = cliente.post("/finalizar_pedido", data={"chave_checkout": chave})   # pedido já gravado
+    return [primeira, repetida]
+
+
+def proxima_pagina(cliente):
+    proximo = cliente.get("/api/pedidos").get_json()["proximo"]
+    return [cliente.get(proximo)]
+
+
+# endpoint -> (usuário, chamadas no caminho real). Cada chamada roda com o
+# catálogo recém-invalidado (o pior caso: primeira requisição depois de uma edição).
+CENARIOS = {
+    "publico.vitrine": (None, lambda c, ids: [c.get("/vitrine")]),
+    "publico.buscar_cupcakes": (None, lambda c, ids: [c.get("/buscar_cupcakes?q=chocolate")]),
+    "carrinho.adicionar_ao_carrinho": ("cliente", lambda c, ids: [c.post("/adicionar_ao_carrinho/1")]),
+    "carrinho.carrinho": ("cliente", lambda c, ids: [c.post("/api/carrinho", json=CARRINHO), c.get("/carrinho")]),
+    "carrinho.api_carrinho": ("cliente", lambda c, ids: [c.post("/api/carrinho", json=CARRINHO), c.get("/api/carrinho")]),
+    "carrinho.api_carrinho_alterar": ("cliente", lambda c, ids: [c.post("/api/carrinho", json={
+        "alteracoes": [{"id": 2, "delta": 1}, {"id": 3, "delta": 1}],
+    })]),
+    "pedidos.finalizar_pedido": ("cliente", lambda c, ids: finalizar_com_token(c)),
+    "pedidos.pedido": ("cliente", lambda c, ids: [c.get("/pedido")]),
+    "pedidos.api_pedidos": ("cliente", lambda c, ids: proxima_pagina(c)),
+    "pedidos.repetir_pedido": ("cliente", lambda c, ids: [c.get(f"/repetir_pedido/{ids[0]}")]),
+    "pedidos.pedido_pdf": ("cliente", lambda c, ids: [c.get(f"/pedido/pdf/{ids[1]}"), c.get(f"/pedido/pdf/{ids[1]}")]),
+    "admin.admin_dashboard": ("admin", lambda c, ids: [c.get("/admin"), c.get("/admin?status=Entregue&cliente=Cliente")]),
+    "admin.admin_pedido_detalhes": ("admin", lambda c, ids: [c.get(f"/admin/pedido/{ids[0]}")]),
+    "admin.admin_listar_cupcakes": ("admin", lambda c, ids: [c.get("/admin/cupcakes")]),
+    "admin.admin_pedidos_do_cupcake": ("admin", lambda c, ids: [c.get("/admin/cupcake/1/pedidos")]),
+    "admin.admin_usuarios": ("admin", lambda c, ids: [c.get("/admin/usuarios")]),
+}
+
+
+def test_toda_rota_com_limite_tem_cenario(app):
+    com_limite = {
+        endpoint for endpoint, view in app.view_functions.items()
+        if getattr(view, "limite_queries", None) is not None
+    }
+    assert com_limite == set(CENARIOS)
+
+
+@pytest.mark.parametrize("endpoint", sorted(CENARIOS))
+def test_rota_dentro_do_limite(app, request, monkeypatch, endpoint):
+    usuario, chamar = CENARIOS[endpoint]
+    cliente = request.getfixturevalue(usuario) if usuario else app.test_client()
+    catalogo.invalidar()
+
+    verificadas = []
+    verificar = query_budget.verificar
+
+    def registrar(rastreador, nome, maximo=None):
+        verificadas.append(nome)
+        verificar(rastreador, nome, maximo)
+
+    monkeypatch.setattr(query_budget, "verificar", registrar)
+
+    # com app.testing, passar do limite (ou um N+1) levanta LimiteQueriesExcedido aqui
+    respostas = chamar(cliente, ids_de_pedidos(app, 2))
+
+    assert all(r.status_code < 400 for r in respostas)
+    assert endpoint in verificadas   # a view rodou (sem redirect de login ou de admin antes)
+
+
+def test_lazy_load_em_loop_estoura_o_limite(app):
+    @limite_queries(3)
+    def itens_um_por_um():
+        return [len(p.itens) for p in Pedido.query.order_by(Pedido.id).limit(10)]   # 1 + 10 queries
+
+    with app.test_request_context("/"):
+        with pytest.raises(LimiteQueriesExcedido, match="11 queries"):
+            itens_um_por_um()
+
+
+def test_lazy_load_em_loop_aparece_como_n1(app):
+    with app.app_context():
+        with rastrear() as rastreador:
+            for pedido in Pedido.query.order_by(Pedido.id).limit(10):
+                pedido.itens
+    (forma, repeticoes), = rastreador.suspeitas_n1()
+    assert repeticoes == 10 and "FROM pedido_cupcake" in forma
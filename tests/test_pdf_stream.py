@@ -0,0 +1,72 @@
+import re
+import zlib
+from io import BytesIO
+
+from backend.pdf_stream import PDFEmFluxo
+
+
+def escrever(paginas, texto="Pedido #1 - Recebido"):
+    destino = BytesIO()
+    pdf = PDFEmFluxo(destino)
+    for _ in range(paginas):
+        pdf.setFont("Helvetica", 10)
+        pdf.drawString(50, 800, texto)
+        pdf.showPage()
+    pdf.save()
+    return destino.getvalue()
+
+
+def objetos(dados):
+    """{número: corpo} lidos pelos offsets da tabela xref, como faz um leitor de PDF"""
+    inicio_xref = int(re.search(rb"startxref\n(\d+)\n%%EOF\n$", dados).group(1))
+    xref, trailer = dados[inicio_xref:].split(b"trailer\n")
+    linhas = xref.splitlines()
+    assert linhas[0] == b"xref"
+    primeiro, tamanho = map(int, linhas[1].split())
+    assert primeiro == 0 and len(linhas) == 2 + tamanho
+    assert int(re.search(rb"/Size (\d+)", trailer).group(1)) == tamanho
+
+    corpos = {}
+    for numero, entrada in enumerate(linhas[3:], start=1):
+        offset = int(entrada[:10])
+        cabecalho = b"%d 0 obj\n" % numero
+        assert dados[offset:offset + len(cabecalho)] == cabecalho, f"xref errada no objeto {numero}"
+        corpos[numero] = dados[offset + len(cabecalho):dados.index(b"\nendobj\n", offset)]
+    return corpos
+
+
+def textos(corpos):
+    """Strings desenhadas (Tj) de todas as páginas, ainda no encoding do PDF"""
+    saida = []
+    for corpo in corpos.values():
+        if b"/FlateDecode" in corpo:
+            fluxo = corpo.split(b"stream\n", 1)[1].rsplit(b"\nendstream", 1)[0]
+            saida += re.findall(rb"\(((?:\\.|[^\\)])*)\) Tj", zlib.decompress(fluxo))
+    return saida
+
+
+def test_xref_aponta_para_cada_objeto():
+    dados = escrever(3)
+    assert dados.startswith(b"%PDF-1.4\n")
+    corpos = objetos(dados)
+    assert b"/Type /Catalog /Pages 2 0 R" in corpos[1]
+
+
+def test_contagem_de_paginas():
+    # mais de 1000 páginas: /Kids e a xref são escritos em partes
+    corpos = objetos(escrever(1200))
+    paginas = [n for n, corpo in corpos.items() if corpo.startswith(b"<< /Type /Page ")]
+    assert len(paginas) == 1200
+    assert b"/Count 1200 " in corpos[2]
+    assert re.findall(rb"(\d+) 0 R", corpos[2]) == [b"%d" % n for n in paginas]
+
+
+def test_save_sem_paginas_gera_uma_em_branco():
+    corpos = objetos(escrever(0))
+    assert b"/Count 1 " in corpos[2]
+
+
+def test_texto_fora_do_latin1():
+    corpos = objetos(escrever(1, "Cliente: Zoë Dvořák Łódź 🧁 東京 (teste)"))
+    # cp1252: ë e ó ficam; ř e Ł perdem o traço/acento; emoji e CJK viram "?"
+    assert textos(corpos) == [b"Cliente: Zo\xeb Dvor\xe1k L\xf3dz ? ?? \\(teste\\)"]